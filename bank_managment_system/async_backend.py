@@ -0,0 +1,189 @@
+import asyncio
+import concurrent.futures
+import threading
+
+from backend import Backend, DEFAULT_PROFILE, READ_CACHE_SIZE, READ_CACHE_TTL
+
+
+# the Backend API for asyncio code: every call runs on a dedicated thread pool, each worker thread
+# with its own pooled connection, so the event loop never waits on sqlite3. Cancelling an awaiting
+# task interrupts the statement its worker is running, a write interrupted halfway is rolled back
+class AsyncBackend:
+    def __init__(self, db_path, profile=DEFAULT_PROFILE, workers=4):
+        self.backend = Backend(db_path, profile)
+        self.executor = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix="async-backend")
+        self._lock = threading.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+        self.backend.close()
+
+    # job is {"conn": None, "cancelled": False}, shared with the awaiting run() only, so nothing is
+    # left behind whichever side finishes first
+    def _job(self, job, func, args):
+        conn = self.backend.pool.connection()
+        with self._lock:
+            if job["cancelled"]:
+                raise concurrent.futures.CancelledError()
+            job["conn"] = conn
+        try:
+            return func(self.backend, *args)
+        finally:
+            with self._lock:
+                job["conn"] = None
+
+    # await func(backend, *args) on one of the workers, for anything the methods below do not cover
+    async def run(self, func, *args):
+        job = {"conn": None, "cancelled": False}
+        cf = self.executor.submit(self._job, job, func, args)
+        try:
+            return await asyncio.wrap_future(cf)
+        except asyncio.CancelledError:
+            # a job that never started is simply dropped, only a running one needs interrupting
+            if not cf.cancel():
+                with self._lock:
+                    if job["conn"] is not None:
+                        job["conn"].interrupt()
+                    else:
+                        job["cancelled"] = True
+            raise
+
+    async def next_acc_no(self):
+        return await self.run(Backend.next_acc_no)
+
+    async def check_admin(self, name, password):
+        return await self.run(Backend.check_admin, name, password)
+
+    async def create_employee(self, name, password, salary, position):
+        return await self.run(Backend.create_employee, name, password, salary, position)
+
+    async def check_employee(self, name, password):
+        return await self.run(Backend.check_employee, name, password)
+
+    async def create_customer(self, name, age, address, balance, acc_type, mobile_number):
+        return await self.run(Backend.create_customer, name, age, address, balance, acc_type, mobile_number)
+
+    def enable_read_cache(self, size=READ_CACHE_SIZE, ttl=READ_CACHE_TTL):
+        self.backend.enable_read_cache(size, ttl)
+
+    def read_cache_stats(self):
+        return self.backend.read_cache_stats()
+
+    async def import_customers(self, records, chunk_size=5000, on_reject=None):
+        return await self.run(Backend.import_customers, records, chunk_size, on_reject)
+
+    async def check_acc_no(self, acc_no):
+        return await self.run(Backend.check_acc_no, acc_no)
+
+    async def get_details(self, acc_no):
+        return await self.run(Backend.get_details, acc_no)
+
+    async def update_balance(self, new_money, acc_no):
+        return await self.run(Backend.update_balance, new_money, acc_no)
+
+    async def deduct_balance(self, new_money, acc_no):
+        return await self.run(Backend.deduct_balance, new_money, acc_no)
+
+    async def post_batch(self, postings, chunk_size=1000):
+        return await self.run(Backend.post_batch, postings, chunk_size)
+
+    async def check_balance(self, acc_no):
+        return await self.run(Backend.check_balance, acc_no)
+
+    async def snapshot_balances(self):
+        return await self.run(Backend.snapshot_balances)
+
+    async def balance_as_of(self, acc_no, ts):
+        return await self.run(Backend.balance_as_of, acc_no, ts)
+
+    async def account_statement(self, acc_no, start, end):
+        return await self.run(Backend.account_statement, acc_no, start, end)
+
+    async def update_name_in_bank_table(self, new_name, acc_no):
+        return await self.run(Backend.update_name_in_bank_table, new_name, acc_no)
+
+    async def update_age_in_bank_table(self, new_age, acc_no):
+        return await self.run(Backend.update_age_in_bank_table, new_age, acc_no)
+
+    async def update_address_in_bank_table(self, new_address, acc_no):
+        return await self.run(Backend.update_address_in_bank_table, new_address, acc_no)
+
+    async def list_all_customers(self):
+        return await self.run(Backend.list_all_customers)
+
+    async def list_customers_page(self, after=None, page_size=100, columns=None, order_by="acc_no", descending=False):
+        return await self.run(Backend.list_customers_page, after, page_size, columns, order_by, descending)
+
+    async def list_employees_page(self, after=None, page_size=100, columns=None, order_by="name", descending=False):
+        return await self.run(Backend.list_employees_page, after, page_size, columns, order_by, descending)
+
+    async def search_customers(self, text, after=None, page_size=20):
+        return await self.run(Backend.search_customers, text, after, page_size)
+
+    # one page per worker call, so the loop gets the first rows without waiting for the whole table
+    async def iter_customers(self, page_size=500, columns=None, order_by="acc_no", descending=False):
+        after = None
+        while True:
+            rows, after = await self.list_customers_page(after, page_size, columns, order_by, descending)
+            for row in rows:
+                yield row
+            if after is None:
+                return
+
+    async def iter_employees(self, page_size=500, columns=None, order_by="name", descending=False):
+        after = None
+        while True:
+            rows, after = await self.list_employees_page(after, page_size, columns, order_by, descending)
+            for row in rows:
+                yield row
+            if after is None:
+                return
+
+    # every match of search_customers, best first
+    async def iter_search_customers(self, text, page_size=100):
+        after = None
+        while True:
+            rows, after = await self.search_customers(text, after, page_size)
+            for row in rows:
+                yield row
+            if after is None:
+                return
+
+    async def delete_acc(self, acc_no):
+        return await self.run(Backend.delete_acc, acc_no)
+
+    async def show_employees(self):
+        return await self.run(Backend.show_employees)
+
+    async def all_money(self):
+        return await self.run(Backend.all_money)
+
+    async def reconcile_totals(self, fix=False):
+        return await self.run(Backend.reconcile_totals, fix)
+
+    async def show_employees_for_update(self):
+        return await self.run(Backend.show_employees_for_update)
+
+    async def update_employee_name(self, new_name, old_name):
+        return await self.run(Backend.update_employee_name, new_name, old_name)
+
+    async def update_employee_password(self, new_pass, old_name):
+        return await self.run(Backend.update_employee_password, new_pass, old_name)
+
+    async def update_employee_salary(self, new_salary, old_name):
+        return await self.run(Backend.update_employee_salary, new_salary, old_name)
+
+    async def update_employee_position(self, new_pos, old_name):
+        return await self.run(Backend.update_employee_position, new_pos, old_name)
+
+    async def get_detail(self, acc_no):
+        return await self.run(Backend.get_detail, acc_no)
+
+    async def check_name_in_staff(self, name):
+        return await self.run(Backend.check_name_in_staff, name)
@@ -0,0 +1,73 @@
+import unittest
+import asyncio
+import os
+import time
+import async_backend
+from shutil import copyfile
+
+#counts forever, only an interrupt stops it
+ENDLESS_QUERY = "with recursive c(x) as (select 1 union all select x + 1 from c) select count(*) from c"
+
+
+class AsyncBackendUnitTests(unittest.IsolatedAsyncioTestCase):
+
+    async def test_async_backend_calls(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_async_backend_calls_copy.db")
+
+        bank = async_backend.AsyncBackend("db_mocks/test_async_backend_calls_copy.db")
+        new_acc_no = await bank.create_customer("Rusu Ana", 30, "1st Street, NY", 100, "acc_type_1", 123)
+        balances = await asyncio.gather(*(bank.update_balance(10, new_acc_no) for _ in range(20)))
+        self.assertEqual(sorted(balances), list(range(110, 310, 10)))
+        self.assertFalse(await bank.deduct_balance(1000, new_acc_no))
+        self.assertEqual((await bank.get_details(new_acc_no))[:2], (new_acc_no, "Rusu Ana"))
+
+        names = [row[0] async for row in bank.iter_customers(page_size=2, columns=("name",), order_by="name")]
+        self.assertEqual(names, ["Ionescu Maria", "Popescu Ion", "Rusu Ana"])
+        found = [row[0] async for row in bank.iter_search_customers("street ny", page_size=2)]
+        self.assertEqual(sorted(found), [1, 2, new_acc_no])
+        await bank.create_employee("Stan Dan", "pass", 100, "teller")
+        await bank.create_employee("Ene Ion", "pass", 200, "manager")
+        employees = [row async for row in bank.iter_employees(page_size=1, columns=("name", "salary"))]
+        self.assertEqual(employees, [("Ene Ion", 200), ("Stan Dan", 100)])
+        self.assertEqual(len(await bank.list_all_customers()), 3)
+
+        #cleanup
+        await bank.close()
+        os.remove("db_mocks/test_async_backend_calls_copy.db")
+
+    async def test_async_backend_cancel(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_async_backend_cancel_copy.db")
+
+        bank = async_backend.AsyncBackend("db_mocks/test_async_backend_cancel_copy.db", workers=1)
+        task = asyncio.ensure_future(bank.run(lambda b: b._cursor().execute(ENDLESS_QUERY).fetchone()))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        #the only worker is free again as soon as the query was interrupted
+        start = time.monotonic()
+        self.assertEqual(await bank.check_balance(1), 1250)
+        self.assertLess(time.monotonic() - start, 1)
+
+        #jobs cancelled while queued behind a running one never run
+        ran = []
+        task = asyncio.ensure_future(bank.run(lambda b: b._cursor().execute(ENDLESS_QUERY).fetchone()))
+        queued = [asyncio.ensure_future(bank.run(lambda b: ran.append(1))) for _ in range(100)]
+        await asyncio.sleep(0.1)
+        for waiting in queued:
+            waiting.cancel()
+        task.cancel()
+        await asyncio.gather(task, *queued, return_exceptions=True)
+        self.assertEqual(await bank.check_balance(1), 1250)
+        self.assertEqual(ran, [])
+
+        #cleanup
+        await bank.close()
+        os.remove("db_mocks/test_async_backend_cancel_copy.db")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,253 +1,1333 @@
+import collections
+import functools
+import hashlib
+import json
+import queue
 import sqlite3
+import threading
+import time
+from concurrent.futures import Future
 
 conn = None
 cur = None
 acc_no = None
 detail = None
+acc_no_cache = None
+# seconds a verified employee login is trusted without asking staff again
+EMPLOYEE_SESSION_TTL = 60
+# accounts kept by the read cache, and seconds a cached read is served before going back to the file
+READ_CACHE_SIZE = 1024
+READ_CACHE_TTL = 5.0
 
-# making connection with database
-def connect_database(db_path):
-    global conn
-    global cur
-    conn = sqlite3.connect(db_path)
+# PRAGMAs applied to every connection when it is opened. "durable" fsyncs on every commit;
+# "throughput" only fsyncs at WAL checkpoints, so a power cut can lose the last few commits
+# (never corrupt the file), and trades memory for fewer reads
+PROFILES = {
+    "durable": {
+        "journal_mode": "wal",
+        "synchronous": "full",
+        "busy_timeout": 5000,
+        "cache_size": -16000,
+        "temp_store": "default",
+        "mmap_size": 0,
+    },
+    "throughput": {
+        "journal_mode": "wal",
+        "synchronous": "normal",
+        "busy_timeout": 5000,
+        "cache_size": -64000,
+        "temp_store": "memory",
+        "mmap_size": 268435456,
+    },
+}
+DEFAULT_PROFILE = "durable"
 
-    cur = conn.cursor()
+# the current time in unix seconds (to the millisecond) as SQLite sees it, the clock of the ledger
+LEDGER_NOW = "(julianday('now') - 2440587.5) * 86400.0"
+
+BANK_FIELDS = ("acc_no", "name", "age", "address", "balance", "account_type", "mobile_number")
+# the columns of a customer that an import supplies, account numbers are allocated by the backend
+CUSTOMER_FIELDS = BANK_FIELDS[1:]
+STAFF_FIELDS = ("name", "pass", "salary", "position")
+
+# every query the backend runs, always written with ? placeholders: the text never changes between
+# calls, so sqlite3's per-connection statement cache hands back the already prepared statement
+STATEMENTS = {
+    "next_acc_no": "select last from acc_no_seq",
+    "bump_acc_no": "update acc_no_seq set last = last + 1 returning last",
+    "reserve_acc_nos": "update acc_no_seq set last = last + ? returning last",
+    "check_admin": "select 1 from admin where name=? and pass=?",
+    "insert_employee": "insert into staff values(?,?,?,?)",
+    "employee_password": "select pass from staff where name=?",
+    "check_name_in_staff": "select 1 from staff where name=?",
+    "show_employees": "select name, salary, position,pass from staff",
+    "show_employees_for_update": "select * from staff",
+    "update_employee_name": "update staff set name=? where name=?",
+    "update_employee_password": "update staff set pass=? where name=?",
+    "update_employee_salary": "update staff set salary=? where name=?",
+    "update_employee_position": "update staff set position=? where name=?",
+    "insert_customer": "insert into bank values(?,?,?,?,?,?,?)",
+    "all_acc_no": "select acc_no from bank",
+    "check_acc_no": "select 1 from bank where acc_no=?",
+    "get_details": "select * from bank where acc_no=?",
+    "get_detail": "select name, balance from bank where acc_no=?",
+    "check_balance": "select balance from bank where acc_no=?",
+    "list_all_customers": "select * from bank",
+    "deposit": "update bank set balance = balance + ? where acc_no=? returning balance",
+    "withdraw": "update bank set balance = balance - ? where acc_no=? and balance >= ? returning balance",
+    "balances": "select acc_no, coalesce(balance, 0) from bank where acc_no in (select value from json_each(?))",
+    "post": "update bank set balance = coalesce(balance, 0) + ? where acc_no=?",
+    "update_name": "update bank set name=? where acc_no=?",
+    "update_age": "update bank set age=? where acc_no=?",
+    "update_address": "update bank set address=? where acc_no=?",
+    "delete_acc": "delete from bank where acc_no=?",
+    "totals": "select total, accounts from bank_totals",
+    "sum_balances": "select coalesce(sum(balance), 0), count(*) from bank",
+    "set_totals": "update bank_totals set total=?, accounts=?",
+    "reconcile_totals": "select total, accounts, (select coalesce(sum(balance), 0) from bank), "
+                        "(select count(*) from bank) from bank_totals",
+    "fix_totals": "update bank_totals set (total, accounts) = (select coalesce(sum(balance), 0), count(*) from bank)",
+    "snapshot_balances": "insert into balance_snapshots select acc_no, " + LEDGER_NOW + ", coalesce(balance, 0), "
+                         "(select coalesce(max(id), 0) from ledger) from bank where acc_no in (select acc_no "
+                         "from ledger where id > (select coalesce(max(ledger_id), 0) from balance_snapshots))",
+    "snapshot_before": "select ts, balance, ledger_id from balance_snapshots where acc_no=? and ts<=? "
+                       "order by ts desc, ledger_id desc limit 1",
+    "ledger_sum": "select coalesce(sum(amount), 0), count(*) from ledger where acc_no=? and ts>=? and ts<=? and id>?",
+    "ledger_entries": "select ts, kind, amount from ledger where acc_no=? and ts>? and ts<=? order by ts, id",
+    "has_search_index": "select 1 from sqlite_master where name='bank_search'",
+    "index_customers": "insert into bank_search(rowid, name, address, mobile_number) "
+                       "select acc_no, name, address, mobile_number from bank where acc_no between ? and ?",
+    "search": "select b.*, s.rank from bank_search s join bank b on b.acc_no = s.rowid "
+              "where bank_search match ? order by s.rank, s.rowid limit ?",
+    "search_after": "select b.*, s.rank from bank_search s join bank b on b.acc_no = s.rowid "
+                    "where bank_search match ? and (s.rank > ? or (s.rank = ? and s.rowid > ?)) "
+                    "order by s.rank, s.rowid limit ?",
+    "search_like": "select *, 0 from bank where (name like ? escape '\\' or address like ? escape '\\' "
+                   "or mobile_number like ? escape '\\') order by acc_no limit ?",
+    "search_like_after": "select *, 0 from bank where (name like ? escape '\\' or address like ? escape '\\' "
+                         "or mobile_number like ? escape '\\') and acc_no > ? order by acc_no limit ?",
+}
+# room for the registry plus the listing queries, whose text depends on the columns and order asked for
+STATEMENT_CACHE_SIZE = len(STATEMENTS) + 64
+
+# column definitions of the keyed tables, migrate.py rebuilds older files to match them
+BANK_COLUMNS = "acc_no integer primary key, name text, age int, address text, balance int, account_type text, mobile_number int"
+STAFF_COLUMNS = "name text primary key, pass text, salary int, position text"
+
+
+# create the tables (and everything hanging off them) that are missing from the database
+def create_schema(cur):
+    cur.execute("create table if not exists bank ({})".format(BANK_COLUMNS))
+    cur.execute("create table if not exists staff ({})".format(STAFF_COLUMNS))
+    cur.execute("create table if not exists admin (name text, pass text)")
 
+    # older versions inserted the default admin on every connect, drop those copies once
+    # and key the table so the login is an index probe
+    cur.execute("select 1 from sqlite_master where type='index' and name='admin_name'")
+    if cur.fetchone() is None:
+        cur.execute(
+            "delete from admin where rowid not in (select min(rowid) from admin group by name)"
+        )
+        cur.execute("create unique index admin_name on admin (name)")
     cur.execute(
-        "create table if not exists bank (acc_no int, name text, age int, address text, balance int, account_type text, mobile_number int)"
+        "insert into admin select 'arpit', '123' where not exists (select 1 from admin)"
     )
+
+    # account numbers come from a one-row sequence; rows inserted with an explicit
+    # acc_no (imports, older clients) push it forward so a number is never handed out twice
+    cur.execute("create table if not exists acc_no_seq (last int)")
+    cur.execute("select last from acc_no_seq")
+    if cur.fetchone() is None:
+        cur.execute("insert into acc_no_seq select coalesce(max(acc_no), 0) from bank")
     cur.execute(
-        "create table if not exists staff (name text, pass text,salary int, position text)"
+        "create trigger if not exists acc_no_seq_bump after insert on bank "
+        "when new.acc_no > (select last from acc_no_seq) "
+        "begin update acc_no_seq set last = new.acc_no; end"
     )
-    cur.execute("create table if not exists admin (name text, pass text)")
-    cur.execute("insert into admin values('arpit','123')")
-    conn.commit()
-    cur.execute("select acc_no from bank")
-    acc = cur.fetchall()
-    global acc_no
-    if len(acc) == 0:
-        acc_no = 1
+
+    # one-row summary of the money in the bank, kept current by triggers inside the writing transaction
+    cur.execute("create table if not exists bank_totals (total int, accounts int)")
+    cur.execute("select 1 from bank_totals")
+    if cur.fetchone() is None:
+        cur.execute(
+            "insert into bank_totals select coalesce(sum(balance), 0), count(*) from bank"
+        )
+    cur.execute(
+        "create trigger if not exists bank_totals_insert after insert on bank begin "
+        "update bank_totals set total = total + coalesce(new.balance, 0), accounts = accounts + 1; end"
+    )
+    cur.execute(
+        "create trigger if not exists bank_totals_update after update of balance on bank begin "
+        "update bank_totals set total = total - coalesce(old.balance, 0) + coalesce(new.balance, 0); end"
+    )
+    cur.execute(
+        "create trigger if not exists bank_totals_delete after delete on bank begin "
+        "update bank_totals set total = total - coalesce(old.balance, 0), accounts = accounts - 1; end"
+    )
+
+    _create_ledger(cur)
+
+    # the customer table sorted by name pages through this index instead of sorting the whole table;
+    # balance gets no index on purpose, every posting would have to update it
+    cur.execute("create index if not exists bank_name on bank (name, acc_no)")
+
+    _create_search_index(cur)
+
+
+# every change to a balance appended to the ledger by triggers, so it commits or rolls back with the
+# change itself whichever code path made it: "open" and "close" for an account's first and last
+# balance, "deposit" and "withdraw" (a negative amount) in between. balance_snapshots holds balances
+# at points in time, see snapshot_balances; a ledger created on an existing database starts with a
+# snapshot of every account, the opening balances it has no history for
+def _create_ledger(cur):
+    cur.execute("select 1 from sqlite_master where name='ledger'")
+    if cur.fetchone() is None:
+        cur.execute("create table ledger (id integer primary key, acc_no int, ts real, kind text, amount int)")
+        cur.execute("create index ledger_acc_ts on ledger (acc_no, ts)")
+        cur.execute("create table balance_snapshots (acc_no int, ts real, balance int, ledger_id int)")
+        cur.execute("create index balance_snapshots_acc_ts on balance_snapshots (acc_no, ts)")
+        cur.execute(
+            "insert into balance_snapshots select acc_no, {}, coalesce(balance, 0), 0 from bank".format(LEDGER_NOW)
+        )
+
+    cur.execute(
+        "create trigger if not exists ledger_insert after insert on bank begin "
+        "insert into ledger (acc_no, ts, kind, amount) "
+        "values (new.acc_no, {}, 'open', coalesce(new.balance, 0)); end".format(LEDGER_NOW)
+    )
+    cur.execute(
+        "create trigger if not exists ledger_update after update of balance on bank "
+        "when new.balance is not old.balance begin "
+        "insert into ledger (acc_no, ts, kind, amount) values (new.acc_no, {}, "
+        "case when coalesce(new.balance, 0) > coalesce(old.balance, 0) then 'deposit' else 'withdraw' end, "
+        "coalesce(new.balance, 0) - coalesce(old.balance, 0)); end".format(LEDGER_NOW)
+    )
+    cur.execute(
+        "create trigger if not exists ledger_delete after delete on bank begin "
+        "insert into ledger (acc_no, ts, kind, amount) "
+        "values (old.acc_no, {}, 'close', -coalesce(old.balance, 0)); end".format(LEDGER_NOW)
+    )
+    # append-only: history is corrected with a new entry, never by editing an old one
+    cur.execute(
+        "create trigger if not exists ledger_no_update before update on ledger begin "
+        "select raise(abort, 'the ledger is append-only'); end"
+    )
+    cur.execute(
+        "create trigger if not exists ledger_no_delete before delete on ledger begin "
+        "select raise(abort, 'the ledger is append-only'); end"
+    )
+
+
+# kept apart since _import_chunk swaps it for a single statement that indexes a whole chunk
+SEARCH_INSERT_TRIGGER = (
+    "create trigger if not exists bank_search_insert after insert on bank begin "
+    "insert into bank_search(rowid, name, address, mobile_number) "
+    "values (new.acc_no, new.name, new.address, new.mobile_number); end"
+)
+
+
+# full-text index over the columns tellers search by. It reads the text from bank itself (external
+# content) so nothing is stored twice, and the triggers keep it in step with every write. SQLite
+# builds without FTS5 simply go without it, search_customers falls back to LIKE there
+def _create_search_index(cur):
+    cur.execute(STATEMENTS["has_search_index"])
+    if cur.fetchone() is None:
+        try:
+            cur.execute(
+                "create virtual table bank_search using fts5(name, address, mobile_number, "
+                "content='bank', content_rowid='acc_no', prefix='2 3')"
+            )
+        except sqlite3.OperationalError:
+            return
+        # names weigh the most, then mobile numbers, then addresses
+        cur.execute("insert into bank_search(bank_search, rank) values('rank', 'bm25(10.0, 1.0, 5.0)')")
+        cur.execute("insert into bank_search(bank_search) values('rebuild')")
+
+    cur.execute(SEARCH_INSERT_TRIGGER)
+    cur.execute(
+        "create trigger if not exists bank_search_delete after delete on bank begin "
+        "insert into bank_search(bank_search, rowid, name, address, mobile_number) "
+        "values ('delete', old.acc_no, old.name, old.address, old.mobile_number); end"
+    )
+    cur.execute(
+        "create trigger if not exists bank_search_update after update of acc_no, name, address, mobile_number "
+        "on bank begin "
+        "insert into bank_search(bank_search, rowid, name, address, mobile_number) "
+        "values ('delete', old.acc_no, old.name, old.address, old.mobile_number); "
+        "insert into bank_search(rowid, name, address, mobile_number) "
+        "values (new.acc_no, new.name, new.address, new.mobile_number); end"
+    )
+
+
+# every word of the search text as a quoted prefix term, so whatever the teller types is never read as FTS syntax
+def _search_terms(terms):
+    return " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+# the search text as LIKE patterns: name and mobile number prefixes, address anywhere
+def _like_patterns(text):
+    text = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return (text + "%", "%" + text + "%", text + "%")
+
+
+# credit an account in a single statement, returns the new balance (None for an unknown account)
+def _deposit(cur, amount, acc_no):
+    cur.execute(STATEMENTS["deposit"], (amount, acc_no))
+    row = cur.fetchall()
+    return row[0][0] if row else None
+
+
+# debit an account only if it can cover the amount, returns the new balance (None if refused)
+def _withdraw(cur, amount, acc_no):
+    cur.execute(STATEMENTS["withdraw"], (amount, acc_no, amount))
+    row = cur.fetchall()
+    return row[0][0] if row else None
+
+
+def _insert_customer(cur, name, age, address, balance, acc_type, mobile_number):
+    # bumping the sequence takes the write lock, so two processes can never get the same number
+    cur.execute(STATEMENTS["bump_acc_no"])
+    new_acc_no = cur.fetchall()[0][0]
+    cur.execute(
+        STATEMENTS["insert_customer"],
+        (new_acc_no, name, age, address, balance, acc_type, mobile_number),
+    )
+    return new_acc_no
+
+
+# one imported record, a mapping keyed by CUSTOMER_FIELDS (a csv.DictReader row) or a sequence in that
+# order, as the values of a bank row; raises ValueError with the reason the record is refused
+def _customer_row(record):
+    if isinstance(record, dict):
+        values = [record.get(field) for field in CUSTOMER_FIELDS]
     else:
-        acc_no = int(acc[-1][0]) + 1
+        values = list(record)
+        if len(values) != len(CUSTOMER_FIELDS):
+            raise ValueError("expected {} fields, got {}".format(len(CUSTOMER_FIELDS), len(values)))
 
+    row = []
+    for field, value in zip(CUSTOMER_FIELDS, values):
+        value = str(value).strip() if value is not None else ""
+        if not value:
+            raise ValueError("missing {}".format(field))
+        if field in ("age", "balance", "mobile_number"):
+            if not value.isdigit():
+                raise ValueError("{} is not a number".format(field))
+            value = int(value)
+        row.append(value)
+    return tuple(row)
 
-# check admin dtails in database
-def check_admin(name, password):
-    cur.execute("select * from admin")
-    data = cur.fetchall()
 
-    if data[0][0] == name and data[0][1] == password:
+# insert one chunk of validated rows under a block of account numbers taken from the sequence in a
+# single update, returns the first number of the block. Feeding the full-text index row by row from
+# its trigger takes most of the time, so the trigger is dropped for the chunk and the whole block is
+# indexed in one statement; it is back before the commit, no other connection ever runs without it
+def _import_chunk(cur, chunk):
+    cur.execute(STATEMENTS["reserve_acc_nos"], (len(chunk),))
+    first = cur.fetchall()[0][0] - len(chunk) + 1
+    cur.execute(STATEMENTS["has_search_index"])
+    full_text = cur.fetchone() is not None
+    if full_text:
+        cur.execute("drop trigger if exists bank_search_insert")
+    cur.executemany(STATEMENTS["insert_customer"], [(first + i,) + row for i, row in enumerate(chunk)])
+    if full_text:
+        cur.execute(STATEMENTS["index_customers"], (first, first + len(chunk) - 1))
+        cur.execute(SEARCH_INSERT_TRIGGER)
+    return first
+
+
+# apply one chunk of postings; the caller holds the write lock, so the balances cannot move under us
+def _post_chunk(cur, chunk):
+    parsed = []
+    for record in chunk:
+        try:
+            amount = int(record[1])
+            # int() drops the fraction of 10.7, an amount has to be whole to be posted
+            if not isinstance(record[1], str) and amount != record[1]:
+                raise ValueError(record[1])
+            parsed.append((int(record[0]), amount, record[2]))
+        except (TypeError, ValueError):
+            parsed.append((None, 0, None))
+    accounts = list(set(p[0] for p in parsed if p[0] is not None))
+    cur.execute(STATEMENTS["balances"], (json.dumps(accounts),))
+    balances = dict(cur.fetchall())
+
+    rejected = []
+    changes = []
+    for record, (acc, amount, kind) in zip(chunk, parsed):
+        if acc not in balances or amount <= 0 or kind not in ("deposit", "withdraw"):
+            rejected.append(record)
+        elif kind == "withdraw" and balances[acc] < amount:
+            rejected.append(record)
+        else:
+            if kind == "withdraw":
+                amount = -amount
+            balances[acc] = balances[acc] + amount
+            changes.append((amount, acc))
+
+    cur.executemany(STATEMENTS["post"], changes)
+    return rejected
+
+
+# the per-account reads the read cache can hold, each one query on the caller's cursor
+def _get_details(cur, acc_no):
+    cur.execute(STATEMENTS["get_details"], (acc_no,))
+    detail = cur.fetchall()
+    if len(detail) == 0:
+        return False
+    return tuple(detail[0])
+
+
+def _get_detail(cur, acc_no):
+    cur.execute(STATEMENTS["get_detail"], (acc_no,))
+    return cur.fetchall()
+
+
+def _check_balance(cur, acc_no):
+    cur.execute(STATEMENTS["check_balance"], (acc_no,))
+    bal = cur.fetchall()
+    return bal[0][0]
+
+
+# the summary and the sum of the balances read by one statement, and with fix the summary recomputed
+# in the same transaction, so no write can land between the check and the repair
+def _reconcile_totals(cur, fix):
+    cur.execute(STATEMENTS["reconcile_totals"])
+    row = cur.fetchone()
+    summary, actual = tuple(row[:2]), tuple(row[2:])
+    if fix and summary != actual:
+        cur.execute(STATEMENTS["fix_totals"])
+    return summary, actual
+
+
+def _snapshot_balances(cur):
+    cur.execute(STATEMENTS["snapshot_balances"])
+    return cur.rowcount
+
+
+# run one registered statement
+def _execute(cur, name, params=()):
+    cur.execute(STATEMENTS[name], params)
+
+
+# the keyset listing query for one combination of table, projection and order, memoized so a given
+# combination always produces the very same text; ties on order_by are broken by the table's key.
+# NULLs of order_by sort first (last when descending) and never compare, so where a page starts is
+# one of: the first page, after a value, after a NULL, or the start of the NULL or non-NULL rows
+@functools.lru_cache(maxsize=64)
+def _listing_sql(table, columns, order_by, descending, start):
+    unique = "acc_no" if table == "bank" else "name"
+    key = (unique,) if order_by == unique else (order_by, unique)
+    direction = " desc" if descending else ""
+    compare = "<" if descending else ">"
+    sql = "select {} from {}".format(", ".join(columns + key), table)
+    if start == "value":
+        sql = sql + " where ({}) {} ({})".format(", ".join(key), compare, ", ".join("?" * len(key)))
+    elif start == "null":
+        sql = sql + " where {} is null and {} {} ?".format(order_by, unique, compare)
+    elif start == "nulls":
+        sql = sql + " where {} is null".format(order_by)
+    elif start == "values":
+        sql = sql + " where {} is not null".format(order_by)
+    return sql + " order by {} limit ?".format(", ".join(k + direction for k in key))
+
+
+# gives every thread its own connection to one database file, opened on first use
+class ConnectionPool:
+    def __init__(self, db_path, profile=DEFAULT_PROFILE):
+        if profile not in PROFILES:
+            raise ValueError("Unknown profile {}".format(profile))
+        self.db_path = db_path
+        self.profile = profile
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}
+
+    # open one connection with the profile applied, check_same_thread is off only so close_all
+    # can run from any thread
+    def connect(self):
+        conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE
+        )
+        for name, value in PROFILES[self.profile].items():
+            conn.execute("pragma {}={}".format(name, value))
+        return conn
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self.connect()
+            self._local.conn = conn
+            with self._lock:
+                self._connections[threading.get_ident()] = conn
+        return conn
+
+    # close the calling thread's connection, worker threads call this before they exit
+    def release(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            with self._lock:
+                self._connections.pop(threading.get_ident(), None)
+            conn.close()
+
+    def close_all(self):
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for conn in connections:
+            conn.close()
+
+
+# raised by GroupCommitter.submit once stop() was called; the caller writes on its own connection instead
+class GroupCommitStopped(Exception):
+    pass
+
+
+# collects writes from many threads and commits them together on a connection of its own, so one
+# fsync is shared by the whole batch: whatever queues up while a batch is being committed goes into
+# the next one. A batch closes after max_ops writes or `window` seconds, or as soon as every caller
+# blocked on a write is in it, since they cannot send anything else before they get their answer;
+# every caller gets its result only after the commit holding its write returned
+class GroupCommitter:
+    def __init__(self, pool, window=0.005, max_ops=64):
+        self.pool = pool
+        self.window = window
+        self.max_ops = max_ops
+        self.commits = 0
+        self._waiting = 0
+        self._stopped = False
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+        self._thread.start()
+
+    # run op(cur, *args) in the next batch and wait until that batch is committed; nothing is queued
+    # behind the sentinel stop() puts, a stopped committer raises GroupCommitStopped instead
+    def submit(self, op, *args):
+        future = Future()
+        with self._lock:
+            if self._stopped:
+                raise GroupCommitStopped()
+            self._waiting = self._waiting + 1
+            self._queue.put((op, args, future))
+        return future.result()
+
+    def stop(self):
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        cur = self.pool.connection().cursor()
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.window
+            while len(batch) < min(self.max_ops, self._waiting):
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(cur, batch)
+        self.pool.release()
+        # anything still queued was never run, its callers write on their own instead
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[2].set_exception(GroupCommitStopped())
+
+    def _commit(self, cur, batch):
+        outcomes = []
+        try:
+            cur.execute("begin immediate")
+            for op, args, future in batch:
+                # a savepoint per write, so one failing caller does not undo the others
+                cur.execute("savepoint group_op")
+                try:
+                    outcomes.append((future, op(cur, *args), None))
+                except Exception as error:
+                    cur.execute("rollback to group_op")
+                    outcomes.append((future, None, error))
+                cur.execute("release group_op")
+            cur.connection.commit()
+            self.commits = self.commits + 1
+        except Exception as error:
+            if cur.connection.in_transaction:
+                cur.connection.rollback()
+            outcomes = [(future, None, error) for op, args, future in batch]
+        with self._lock:
+            self._waiting = self._waiting - len(batch)
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+# a bounded, least recently used map of per-account reads ("get_details", acc_no) -> result, each
+# entry served for at most ttl seconds. The backend drops an account's entries after every write
+# that touches it, the ttl only bounds how long writes made by other processes go unseen. A read
+# that was already running when an invalidation came is not stored, it may hold the old row
+class ReadCache:
+    def __init__(self, size=READ_CACHE_SIZE, ttl=READ_CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+        # acc_no -> the kinds of reads cached for it, so an invalidation only touches its own entries
+        self._accounts = {}
+        self._invalidations = 0
+        self._lock = threading.Lock()
+
+    # the cached result of load(cur, acc_no), calling it (and keeping what it returns) on a miss
+    def read(self, kind, acc_no, load, cur):
+        key = (kind, acc_no)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits = self.hits + 1
+                return entry[0]
+            self.misses = self.misses + 1
+            invalidations = self._invalidations
+
+        value = load(cur, acc_no)
+
+        with self._lock:
+            if invalidations == self._invalidations:
+                self._entries[key] = (value, now + self.ttl)
+                self._entries.move_to_end(key)
+                self._accounts.setdefault(acc_no, set()).add(kind)
+                while len(self._entries) > self.size:
+                    (old_kind, old_acc_no), _ = self._entries.popitem(last=False)
+                    self._forget(old_kind, old_acc_no)
+                    self.evictions = self.evictions + 1
+        return value
+
+    def invalidate(self, acc_nos):
+        with self._lock:
+            self._invalidations = self._invalidations + 1
+            for acc_no in acc_nos:
+                for kind in self._accounts.pop(acc_no, ()):
+                    self._entries.pop((kind, acc_no), None)
+
+    def clear(self):
+        with self._lock:
+            self._invalidations = self._invalidations + 1
+            self._entries.clear()
+            self._accounts.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "capacity": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _forget(self, kind, acc_no):
+        kinds = self._accounts.get(acc_no)
+        if kinds is not None:
+            kinds.discard(kind)
+            if not kinds:
+                del self._accounts[acc_no]
+
+
+# every bank operation against one database file; safe to share between threads since each
+# thread runs its queries on its own pooled connection and the in-memory caches are locked
+class Backend:
+    def __init__(self, db_path=None, profile=DEFAULT_PROFILE):
+        self.pool = None
+        self.acc_no_cache = None
+        self.read_cache = None
+        # name -> (password digest, expiry) of employee logins verified in the last session_ttl seconds
+        self.employee_sessions = {}
+        self.session_ttl = EMPLOYEE_SESSION_TTL
+        self.group_commit = None
+        self.full_text = False
+        self._lock = threading.RLock()
+        if db_path is not None:
+            self.open(db_path, profile)
+
+    def open(self, db_path, profile=DEFAULT_PROFILE):
+        pool = ConnectionPool(db_path, profile)
+        self.disable_group_commit()
+        if self.pool is not None:
+            self.pool.close_all()
+        self.pool = pool
+        self.acc_no_cache = None
+        self.read_cache = None
+        self.employee_sessions.clear()
+        conn = self.pool.connection()
+        cur = conn.cursor()
+        create_schema(cur)
+        conn.commit()
+        cur.execute(STATEMENTS["has_search_index"])
+        self.full_text = cur.fetchone() is not None
+
+    def close(self):
+        self.disable_group_commit()
+        if self.pool is not None:
+            self.pool.close_all()
+
+    # from now on writes are committed in groups, see GroupCommitter
+    def enable_group_commit(self, window=0.005, max_ops=64):
+        self.disable_group_commit()
+        self.group_commit = GroupCommitter(self.pool, window, max_ops)
+
+    def disable_group_commit(self):
+        if self.group_commit is not None:
+            self.group_commit.stop()
+            self.group_commit = None
+
+    def _cursor(self):
+        return self.pool.connection().cursor()
+
+    # run op(cur, *args) in its own transaction, or in the next batch when group commit is on;
+    # the write lock is taken up front so a reader turning writer halfway through can never
+    # deadlock against another thread
+    def _write(self, op, *args):
+        group_commit = self.group_commit
+        if group_commit is not None:
+            try:
+                return group_commit.submit(op, *args)
+            except GroupCommitStopped:
+                pass
+
+        cur = self._cursor()
+        conn = cur.connection
+        if not conn.in_transaction:
+            cur.execute("begin immediate")
+        try:
+            result = op(cur, *args)
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+        return result
+
+    # _write for an op that changes these accounts, whose entries in the read cache are dropped
+    # afterwards, even when it failed since an interrupted write may or may not have committed
+    def _write_accounts(self, acc_nos, op, *args):
+        try:
+            return self._write(op, *args)
+        finally:
+            self._invalidate(acc_nos)
+
+    def _invalidate(self, acc_nos):
+        cache = self.read_cache
+        if cache is None:
+            return
+        keys = []
+        for acc_no in acc_nos:
+            try:
+                keys.append(int(acc_no))
+            except (TypeError, ValueError):
+                pass
+        cache.invalidate(keys)
+
+    # load(cur, acc_no) through the read cache when it is on
+    def _read(self, kind, acc_no, load):
+        cache = self.read_cache
+        if cache is not None:
+            try:
+                key = int(acc_no)
+            except (TypeError, ValueError):
+                return load(self._cursor(), acc_no)
+            return cache.read(kind, key, load, self._cursor())
+        return load(self._cursor(), acc_no)
+
+    # the PRAGMA values the calling thread's connection is actually running with
+    def active_settings(self):
+        cur = self._cursor()
+        settings = {"profile": self.pool.profile}
+        for name in PROFILES[self.pool.profile]:
+            cur.execute("pragma {}".format(name))
+            settings[name] = cur.fetchone()[0]
+        return settings
+
+    # only a peek at the next number, create_customer allocates from the sequence itself
+    def next_acc_no(self):
+        cur = self._cursor()
+        cur.execute(STATEMENTS["next_acc_no"])
+        return cur.fetchone()[0] + 1
+
+    def check_admin(self, name, password):
+        cur = self._cursor()
+        cur.execute(STATEMENTS["check_admin"], (name, password))
+
+        if cur.fetchone() is not None:
+            return True
+        return
+
+    def create_employee(self, name, password, salary, position):
+        self._write(_execute, "insert_employee", (name, password, salary, position))
+
+    def check_employee(self, name, password):
+        digest = hashlib.sha256(str(password).encode()).hexdigest()
+        session = self.employee_sessions.get(name)
+        if session is not None and session[0] == digest and session[1] > time.monotonic():
+            return True
+
+        cur = self._cursor()
+        cur.execute(STATEMENTS["employee_password"], (name,))
+        data = cur.fetchone()
+        if data is None or data[0] != password:
+            return False
+
+        with self._lock:
+            self.employee_sessions[name] = (digest, time.monotonic() + self.session_ttl)
         return True
-    return
+
+    def clear_employee_sessions(self):
+        with self._lock:
+            self.employee_sessions.clear()
+
+    def create_customer(self, name, age, address, balance, acc_type, mobile_number):
+        new_acc_no = self._write(
+            _insert_customer, name, age, address, balance, acc_type, mobile_number
+        )
+        with self._lock:
+            if self.acc_no_cache is not None:
+                self.acc_no_cache.add(new_acc_no)
+        # a lookup of the number before it existed may have cached "no such account"
+        self._invalidate([new_acc_no])
+        return new_acc_no
+
+    # create a customer for every valid record of an iterable, in transactions of chunk_size rows;
+    # records are read one at a time so the source can be a generator over a file of any size.
+    # A refused record is passed to on_reject(record, reason) when given. Returns the number imported
+    def import_customers(self, records, chunk_size=5000, on_reject=None):
+        imported = 0
+        chunk = []
+        for record in records:
+            try:
+                chunk.append(_customer_row(record))
+            except ValueError as error:
+                if on_reject is not None:
+                    on_reject(record, str(error))
+                continue
+            if len(chunk) == chunk_size:
+                imported = imported + self._import_chunk(chunk)
+                chunk = []
+        if chunk:
+            imported = imported + self._import_chunk(chunk)
+        return imported
+
+    def _import_chunk(self, chunk):
+        first = self._write(_import_chunk, chunk)
+        acc_nos = range(first, first + len(chunk))
+        with self._lock:
+            if self.acc_no_cache is not None:
+                self.acc_no_cache.update(acc_nos)
+        self._invalidate(acc_nos)
+        return len(chunk)
+
+    # keep every account number in memory so check_acc_no can reject unknown numbers without a query
+    # accounts created by another process are only seen after calling this again
+    def enable_acc_no_cache(self):
+        cur = self._cursor()
+        cur.execute(STATEMENTS["all_acc_no"])
+        cache = set(row[0] for row in cur.fetchall())
+        with self._lock:
+            self.acc_no_cache = cache
+
+    def disable_acc_no_cache(self):
+        with self._lock:
+            self.acc_no_cache = None
+
+    # cache get_details, get_detail and check_balance per account, see ReadCache
+    def enable_read_cache(self, size=READ_CACHE_SIZE, ttl=READ_CACHE_TTL):
+        with self._lock:
+            self.read_cache = ReadCache(size, ttl)
+
+    def disable_read_cache(self):
+        with self._lock:
+            self.read_cache = None
+
+    # hits, misses and evictions of the read cache so far (None when it is off)
+    def read_cache_stats(self):
+        cache = self.read_cache
+        if cache is None:
+            return None
+        return cache.stats()
+
+    def check_acc_no(self, acc_no):
+        acc_no = int(acc_no)
+        cache = self.acc_no_cache
+        if cache is not None and acc_no not in cache:
+            return False
+        cur = self._cursor()
+        cur.execute(STATEMENTS["check_acc_no"], (acc_no,))
+        return cur.fetchone() is not None
+
+    def get_details(self, acc_no):
+        return self._read("get_details", acc_no, _get_details)
+
+    def update_balance(self, new_money, acc_no):
+        return self._write_accounts([acc_no], _deposit, int(new_money), acc_no)
+
+    def deduct_balance(self, new_money, acc_no):
+        return self._write_accounts([acc_no], _withdraw, int(new_money), acc_no) is not None
+
+    def post_batch(self, postings, chunk_size=1000):
+        rejected = []
+        chunk = []
+        for record in postings:
+            # anything but an (acc_no, amount, kind) record is refused before it reaches a chunk
+            if not isinstance(record, (tuple, list)) or len(record) != 3:
+                rejected.append(record)
+                continue
+            chunk.append(record)
+            if len(chunk) == chunk_size:
+                rejected.extend(self._write_accounts([r[0] for r in chunk], _post_chunk, chunk))
+                chunk = []
+        if chunk:
+            rejected.extend(self._write_accounts([r[0] for r in chunk], _post_chunk, chunk))
+        return rejected
+
+    def check_balance(self, acc_no):
+        return self._read("check_balance", acc_no, _check_balance)
+
+    def update_name_in_bank_table(self, new_name, acc_no):
+        self._write_accounts([acc_no], _execute, "update_name", (new_name, acc_no))
+
+    def update_age_in_bank_table(self, new_age, acc_no):
+        self._write_accounts([acc_no], _execute, "update_age", (new_age, acc_no))
+
+    def update_address_in_bank_table(self, new_address, acc_no):
+        self._write_accounts([acc_no], _execute, "update_address", (new_address, acc_no))
+
+    def list_all_customers(self):
+        cur = self._cursor()
+        cur.execute(STATEMENTS["list_all_customers"])
+        return cur.fetchall()
+
+    def list_customers_page(self, after=None, page_size=100, columns=None, order_by="acc_no", descending=False):
+        return self._list_page("bank", BANK_FIELDS, after, page_size, columns, order_by, descending)
+
+    def list_employees_page(self, after=None, page_size=100, columns=None, order_by="name", descending=False):
+        return self._list_page("staff", STAFF_FIELDS, after, page_size, columns, order_by, descending)
+
+    # customers matching every word of text as a prefix of their name, address or mobile number, best
+    # match first; paginated like list_customers_page, `after` being the (rank, acc_no) of the last row
+    def search_customers(self, text, after=None, page_size=20):
+        terms = text.split()
+        if not terms:
+            return [], None
+        cur = self._cursor()
+        if self.full_text:
+            query = _search_terms(terms)
+            if after is None:
+                cur.execute(STATEMENTS["search"], (query, page_size))
+            else:
+                cur.execute(STATEMENTS["search_after"], (query, after[0], after[0], after[1], page_size))
+        else:
+            patterns = _like_patterns(" ".join(terms))
+            if after is None:
+                cur.execute(STATEMENTS["search_like"], patterns + (page_size,))
+            else:
+                cur.execute(STATEMENTS["search_like_after"], patterns + (after[1], page_size))
+        rows = cur.fetchall()
+        page = [tuple(row[:-1]) for row in rows]
+        if len(rows) < page_size:
+            return page, None
+        return page, (rows[-1][-1], rows[-1][0])
+
+    def _list_page(self, table, fields, after, page_size, columns, order_by, descending):
+        columns = tuple(columns or fields)
+        for column in columns + (order_by,):
+            if column not in fields:
+                raise ValueError("Unknown column {}".format(column))
+
+        descending = bool(descending)
+        if after is None:
+            start, params = "first", []
+        elif len(after) == 2 and after[0] is None:
+            start, params = "null", [after[1]]
+        else:
+            start, params = "value", list(after)
+        cur = self._cursor()
+        cur.execute(_listing_sql(table, columns, order_by, descending, start), params + [page_size])
+        rows = cur.fetchall()
+        # a page that runs out of NULLs (ascending) or of values (descending) goes on into the other group
+        follow = {("null", False): "values", ("value", True): "nulls"}.get((start, descending))
+        if len(rows) < page_size and follow is not None and len(after) == 2:
+            cur.execute(_listing_sql(table, columns, order_by, descending, follow), (page_size - len(rows),))
+            rows = rows + cur.fetchall()
+        if len(rows) < page_size:
+            return [row[: len(columns)] for row in rows], None
+        return [row[: len(columns)] for row in rows], rows[-1][len(columns):]
+
+    def iter_customers(self, page_size=500, columns=None, order_by="acc_no", descending=False):
+        after = None
+        while True:
+            rows, after = self.list_customers_page(after, page_size, columns, order_by, descending)
+            for row in rows:
+                yield row
+            if after is None:
+                return
+
+    def delete_acc(self, acc_no):
+        self._write_accounts([acc_no], _execute, "delete_acc", (acc_no,))
+        with self._lock:
+            if self.acc_no_cache is not None:
+                self.acc_no_cache.discard(int(acc_no))
+
+    def show_employees(self):
+        cur = self._cursor()
+        cur.execute(STATEMENTS["show_employees"])
+        return cur.fetchall()
+
+    def all_money(self):
+        cur = self._cursor()
+        cur.execute(STATEMENTS["totals"])
+        total, accounts = cur.fetchone()
+        if accounts == 0:
+            return False
+        return total
+
+    def reconcile_totals(self, fix=False):
+        if fix:
+            return self._write(_reconcile_totals, True)
+        return _reconcile_totals(self._cursor(), False)
+
+    # snapshot the balance of every account the ledger moved since the last snapshot, returns how
+    # many were taken; run periodically (snapshot.py) so balance_as_of only ever adds up one period
+    def snapshot_balances(self):
+        return self._write(_snapshot_balances)
+
+    # the balance of an account at unix time ts: the nearest snapshot before it plus the ledger
+    # entries in between, one range of the (acc_no, ts) index. None if the ledger knows nothing of
+    # the account by then
+    def balance_as_of(self, acc_no, ts):
+        cur = self._cursor()
+        cur.execute(STATEMENTS["snapshot_before"], (acc_no, ts))
+        snapshot = cur.fetchone()
+        start, balance, ledger_id = snapshot if snapshot is not None else (float("-inf"), 0, 0)
+        cur.execute(STATEMENTS["ledger_sum"], (acc_no, start, ts, ledger_id))
+        amount, entries = cur.fetchone()
+        if snapshot is None and entries == 0:
+            return None
+        return balance + amount
+
+    # the balance of an account at unix time start and the ledger entries up to end, as
+    # (opening balance, [(ts, kind, amount, balance after)])
+    def account_statement(self, acc_no, start, end):
+        opening = self.balance_as_of(acc_no, start)
+        cur = self._cursor()
+        cur.execute(STATEMENTS["ledger_entries"], (acc_no, start, end))
+        balance = opening or 0
+        entries = []
+        for ts, kind, amount in cur.fetchall():
+            balance = balance + amount
+            entries.append((ts, kind, amount, balance))
+        return opening, entries
+
+    def show_employees_for_update(self):
+        cur = self._cursor()
+        cur.execute(STATEMENTS["show_employees_for_update"])
+        return cur.fetchall()
+
+    def update_employee_name(self, new_name, old_name):
+        self._write(_execute, "update_employee_name", (new_name, old_name))
+        with self._lock:
+            self.employee_sessions.pop(old_name, None)
+            self.employee_sessions.pop(new_name, None)
+
+    def update_employee_password(self, new_pass, old_name):
+        self._write(_execute, "update_employee_password", (new_pass, old_name))
+        with self._lock:
+            self.employee_sessions.pop(old_name, None)
+
+    def update_employee_salary(self, new_salary, old_name):
+        self._write(_execute, "update_employee_salary", (new_salary, old_name))
+
+    def update_employee_position(self, new_pos, old_name):
+        self._write(_execute, "update_employee_position", (new_pos, old_name))
+
+    def get_detail(self, acc_no):
+        return list(self._read("get_detail", acc_no, _get_detail))
+
+    def check_name_in_staff(self, name):
+        cur = self._cursor()
+        cur.execute(STATEMENTS["check_name_in_staff"], (name,))
+        return cur.fetchone() is not None
+
+
+# the backend behind the module-level functions below: the thread that called connect_database
+# keeps using the conn/cur globals (the tests swap them directly), any other thread gets its own
+# connection from the pool
+class _ModuleBackend(Backend):
+    owner = threading.main_thread().ident
+
+    def _cursor(self):
+        if self.pool is None or threading.get_ident() == self.owner:
+            return cur
+        return Backend._cursor(self)
+
+
+_backend = _ModuleBackend()
+employee_sessions = _backend.employee_sessions
+
+
+# making connection with database, profile is one of PROFILES
+def connect_database(db_path, profile=DEFAULT_PROFILE):
+    global conn
+    global cur
+    global acc_no
+    global acc_no_cache
+    _backend.open(db_path, profile)
+    # the old connection may not come from the pool (callers can swap it), close it explicitly
+    # so it does not keep the previous file's WAL around
+    if conn is not None:
+        conn.close()
+    _backend.owner = threading.get_ident()
+    conn = _backend.pool.connection()
+    cur = conn.cursor()
+    acc_no_cache = None
+    acc_no = _backend.next_acc_no()
+
+
+# the PRAGMA values the connection is running with, see PROFILES
+def active_settings():
+    return _backend.active_settings()
+
+
+# commit writes in groups of up to max_ops or every `window` seconds instead of one by one,
+# each call still returns only once its own write is committed
+def enable_group_commit(window=0.005, max_ops=64):
+    _backend.enable_group_commit(window, max_ops)
+
+
+def disable_group_commit():
+    _backend.disable_group_commit()
+
+
+# check admin dtails in database
+def check_admin(name, password):
+    return _backend.check_admin(name, password)
 
 
 # create employee in database
 def create_employee(name, password, salary, position):
-    # print(password)
-    cur.execute("insert into staff values(?,?,?,?)", (name, password, salary, position))
-    conn.commit()
+    _backend.create_employee(name, password, salary, position)
 
 
 # check employee details in dabase for employee login
 def check_employee(name, password):
-    # print(password)
-    # print(name)
-    cur.execute("select name,pass from staff")
-    data = cur.fetchall()
-    # print(data)
-    if len(data) == 0:
-        return False
-    for i in range(len(data)):
-        if data[i][0] == name and data[i][1] == password:
-            return True
+    return _backend.check_employee(name, password)
 
-    return False
+
+# forget every verified employee login
+def clear_employee_sessions():
+    _backend.clear_employee_sessions()
 
 
 # create customer details in database
 def create_customer(name, age, address, balance, acc_type, mobile_number):
     global acc_no
-    cur.execute(
-        "insert into bank values(?,?,?,?,?,?,?)",
-        (acc_no, name, age, address, balance, acc_type, mobile_number),
-    )
-    conn.commit()
-    acc_no = acc_no + 1
-    return acc_no - 1
+    new_acc_no = _backend.create_customer(name, age, address, balance, acc_type, mobile_number)
+    acc_no = new_acc_no + 1
+    return new_acc_no
+
+
+# create customers from an iterable of records in transactions of chunk_size rows, see
+# Backend.import_customers; returns the number imported
+def import_customers(records, chunk_size=5000, on_reject=None):
+    global acc_no
+    imported = _backend.import_customers(records, chunk_size, on_reject)
+    acc_no = _backend.next_acc_no()
+    return imported
+
+
+# keep every account number in memory so check_acc_no can reject unknown numbers without a query
+# accounts created by another process are only seen after calling this again
+def enable_acc_no_cache():
+    global acc_no_cache
+    _backend.enable_acc_no_cache()
+    acc_no_cache = _backend.acc_no_cache
+
+
+def disable_acc_no_cache():
+    global acc_no_cache
+    _backend.disable_acc_no_cache()
+    acc_no_cache = None
+
+
+# keep up to size recent get_details, get_detail and check_balance results for ttl seconds,
+# every write made through the backend drops the entries of the accounts it touched
+def enable_read_cache(size=READ_CACHE_SIZE, ttl=READ_CACHE_TTL):
+    _backend.enable_read_cache(size, ttl)
+
+
+def disable_read_cache():
+    _backend.disable_read_cache()
+
+
+# hits, misses and evictions of the read cache, to size it
+def read_cache_stats():
+    return _backend.read_cache_stats()
 
 
 # check account in database
 def check_acc_no(acc_no):
-    cur.execute("select acc_no from bank")
-    list_acc_no = cur.fetchall()
-
-    for i in range(len(list_acc_no)):
-        if list_acc_no[i][0] == int(acc_no):
-            return True
-    return False
+    return _backend.check_acc_no(acc_no)
 
 
 # get all details of a particular customer from database
 def get_details(acc_no):
-    cur.execute("select * from bank where acc_no=?", (acc_no,))
     global detail
-    detail = cur.fetchall()
-    # print(detail)
-    if len(detail) == 0:
-        return False
-    else:
-        return (
-            detail[0][0],
-            detail[0][1],
-            detail[0][2],
-            detail[0][3],
-            detail[0][4],
-            detail[0][5],
-            detail[0][6],
-        )
+    details = _backend.get_details(acc_no)
+    detail = [details] if details else []
+    return details
 
 
-# add new balance of customer in bank database
+# add new balance of customer in bank database, returns the new balance
 def update_balance(new_money, acc_no):
-    cur.execute("select balance from bank where acc_no=?", (acc_no,))
-    bal = cur.fetchall()
-    bal = bal[0][0]
-    new_bal = bal + int(new_money)
-
-    cur.execute("update bank set balance=? where acc_no=?", (new_bal, acc_no))
-    conn.commit()
+    return _backend.update_balance(new_money, acc_no)
 
 
 # deduct balance from customer bank database
 def deduct_balance(new_money, acc_no):
-    cur.execute("select balance from bank where acc_no=?", (acc_no,))
-    bal = cur.fetchall()
-    bal = bal[0][0]
-    if bal < int(new_money):
-        return False
-    else:
-        new_bal = bal - int(new_money)
+    return _backend.deduct_balance(new_money, acc_no)
+
+
+# apply (acc_no, amount, kind) postings, kind being "deposit" or "withdraw", in transactions of chunk_size
+# records; withdrawals follow the same rule as deduct_balance, checked against the running balance
+# returns the records that were refused (unknown account, insufficient funds, bad kind or amount)
+def post_batch(postings, chunk_size=1000):
+    return _backend.post_batch(postings, chunk_size)
 
-        cur.execute("update bank set balance=? where acc_no=?", (new_bal, acc_no))
-        conn.commit()
-        return True
+
+# snapshot the balances the ledger moved since the last snapshot, see Backend.snapshot_balances
+def snapshot_balances():
+    return _backend.snapshot_balances()
+
+
+# balance of an account at unix time ts, None before the ledger knew of it
+def balance_as_of(acc_no, ts):
+    return _backend.balance_as_of(acc_no, ts)
+
+
+# (opening balance, [(ts, kind, amount, balance after)]) of an account between two unix times
+def account_statement(acc_no, start, end):
+    return _backend.account_statement(acc_no, start, end)
 
 
 # gave balance of a particular account number from database
 def check_balance(acc_no):
-    cur.execute("select balance from bank where acc_no=?", (acc_no,))
-    bal = cur.fetchall()
-    return bal[0][0]
+    return _backend.check_balance(acc_no)
 
 
 # update_name_in_bank_table
 def update_name_in_bank_table(new_name, acc_no):
-    # print(new_name)
-    conn.execute("update bank set name='{}' where acc_no={}".format(new_name, acc_no))
-    conn.commit()
+    _backend.update_name_in_bank_table(new_name, acc_no)
 
 
 # update_age_in_bank_table
 def update_age_in_bank_table(new_age, acc_no):
-    # print(new_age)
-    conn.execute("update bank set age={} where acc_no={}".format(new_age, acc_no))
-    conn.commit()
+    _backend.update_age_in_bank_table(new_age, acc_no)
 
 
 # update_address_in_bank_table
 def update_address_in_bank_table(new_address, acc_no):
-    # print(new_address)
-    conn.execute(
-        "update bank set address='{}' where acc_no={}".format(new_address, acc_no)
-    )
-    conn.commit()
+    _backend.update_address_in_bank_table(new_address, acc_no)
 
 
 # list of all customers in bank
 def list_all_customers():
-    cur.execute("select * from bank")
-    deatil = cur.fetchall()
+    return _backend.list_all_customers()
 
-    return deatil
+
+# one page of customers in keyset order: rows come sorted by order_by and then acc_no, and `after` is the
+# key returned with the previous page; returns (rows, key for the next page or None after the last page)
+def list_customers_page(after=None, page_size=100, columns=None, order_by="acc_no", descending=False):
+    return _backend.list_customers_page(after, page_size, columns, order_by, descending)
+
+
+# stream customers page by page so memory stays bounded by page_size
+def iter_customers(page_size=500, columns=None, order_by="acc_no", descending=False):
+    return _backend.iter_customers(page_size, columns, order_by, descending)
+
+
+# one page of employees, same as list_customers_page with ties on order_by broken by name
+def list_employees_page(after=None, page_size=100, columns=None, order_by="name", descending=False):
+    return _backend.list_employees_page(after, page_size, columns, order_by, descending)
+
+
+# find customers by name prefix, address words or mobile number, ranked best match first;
+# returns (rows, key for the next page or None after the last page)
+def search_customers(text, after=None, page_size=20):
+    return _backend.search_customers(text, after, page_size)
 
 
 # delete account from database
 def delete_acc(acc_no):
-    cur.execute("delete from bank where acc_no=?", (acc_no,))
-    conn.commit()
+    _backend.delete_acc(acc_no)
 
 
 # show employees detail from staff table
 def show_employees():
-    cur.execute("select name, salary, position,pass from staff")
-    detail = cur.fetchall()
-    return detail
+    return _backend.show_employees()
 
 
 # return all money in bank
 def all_money():
-    cur.execute("select balance from bank")
-    bal = cur.fetchall()
-    # print(bal)
-    if len(bal) == 0:
-        return False
-    else:
-        total = 0
-        for i in bal:
-            total = total + i[0]
-        return total
+    return _backend.all_money()
+
+
+# compare the bank_totals summary with a full scan of bank, returns (summary, actual) as (total, accounts)
+# pairs; with fix=True a drifted summary is overwritten with the actual figures
+def reconcile_totals(fix=False):
+    return _backend.reconcile_totals(fix)
 
 
 # return a list of all employees name
 def show_employees_for_update():
-    cur.execute("select * from staff")
-    detail = cur.fetchall()
-    return detail
+    return _backend.show_employees_for_update()
 
 
 # update employee name from data base
 def update_employee_name(new_name, old_name):
-    # print(new_name, old_name)
-    cur.execute("update staff set name='{}' where name='{}'".format(new_name, old_name))
-    conn.commit()
+    _backend.update_employee_name(new_name, old_name)
 
 
 def update_employee_password(new_pass, old_name):
-    # print(new_pass, old_name)
-    cur.execute("update staff set pass='{}' where name='{}'".format(new_pass, old_name))
-    conn.commit()
+    _backend.update_employee_password(new_pass, old_name)
 
 
 def update_employee_salary(new_salary, old_name):
-    # print(new_salary, old_name)
-    cur.execute(
-        "update staff set salary={} where name='{}'".format(new_salary, old_name)
-    )
-    conn.commit()
+    _backend.update_employee_salary(new_salary, old_name)
 
 
 def update_employee_position(new_pos, old_name):
-    # print(new_pos, old_name)
-    cur.execute(
-        "update staff set position='{}' where name='{}'".format(new_pos, old_name)
-    )
-    conn.commit()
+    _backend.update_employee_position(new_pos, old_name)
 
 
 # get name and balance from bank of a particular account number
 def get_detail(acc_no):
-    cur.execute("select name, balance from bank where acc_no=?", (acc_no,))
-    details = cur.fetchall()
-    return details
+    return _backend.get_detail(acc_no)
 
 
 def check_name_in_staff(name):
-    cur = conn.cursor()
-    cur.execute("select name from staff")
-    details = cur.fetchall()
-
-    for i in details:
-        if i[0] == name:
-            return True
-    return False
-
+    return _backend.check_name_in_staff(name)
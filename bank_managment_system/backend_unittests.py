@@ -1,6 +1,8 @@
 import unittest
 import sqlite3
 import os
+import threading
+import time
 from unittest.mock import patch, MagicMock
 # import bank_managment_system.backend as backend
 import backend
@@ -42,6 +44,10 @@ from shutil import copyfile
 
 class BackendUnitTests(unittest.TestCase):
 
+    #verified employee logins are cached across calls, start every test without any
+    def setUp(self):
+        backend.clear_employee_sessions()
+
     #test that the global connection object is initialized properly
     def test_connect_database_connection(self):
         #make a copy of the mock
@@ -127,52 +133,94 @@ class BackendUnitTests(unittest.TestCase):
         
         #dump the db so that it can be compared and check it against the pre-built dump
         dump_db("db_mocks/test_connect_database_table_creation_copy.db", "test_table_creation.sql")
-        self.assertTrue(filecmp.cmp(
-            "test_table_creation.sql",
-            "db_mocks/checks/test_table_creation_check.sql",
-            shallow=False))
+        #the shadow tables of the full-text index differ between FTS5 versions, and without FTS5
+        #there is no index to compare at all
+        def schema(path):
+            with open(path) as f:
+                lines = f.read().splitlines()
+            if not backend._backend.full_text:
+                return [line for line in lines
+                        if "bank_search" not in line and not line.startswith("PRAGMA writable_schema")]
+            return [line for line in lines
+                    if not line.startswith(("CREATE TABLE 'bank_search_", 'INSERT INTO "bank_search_'))]
+        self.assertEqual(schema("test_table_creation.sql"),
+                         schema("db_mocks/checks/test_table_creation_check.sql"))
         #cleanup
         backend.conn.close()
         os.remove("db_mocks/test_connect_database_table_creation_copy.db")
         os.remove("test_table_creation.sql")
 
+    #connecting again must not add admin rows, and copies left by older versions are removed
+    def test_connect_database_admin_bootstrap(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_connect_database_admin_bootstrap_copy.db")
+
+        con = sqlite3.connect("db_mocks/test_connect_database_admin_bootstrap_copy.db")
+        con.executemany("insert into admin values('arpit','123')", [(), ()])
+        con.commit()
+        con.close()
+
+        backend.connect_database("db_mocks/test_connect_database_admin_bootstrap_copy.db")
+        backend.conn.close()
+        backend.connect_database("db_mocks/test_connect_database_admin_bootstrap_copy.db")
+        backend.cur.execute("select * from admin")
+        self.assertEqual(backend.cur.fetchall(), [("arpit", "123")])
+        self.assertTrue(backend.check_admin("arpit", "123"))
+
+        #cleanup
+        backend.conn.close()
+        os.remove("db_mocks/test_connect_database_admin_bootstrap_copy.db")
+
+    def test_connect_database_profile(self):
+        copyfile(src="db_mocks/test_connect_database_connection.db",
+                 dst="db_mocks/test_connect_database_profile_copy.db")
+
+        backend.connect_database("db_mocks/test_connect_database_profile_copy.db", profile="throughput")
+        self.assertEqual(backend.active_settings(),
+                         {"profile": "throughput", "journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000,
+                          "cache_size": -64000, "temp_store": 2, "mmap_size": 268435456})
+
+        backend.conn.close()
+        backend.connect_database("db_mocks/test_connect_database_profile_copy.db")
+        self.assertEqual(backend.active_settings()["synchronous"], 2)
+        with self.assertRaises(ValueError):
+            backend.connect_database("db_mocks/test_connect_database_profile_copy.db", profile="fast")
+
+        #cleanup
+        backend.conn.close()
+        os.remove("db_mocks/test_connect_database_profile_copy.db")
+
     #NOTE: Having tested connect_database(), the rest of the tests can use mocks to avoid adding more database mocks (where possible)
 
     def test_check_admin_true(self):
         backend.conn = MagicMock()
         backend.cur = MagicMock()
-        backend.cur.fetchall = MagicMock( #mocking the call to the db that returns the admin credentials
-            return_value =    
-                [
-                    ["admin",
-                    "password"]
-                ]
+        backend.cur.fetchone = MagicMock( #mocking the keyed lookup that finds the admin credentials
+            return_value = [1]
         )
         self.assertTrue(backend.check_admin("admin", "password"))
+        backend.cur.execute.assert_called_once_with(
+            "select 1 from admin where name=? and pass=?", ("admin", "password"))
 
     def test_check_admin_wrong_pass(self):
         backend.conn = MagicMock()
         backend.cur = MagicMock()
-        backend.cur.fetchall = MagicMock( #mocking the call to the db that returns the admin credentials
-            return_value =    
-                [
-                    ["admin",
-                    "password"]
-                ]
+        backend.cur.fetchone = MagicMock( #mocking the keyed lookup that finds no matching admin
+            return_value = None
         )
         self.assertIsNone(backend.check_admin("admin", "incorrect_password"))
+        backend.cur.execute.assert_called_once_with(
+            "select 1 from admin where name=? and pass=?", ("admin", "incorrect_password"))
 
     def test_check_admin_wrong_user(self):
         backend.conn = MagicMock()
         backend.cur = MagicMock()
-        backend.cur.fetchall = MagicMock( #mocking the call to the db that returns the admin credentials
-            return_value =    
-                [
-                    ["admin",
-                    "password"]
-                ]
+        backend.cur.fetchone = MagicMock( #mocking the keyed lookup that finds no matching admin
+            return_value = None
         )
         self.assertIsNone(backend.check_admin("incorrect_admin", "password"))
+        backend.cur.execute.assert_called_once_with(
+            "select 1 from admin where name=? and pass=?", ("incorrect_admin", "password"))
 
     def test_create_employee(self):
         copyfile(src="db_mocks/test_create_employee.db",
@@ -196,39 +244,48 @@ class BackendUnitTests(unittest.TestCase):
     def test_check_employee_if1f_if2t(self):
         backend.conn = MagicMock()
         backend.cur = MagicMock()
-        backend.cur.fetchall = MagicMock( #mocking the call to the db that returns the admin credentials
-            return_value =    
-                [
-                    ["employee1",
-                    "password1"],
-                    ["employee2",
-                    "password2"]
-                ]
+        backend.cur.fetchone = MagicMock( #mocking the lookup by name that returns the stored password
+            return_value = ["password1"]
         )
         self.assertTrue(backend.check_employee("employee1", "password1"))
+        backend.cur.execute.assert_called_once_with("select pass from staff where name=?", ("employee1",))
     
     def test_check_employee_if1t(self):
         backend.conn = MagicMock()
         backend.cur = MagicMock()
-        backend.cur.fetchall = MagicMock( #mocking the call to the db that returns the admin credentials
-            return_value =    
-                []
+        backend.cur.fetchone = MagicMock( #mocking the lookup by name that finds no employee
+            return_value = None
         )
         self.assertFalse(backend.check_employee("employee1", "password1"))
     
     def test_check_employee_if1f_if2f(self):
         backend.conn = MagicMock()
         backend.cur = MagicMock()
-        backend.cur.fetchall = MagicMock( #mocking the call to the db that returns the admin credentials
-            return_value =    
-                [
-                    ["employee1",
-                    "password1"],
-                    ["employee2",
-                    "password2"]
-                ]
+        backend.cur.fetchone = MagicMock( #mocking the lookup by name that returns a different password
+            return_value = ["password1"]
         )
-        self.assertFalse(backend.check_employee("employee3", "password3"))
+        self.assertFalse(backend.check_employee("employee1", "password3"))
+
+    #a verified login is answered from the session cache until the password changes
+    def test_check_employee_session_cache(self):
+        copyfile(src="db_mocks/test_check_name_in_staff_if.db",
+                 dst="db_mocks/test_check_employee_session_cache_copy.db")
+
+        backend.connect_database("db_mocks/test_check_employee_session_cache_copy.db")
+        self.assertTrue(backend.check_employee("Ionescu Mirela", "pass1234"))
+
+        backend.cur = MagicMock(wraps=backend.cur)
+        self.assertTrue(backend.check_employee("Ionescu Mirela", "pass1234"))
+        backend.cur.execute.assert_not_called()
+        self.assertFalse(backend.check_employee("Ionescu Mirela", "wrong"))
+
+        backend.update_employee_password(new_pass="newpassword", old_name="Ionescu Mirela")
+        self.assertFalse(backend.check_employee("Ionescu Mirela", "pass1234"))
+        self.assertTrue(backend.check_employee("Ionescu Mirela", "newpassword"))
+
+        # cleanup
+        backend.conn.close()
+        os.remove("db_mocks/test_check_employee_session_cache_copy.db")
 
     def test_create_customer(self):
         copyfile(src="db_mocks/test_create_customer.db",
@@ -250,6 +307,23 @@ class BackendUnitTests(unittest.TestCase):
         os.remove("test_create_customer.sql")
         os.remove("db_mocks/test_create_customer_copy.db")
 
+    #deleting the newest account must not hand its number out again
+    def test_create_customer_number_not_reused(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_create_customer_number_not_reused_copy.db")
+
+        backend.connect_database("db_mocks/test_create_customer_number_not_reused_copy.db")
+        self.assertEqual(backend.create_customer("name", 1, "address", 1, "acc_type", 1), 3)
+        backend.delete_acc(3)
+
+        backend.connect_database("db_mocks/test_create_customer_number_not_reused_copy.db")
+        self.assertEqual(backend.acc_no, 4)
+        self.assertEqual(backend.create_customer("name", 1, "address", 1, "acc_type", 1), 4)
+
+        #cleanup
+        backend.conn.close()
+        os.remove("db_mocks/test_create_customer_number_not_reused_copy.db")
+
     #3 teste pentru aceasta functie - 2 pentru if: caz in care numarul se afla in lista, caz in care nu se afla; unul pentru for - lista vida
     #test pentru if -- numar care se afla in lista
     def test_check_acc_no_if(self):
@@ -296,6 +370,30 @@ class BackendUnitTests(unittest.TestCase):
         backend.conn.close()
         os.remove("db_mocks/test_check_acc_no_for_copy.db")
 
+    #with the cache on, unknown numbers are rejected without a query and create/delete keep it current
+    def test_check_acc_no_cache(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_check_acc_no_cache_copy.db")
+
+        backend.connect_database("db_mocks/test_check_acc_no_cache_copy.db")
+        backend.enable_acc_no_cache()
+        self.assertEqual(backend.acc_no_cache, {1, 2})
+
+        backend.cur = MagicMock(wraps=backend.cur)
+        self.assertFalse(backend.check_acc_no("5"))
+        backend.cur.execute.assert_not_called()
+
+        new_acc_no = backend.create_customer("name", 1, "address", 1, "acc_type", 1)
+        self.assertTrue(backend.check_acc_no(new_acc_no))
+        backend.delete_acc(1)
+        self.assertFalse(backend.check_acc_no(1))
+        self.assertEqual(backend.acc_no_cache, {2, new_acc_no})
+
+        # cleanup
+        backend.disable_acc_no_cache()
+        backend.conn.close()
+        os.remove("db_mocks/test_check_acc_no_cache_copy.db")
+
     #2 cazuri: pentru if- nu exista persoana cu acel acc_number, else - exista
     def test_get_details_if(self):
         # make a copy of the mock
@@ -337,13 +435,78 @@ class BackendUnitTests(unittest.TestCase):
         backend.conn.close()
         os.remove("db_mocks/test_get_details_else_copy.db")
 
+    def test_read_cache(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_read_cache_copy.db")
+
+        backend.connect_database("db_mocks/test_read_cache_copy.db")
+        backend.enable_read_cache()
+        self.assertEqual(backend.check_balance(1), 1250)
+        self.assertEqual(backend.get_detail("1"), [("Ionescu Maria", 1250)])
+        self.assertFalse(backend.get_details(3))
+
+        # repeated reads never reach the database
+        backend.cur = MagicMock(wraps=backend.cur)
+        self.assertEqual(backend.check_balance("1"), 1250)
+        self.assertEqual(backend.get_detail(1), [("Ionescu Maria", 1250)])
+        self.assertFalse(backend.get_details(3))
+        backend.cur.execute.assert_not_called()
+        self.assertEqual(backend.read_cache_stats()["hits"], 3)
+        self.assertEqual(backend.read_cache_stats()["misses"], 3)
+        backend.cur = backend.conn.cursor()
+
+        # every write path drops what it touched
+        backend.update_balance(50, 1)
+        self.assertEqual(backend.check_balance(1), 1300)
+        backend.deduct_balance(100, "1")
+        self.assertEqual(backend.get_detail(1), [("Ionescu Maria", 1200)])
+        backend.post_batch([(1, 200, "deposit")])
+        self.assertEqual(backend.check_balance(1), 1400)
+        backend.update_name_in_bank_table("Ionescu Ana", 1)
+        self.assertEqual(backend.get_detail(1), [("Ionescu Ana", 1400)])
+        new_acc_no = backend.create_customer("name", 1, "address", 5, "acc_type", 1)
+        self.assertEqual(new_acc_no, 3)
+        self.assertEqual(backend.get_details(3), (3, "name", 1, "address", 5, "acc_type", 1))
+        backend.delete_acc(3)
+        self.assertFalse(backend.get_details(3))
+
+        # cleanup
+        backend.disable_read_cache()
+        backend.conn.close()
+        os.remove("db_mocks/test_read_cache_copy.db")
+
+    def test_read_cache_eviction(self):
+        cache = backend.ReadCache(size=2, ttl=60)
+        load = MagicMock(side_effect=lambda cur, acc_no: acc_no * 10)
+        for acc_no in (1, 2, 1, 3):
+            cache.read("check_balance", acc_no, load, None)
+        # 2 was the least recently used one
+        self.assertEqual(cache.read("check_balance", 1, load, None), 10)
+        self.assertEqual(cache.read("check_balance", 2, load, None), 20)
+        self.assertEqual(load.call_count, 4)
+        self.assertEqual(cache.stats(), {"size": 2, "capacity": 2, "hits": 2, "misses": 4, "evictions": 2})
+
+        # expired entries are loaded again
+        cache.ttl = 0
+        cache.read("check_balance", 5, load, None)
+        cache.read("check_balance", 5, load, None)
+        self.assertEqual(load.call_count, 6)
+
+        # a read started before an invalidation does not store its result
+        def stale(cur, acc_no):
+            cache.invalidate([acc_no])
+            return "old"
+        cache.ttl = 60
+        cache.read("get_details", 7, stale, None)
+        self.assertEqual(cache.read("get_details", 7, load, None), 70)
+
     def test_update_balance(self):
         copyfile(src="db_mocks/test_update_balance.db",
                  dst="db_mocks/test_update_balance_copy.db")
 
         backend.conn = sqlite3.connect("db_mocks/test_update_balance_copy.db")
         backend.cur = backend.conn.cursor()
-        backend.update_balance(new_money=2, acc_no=1)
+        self.assertEqual(backend.update_balance(new_money=2, acc_no=1), 3)
         
         dump_db("db_mocks/test_update_balance_copy.db", "test_update_balance.sql")
 
@@ -394,6 +557,283 @@ class BackendUnitTests(unittest.TestCase):
         os.remove("test_deduct_balance_ift.sql")
         os.remove("db_mocks/test_update_balance_copy.db")
 
+    #two tellers withdrawing at once must not both spend the same money
+    def test_deduct_balance_concurrent(self):
+        copyfile(src="db_mocks/test_update_balance.db",
+                 dst="db_mocks/test_deduct_balance_concurrent_copy.db")
+
+        backend.conn = sqlite3.connect("db_mocks/test_deduct_balance_concurrent_copy.db")
+        backend.cur = backend.conn.cursor()
+        other = sqlite3.connect("db_mocks/test_deduct_balance_concurrent_copy.db")
+
+        #the other teller has already read the balance when this one withdraws everything
+        self.assertEqual(other.execute("select balance from bank where acc_no=1").fetchall(), [(1,)])
+        self.assertTrue(backend.deduct_balance(new_money=1, acc_no=1))
+        self.assertIsNone(backend._withdraw(other.cursor(), 1, 1))
+        other.commit()
+        self.assertEqual(backend.check_balance(acc_no=1), 0)
+
+        #cleanup
+        other.close()
+        backend.conn.close()
+        os.remove("db_mocks/test_deduct_balance_concurrent_copy.db")
+
+    def test_post_batch(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_post_batch_copy.db")
+
+        backend.connect_database("db_mocks/test_post_batch_copy.db")
+        postings = [(1, 100, "deposit"),
+                    (2, 700, "withdraw"),    #only 600 on the account
+                    ("2", "50", "deposit"),
+                    (2, 650, "withdraw"),    #covered by the deposit in the previous chunk
+                    (5, 10, "deposit"),      #no such account
+                    (1, 10, "transfer"),
+                    (1, -10, "deposit")]
+        rejected = backend.post_batch(iter(postings), chunk_size=3)
+
+        self.assertEqual(rejected, [(2, 700, "withdraw"), (5, 10, "deposit"),
+                                    (1, 10, "transfer"), (1, -10, "deposit")])
+        self.assertEqual(backend.check_balance(1), 1350)
+        self.assertEqual(backend.check_balance(2), 0)
+
+        #cleanup
+        backend.conn.close()
+        os.remove("db_mocks/test_post_batch_copy.db")
+
+    #malformed records are rejected without stopping the batch, whatever chunk they fall in
+    def test_post_batch_malformed(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_post_batch_malformed_copy.db")
+
+        backend.connect_database("db_mocks/test_post_batch_malformed_copy.db")
+        postings = [(1, 100, "deposit"), (1, 5), 7, None, (2, 50, "deposit", "extra"), (2, 50, "deposit")]
+        rejected = backend.post_batch(iter(postings), chunk_size=2)
+
+        self.assertEqual(rejected, [(1, 5), 7, None, (2, 50, "deposit", "extra")])
+        self.assertEqual(backend.check_balance(1), 1350)
+        self.assertEqual(backend.check_balance(2), 650)
+
+        #cleanup
+        backend.conn.close()
+        os.remove("db_mocks/test_post_batch_malformed_copy.db")
+
+    #a NULL balance counts as 0 and amounts with a fraction are rejected instead of rounded
+    def test_post_batch_null_fraction(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_post_batch_null_fraction_copy.db")
+
+        backend.connect_database("db_mocks/test_post_batch_null_fraction_copy.db")
+        backend.conn.execute("update bank set balance = null where acc_no = 2")
+        backend.conn.commit()
+        postings = [(2, 10, "withdraw"), (2, 30, "deposit"), (1, 10.7, "deposit"), (1, "10.7", "deposit"),
+                    (1, 20.0, "deposit")]
+        rejected = backend.post_batch(iter(postings), chunk_size=2)
+
+        self.assertEqual(rejected, [(2, 10, "withdraw"), (1, 10.7, "deposit"), (1, "10.7", "deposit")])
+        self.assertEqual(backend.check_balance(1), 1270)
+        self.assertEqual(backend.check_balance(2), 30)
+
+        #cleanup
+        backend.conn.close()
+        os.remove("db_mocks/test_post_batch_null_fraction_copy.db")
+
+    def test_import_customers(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_import_customers_copy.db")
+
+        backend.connect_database("db_mocks/test_import_customers_copy.db")
+        backend.enable_acc_no_cache()
+        records = [{"name": "Rusu Ana", "age": "30", "address": "Albu Street", "balance": "100",
+                    "account_type": "savings", "mobile_number": "0712"},
+                   ("Stan Dan", 41, "Main Street", 5, "current", 744),
+                   ("Stan Dan", "x", "Main Street", 5, "current", 744),    #age is not a number
+                   ("Ene Ion", 22, " ", 5, "current", 744),                #no address
+                   ("Ene Ion", 22),
+                   ("Dinu Mara", 50, "Oak Street", 0, "savings", 755)]
+        refused = []
+        imported = backend.import_customers(iter(records), chunk_size=2,
+                                            on_reject=lambda record, reason: refused.append(reason))
+
+        self.assertEqual(imported, 3)
+        self.assertEqual(refused, ["age is not a number", "missing address", "expected 6 fields, got 2"])
+        self.assertEqual(backend.get_details(3), (3, "Rusu Ana", 30, "Albu Street", 100, "savings", 712))
+        self.assertEqual(backend.list_customers_page(columns=["acc_no", "name"])[0],
+                         [(1, "Ionescu Maria"), (2, "Popescu Ion"), (3, "Rusu Ana"), (4, "Stan Dan"), (5, "Dinu Mara")])
+        self.assertEqual(backend.acc_no, 6)
+        self.assertTrue(backend.check_acc_no(5))
+
+        #everything the triggers keep up to date sees the imported rows
+        self.assertEqual(backend.search_customers("stan")[0][0][0], 4)
+        self.assertEqual(backend.all_money(), 1250 + 600 + 105)
+        backend.cur.execute("select acc_no, kind, amount from ledger order by id")
+        self.assertEqual(backend.cur.fetchall(), [(3, "open", 100), (4, "open", 5), (5, "open", 0)])
+        backend.cur.execute("select name from sqlite_master where name='bank_search_insert'")
+        self.assertIsNotNone(backend.cur.fetchone())
+
+        #cleanup
+        backend.disable_acc_no_cache()
+        backend.conn.close()
+        os.remove("db_mocks/test_import_customers_copy.db")
+
+    def test_ledger(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_ledger_copy.db")
+
+        backend.connect_database("db_mocks/test_ledger_copy.db")
+        #the accounts that were already there start from a snapshot
+        backend.cur.execute("select acc_no, balance, ledger_id from balance_snapshots order by acc_no")
+        self.assertEqual(backend.cur.fetchall(), [(1, 1250, 0), (2, 600, 0)])
+
+        backend.update_balance(100, 1)
+        self.assertFalse(backend.deduct_balance(1000, 2))    #refused, nothing to record
+        backend.post_batch([(2, 50, "withdraw"), (1, 10, "deposit")])
+        new_acc_no = backend.create_customer("name", 1, "address", 5, "acc_type", 1)
+        backend.delete_acc(2)
+        backend.cur.execute("select acc_no, kind, amount from ledger order by id")
+        self.assertEqual(backend.cur.fetchall(), [(1, "deposit", 100), (2, "withdraw", -50), (1, "deposit", 10),
+                                                  (new_acc_no, "open", 5), (2, "close", -550)])
+
+        #a write that is rolled back leaves no entry behind, and entries can never be changed
+        backend.cur.execute("begin")
+        backend.cur.execute("update bank set balance = 0 where acc_no = 1")
+        backend.conn.rollback()
+        with self.assertRaises(sqlite3.IntegrityError):
+            backend.cur.execute("update ledger set amount = 0")
+        with self.assertRaises(sqlite3.IntegrityError):
+            backend.cur.execute("delete from ledger")
+        backend.cur.execute("select count(*) from ledger")
+        self.assertEqual(backend.cur.fetchone()[0], 5)
+
+        #cleanup
+        backend.conn.close()
+        os.remove("db_mocks/test_ledger_copy.db")
+
+    def test_balance_as_of(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_balance_as_of_copy.db")
+
+        backend.connect_database("db_mocks/test_balance_as_of_copy.db")
+        times = []
+        for amount in (100, 200, 300):
+            time.sleep(0.01)
+            backend.update_balance(amount, 1)
+            time.sleep(0.01)
+            times.append(time.time())
+            if amount == 200:
+                self.assertEqual(backend.snapshot_balances(), 1)    #only account 1 moved
+                self.assertEqual(backend.snapshot_balances(), 0)
+
+        self.assertEqual([backend.balance_as_of(1, t) for t in times], [1350, 1550, 1850])
+        self.assertEqual(backend.balance_as_of(2, times[2]), 600)
+        self.assertIsNone(backend.balance_as_of(1, 0))    #before the ledger existed
+        time.sleep(0.01)
+        new_acc_no = backend.create_customer("name", 1, "address", 5, "acc_type", 1)
+        self.assertEqual(backend.balance_as_of(new_acc_no, time.time() + 1), 5)
+        self.assertIsNone(backend.balance_as_of(new_acc_no, times[2]))
+
+        #the lookup starts from the snapshot and reads only what came after it
+        backend.cur.execute("explain query plan " + backend.STATEMENTS["ledger_sum"], (1, 0, 0, 0))
+        self.assertIn("USING INDEX ledger_acc_ts (acc_no=? AND ts>? AND ts<?)", str(backend.cur.fetchall()))
+
+        opening, entries = backend.account_statement(1, times[0], times[2])
+        self.assertEqual(opening, 1350)
+        self.assertEqual([entry[1:] for entry in entries], [("deposit", 200, 1550), ("deposit", 300, 1850)])
+
+        #cleanup
+        backend.conn.close()
+        os.remove("db_mocks/test_balance_as_of_copy.db")
+
+    #several tellers sharing one Backend, plus the module functions called from another thread
+    def test_backend_threads(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_backend_threads_copy.db")
+
+        bank = backend.Backend("db_mocks/test_backend_threads_copy.db")
+        backend.connect_database("db_mocks/test_backend_threads_copy.db")
+
+        refused = []
+
+        def teller():
+            for _ in range(25):
+                bank.update_balance(1, 1)
+                if not bank.deduct_balance(1, 2):
+                    refused.append(2)
+            bank.pool.release()
+
+        def module_teller():
+            for _ in range(25):
+                backend.update_balance(2, 1)
+            backend._backend.pool.release()
+
+        threads = [threading.Thread(target=teller) for _ in range(4)] + [threading.Thread(target=module_teller)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(refused, [])
+        self.assertEqual(bank.check_balance(1), 1250 + 100 + 50)
+        self.assertEqual(backend.check_balance(2), 600 - 100)
+        self.assertEqual(len(bank.pool._connections), 1)
+
+        #cleanup
+        bank.close()
+        backend.conn.close()
+        os.remove("db_mocks/test_backend_threads_copy.db")
+
+    def test_group_commit(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_group_commit_copy.db")
+
+        bank = backend.Backend("db_mocks/test_group_commit_copy.db")
+        bank.enable_group_commit(window=0.2, max_ops=100)
+        errors = []
+
+        #a write that fails halfway must be undone without taking the rest of its batch down
+        def failing_op(cur):
+            backend._deposit(cur, 1000, 1)
+            raise ValueError("teller cancelled")
+
+        def failing_teller():
+            try:
+                bank._write(failing_op)
+            except ValueError as error:
+                errors.append(error)
+
+        #another process holds the write lock, so the first batch stalls and the others queue up behind it
+        blocker = sqlite3.connect("db_mocks/test_group_commit_copy.db")
+        blocker.execute("begin immediate")
+        threads = [threading.Thread(target=bank.update_balance, args=(1, n % 2 + 1)) for n in range(10)]
+        threads.append(threading.Thread(target=failing_teller))
+        for thread in threads:
+            thread.start()
+        while bank.group_commit._waiting < 11:
+            time.sleep(0.01)
+        blocker.rollback()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(bank.group_commit.commits, 2)
+        self.assertEqual(bank.check_balance(1), 1250 + 5)
+        self.assertEqual(bank.check_balance(2), 600 + 5)
+
+        #a writer that picked up the committer just before it was stopped writes on its own connection
+        stopped = bank.group_commit
+        bank.disable_group_commit()
+        with self.assertRaises(backend.GroupCommitStopped):
+            stopped.submit(backend._deposit, 1, 1)
+        bank.group_commit = stopped
+        self.assertTrue(bank.deduct_balance(10, 2))
+        self.assertEqual(bank.check_balance(2), 600 + 5 - 10)
+        bank.group_commit = None
+
+        #cleanup
+        blocker.close()
+        bank.close()
+        os.remove("db_mocks/test_group_commit_copy.db")
+
     def test_check_balance(self):
         copyfile(src="db_mocks/test_check_balance.db",
                  dst="db_mocks/test_check_balance_copy.db")
@@ -430,6 +870,24 @@ class BackendUnitTests(unittest.TestCase):
         os.remove("test_update_name_in_bank_table.sql")
         os.remove("db_mocks/test_update_name_in_bank_table_copy.db")
 
+    #values are bound, not formatted into the SQL, so quotes are stored as typed
+    def test_update_name_in_bank_table_quote(self):
+        copyfile(src="db_mocks/test_update_name_in_bank_table.db",
+                 dst="db_mocks/test_update_name_in_bank_table_quote_copy.db")
+
+        backend.conn = sqlite3.connect("db_mocks/test_update_name_in_bank_table_quote_copy.db")
+        backend.cur = backend.conn.cursor()
+        backend.update_name_in_bank_table(new_name="O'Brien", acc_no=1)
+        backend.update_employee_position(new_pos="teller", old_name="x' or '1'='1")
+
+        self.assertEqual(backend.get_detail(1)[0][0], "O'Brien")
+        backend.cur.execute("select count(*) from staff where position='teller'")
+        self.assertEqual(backend.cur.fetchone()[0], 0)
+
+        # cleanup
+        backend.conn.close()
+        os.remove("db_mocks/test_update_name_in_bank_table_quote_copy.db")
+
     def test_update_age_in_bank_table(self):
         copyfile(src="db_mocks/test_update_age_in_bank_table.db",
                  dst="db_mocks/test_update_age_in_bank_table_copy.db")
@@ -495,6 +953,124 @@ class BackendUnitTests(unittest.TestCase):
         backend.conn.close()
         os.remove("db_mocks/test_list_all_customers_copy.db")
 
+    def test_list_customers_page(self):
+        copyfile(src="db_mocks/test_list_all_customers.db",
+                 dst="db_mocks/test_list_customers_page_copy.db")
+
+        backend.connect_database("db_mocks/test_list_customers_page_copy.db")
+        backend.cur.executemany(
+            "insert into bank values(?,?,?,?,?,?,?)",
+            [(1, "Popescu Ion", 28, "25th Street, NY", 100, "acc_type_1", 1),
+             (2, "Ionescu Ion", 23, "28th Street, NY", 500, "acc_type_1", 1),
+             (3, "Albu Ana", 31, "3rd Street, NY", 100, "acc_type_2", 1)])
+        backend.conn.commit()
+
+        rows, after = backend.list_customers_page(page_size=2, columns=["name"])
+        self.assertEqual((rows, after), ([("Popescu Ion",), ("Ionescu Ion",)], (2,)))
+        rows, after = backend.list_customers_page(after, page_size=2, columns=["name"])
+        self.assertEqual((rows, after), ([("Albu Ana",)], None))
+
+        #sorting on a non unique column keeps the pages disjoint
+        self.assertEqual(list(backend.iter_customers(page_size=1, columns=["acc_no"],
+                                                     order_by="balance", descending=True)),
+                         [(2,), (3,), (1,)])
+        with self.assertRaises(ValueError):
+            backend.list_customers_page(columns=["name; drop table bank"])
+
+        # cleanup
+        backend.conn.close()
+        os.remove("db_mocks/test_list_customers_page_copy.db")
+
+    def test_search_customers(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_search_customers_copy.db")
+
+        #the index is built for the rows already there when the database is opened
+        backend.connect_database("db_mocks/test_search_customers_copy.db")
+        self.assertEqual(backend.search_customers("popes")[0][0][:2], (2, "Popescu Ion"))
+        self.assertEqual(backend.search_customers("5214")[0][0][0], 2)
+        self.assertEqual(backend.search_customers('street "NY')[0][0][0], 1)
+
+        #every write is mirrored by the triggers
+        backend.update_name_in_bank_table("Albu Ion", 2)
+        new_acc_no = backend.create_customer("Rusu Ana", 30, "1st Street, NY", 100, "acc_type_1", 123)
+        backend.delete_acc(1)
+        self.assertEqual(backend.search_customers("popescu"), ([], None))
+        self.assertEqual(backend.search_customers("albu")[0][0][:2], (2, "Albu Ion"))
+        self.assertEqual(backend.search_customers("rus 123")[0][0][0], new_acc_no)
+
+        #ranked pages, a match on the name counts more than one on the address
+        backend.update_address_in_bank_table("Albu Street", new_acc_no)
+        rows, after = backend.search_customers("albu", page_size=1)
+        self.assertEqual(rows[0][0], 2)
+        rows, after = backend.search_customers("albu", after, page_size=1)
+        self.assertEqual((rows[0][0], after[1]), (new_acc_no, new_acc_no))
+        self.assertEqual(backend.search_customers("albu", after, page_size=1), ([], None))
+
+        #without FTS5 the same call falls back to LIKE
+        backend._backend.full_text = False
+        self.assertEqual([row[0] for row in backend.search_customers("Albu")[0]], [2, new_acc_no])
+        self.assertEqual(backend.search_customers("%"), ([], None))
+
+        # cleanup
+        backend.conn.close()
+        os.remove("db_mocks/test_search_customers_copy.db")
+
+    def test_list_employees_page(self):
+        copyfile(src="db_mocks/test_show_employees.db",
+                 dst="db_mocks/test_list_employees_page_copy.db")
+
+        backend.connect_database("db_mocks/test_list_employees_page_copy.db")
+        backend.cur.executemany(
+            "insert into staff values(?,?,?,?)",
+            [("Popescu Ion", "p1", 3000, "teller"),
+             ("Albu Ana", "p2", 2500, "manager"),
+             ("Ionescu Ion", "p3", 3000, "teller")])
+        backend.conn.commit()
+
+        rows, after = backend.list_employees_page(page_size=2, columns=["name"], order_by="salary",
+                                                  descending=True)
+        self.assertEqual((rows, after), ([("Popescu Ion",), ("Ionescu Ion",)], (3000, "Ionescu Ion")))
+        rows, after = backend.list_employees_page(after, page_size=2, columns=["name"], order_by="salary",
+                                                  descending=True)
+        self.assertEqual((rows, after), ([("Albu Ana",)], None))
+        with self.assertRaises(ValueError):
+            backend.list_employees_page(columns=["balance"])
+
+        #sorting customers by name walks the index instead of sorting the table
+        for start, params in (("first", (10,)), ("value", ("a", 1, 10)), ("null", (1, 10)), ("values", (10,))):
+            backend.cur.execute("explain query plan " + backend._listing_sql("bank", ("acc_no",), "name", False, start),
+                                params)
+            self.assertNotIn("TEMP B-TREE", " ".join(row[3] for row in backend.cur.fetchall()))
+
+        # cleanup
+        backend.conn.close()
+        os.remove("db_mocks/test_list_employees_page_copy.db")
+
+    #NULLs sort first (last descending) and paging runs through them instead of stopping there
+    def test_list_customers_page_nulls(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_list_customers_page_nulls_copy.db")
+
+        backend.connect_database("db_mocks/test_list_customers_page_nulls_copy.db")
+        backend.cur.executemany("insert into bank values(?,?,?,?,?,?,?)",
+                                [(3, None, 40, "Albu Street", None, "acc_type_1", 1),
+                                 (4, "Albu Ana", 50, "Albu Street", 600, "acc_type_1", 2),
+                                 (5, None, 20, "Albu Street", 10, "acc_type_1", 3)])
+        backend.conn.commit()
+
+        for order_by, expected in (("name", [3, 5, 4, 1, 2]), ("balance", [3, 5, 2, 4, 1])):
+            for page_size in (1, 2, 3):
+                rows = backend.iter_customers(page_size=page_size, columns=["acc_no"], order_by=order_by)
+                self.assertEqual([row[0] for row in rows], expected)
+                rows = backend.iter_customers(page_size=page_size, columns=["acc_no"], order_by=order_by,
+                                              descending=True)
+                self.assertEqual([row[0] for row in rows], expected[::-1])
+
+        # cleanup
+        backend.conn.close()
+        os.remove("db_mocks/test_list_customers_page_nulls_copy.db")
+
     def test_delete_acc(self):
         copyfile(src="db_mocks/test_delete_acc.db",
                  dst="db_mocks/test_delete_acc_copy.db")
@@ -584,6 +1160,29 @@ class BackendUnitTests(unittest.TestCase):
         backend.conn.close()
         os.remove("db_mocks/test_all_money_else_copy.db")
 
+    #every write path moves the summary, and reconcile finds and repairs drift
+    def test_all_money_summary(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_all_money_summary_copy.db")
+
+        backend.connect_database("db_mocks/test_all_money_summary_copy.db")
+        self.assertEqual(backend.all_money(), 1850)
+        new_acc_no = backend.create_customer("name", 1, "address", 150, "acc_type", 1)
+        backend.update_balance(100, 1)
+        backend.deduct_balance(200, 2)
+        backend.post_batch([(new_acc_no, 50, "withdraw")])
+        backend.delete_acc(1)
+        self.assertEqual(backend.all_money(), 500)
+        self.assertEqual(backend.reconcile_totals(), ((500, 2), (500, 2)))
+
+        backend.cur.execute("update bank_totals set total = 0")
+        self.assertEqual(backend.reconcile_totals(fix=True), ((0, 2), (500, 2)))
+        self.assertEqual(backend.all_money(), 500)
+
+        # cleanup
+        backend.conn.close()
+        os.remove("db_mocks/test_all_money_summary_copy.db")
+
     def test_show_employees_for_update(self):
         copyfile(src="db_mocks/test_show_employees_for_update.db",
                  dst="db_mocks/test_show_employees_for_update_copy.db")
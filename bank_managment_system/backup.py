@@ -0,0 +1,111 @@
+from datetime import datetime
+from os.path import basename, exists, join, splitext
+import argparse
+import os
+import re
+import sqlite3
+
+
+# raised from the progress callback to stop a stepwise copy that keeps being restarted
+class _Restarted(Exception):
+    pass
+
+
+def _copy(source, target, pages, sleep, max_restarts):
+    """Copies source into target pages at a time, sleeping in between so writers get the database.
+       A write from another connection makes SQLite start the copy over, so a step can end no further
+       than the one before; after max_restarts of those the copy is redone in a single step, which in
+       WAL mode still lets writers carry on."""
+    restarts = 0
+    last = None
+
+    def progress(status, remaining, total):
+        nonlocal restarts, last
+        if last is not None and remaining >= last:
+            restarts = restarts + 1
+            print("backup: restarted, the database was written to")
+            if restarts > max_restarts:
+                raise _Restarted()
+        last = remaining
+        done = total - remaining
+        print("backup: {}% ({}/{} pages)".format(done * 100 // max(total, 1), done, total))
+
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    try:
+        try:
+            src.backup(dst, pages=pages, progress=progress, sleep=sleep)
+        except _Restarted:
+            print("backup: copying in one step")
+            src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def _rotate(backup_dir, prefix, keep, target):
+    """Deletes all but the newest keep backups of one database, never target, returns the ones deleted.
+       Only names backup() gives this database count, not those of another whose name starts the same."""
+    pattern = re.compile(re.escape(prefix) + r"-\d{8}-\d{6}-\d{6}\.db")
+    # target is always one of the keep
+    backups = sorted(name for name in os.listdir(backup_dir)
+                     if pattern.fullmatch(name) and name != basename(target))
+    removed = backups[:max(len(backups) - (keep - 1), 0)] if keep > 0 else []
+    for name in removed:
+        os.remove(join(backup_dir, name))
+    return removed
+
+
+def backup(path, backup_dir=".", pages=1024, sleep=0.05, verify=True, keep=7, max_restarts=3):
+    """Expects the path to a database that can stay in use while it runs.
+       Copies it to <backup_dir>/<name>-<timestamp>.db with the SQLite backup API, pages at a time with
+       sleep seconds in between, printing the progress. With verify the copy must pass
+       PRAGMA integrity_check before it takes its final name. Afterwards only the newest keep backups
+       of the database are left in backup_dir (keep=0 leaves them all).
+       Returns the path of the new backup."""
+    if not exists(path):
+        raise Exception("No such file")
+
+    prefix = splitext(basename(path))[0]
+    target = join(backup_dir, "{}-{}.db".format(prefix, datetime.now().strftime("%Y%m%d-%H%M%S-%f")))
+    # a copy that fails halfway never looks like a backup to the rotation
+    partial = target + ".part"
+    try:
+        _copy(path, partial, pages, sleep, max_restarts)
+    except Exception:
+        if exists(partial):
+            os.remove(partial)
+        raise
+
+    if verify:
+        con = sqlite3.connect(partial)
+        try:
+            result = con.execute("pragma integrity_check").fetchall()
+        finally:
+            con.close()
+        if result != [("ok",)]:
+            os.remove(partial)
+            raise Exception("Backup failed integrity_check: {}".format("; ".join(row[0] for row in result)))
+        print("backup: integrity_check ok")
+
+    os.replace(partial, target)
+    for name in _rotate(backup_dir, prefix, keep, target):
+        print("backup: removed {}".format(name))
+    print("backup: {}".format(target))
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy a live database with the SQLite backup API.")
+    parser.add_argument("path")
+    parser.add_argument("backup_dir", nargs="?", default=".")
+    parser.add_argument("--pages", type=int, default=1024, help="pages copied per step")
+    parser.add_argument("--sleep", type=float, default=0.05, help="seconds between steps")
+    parser.add_argument("--keep", type=int, default=7, help="backups of the database kept in backup_dir")
+    parser.add_argument("--no-verify", dest="verify", action="store_false")
+    args = parser.parse_args()
+    backup(args.path, args.backup_dir, args.pages, args.sleep, args.verify, args.keep)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import unittest
+import sqlite3
+import os
+import backup
+from shutil import copyfile, rmtree
+from unittest.mock import patch
+
+
+class BackupUnitTests(unittest.TestCase):
+
+    def test_backup_rotation(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_backup_rotation_copy.db")
+        os.mkdir("test_backup_rotation")
+
+        paths = [backup.backup("db_mocks/test_backup_rotation_copy.db", "test_backup_rotation", pages=1, sleep=0, keep=2)
+                 for _ in range(3)]
+        self.assertEqual(sorted(os.listdir("test_backup_rotation")), [os.path.basename(p) for p in paths[1:]])
+        con = sqlite3.connect(paths[2])
+        self.assertEqual(con.execute("select acc_no, balance from bank").fetchall(), [(1, 1250), (2, 600)])
+
+        #cleanup
+        con.close()
+        rmtree("test_backup_rotation")
+        os.remove("db_mocks/test_backup_rotation_copy.db")
+
+    #rotation leaves alone the backups of another database whose name starts with this one's
+    def test_backup_rotation_prefix(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_backup_prefix_copy.db")
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_backup_prefix_copy-archive.db")
+        os.mkdir("test_backup_prefix")
+
+        archive = backup.backup("db_mocks/test_backup_prefix_copy-archive.db", "test_backup_prefix", pages=1, sleep=0,
+                                keep=1)
+        first = backup.backup("db_mocks/test_backup_prefix_copy.db", "test_backup_prefix", pages=1, sleep=0, keep=1)
+        second = backup.backup("db_mocks/test_backup_prefix_copy.db", "test_backup_prefix", pages=1, sleep=0, keep=1)
+        self.assertEqual(sorted(os.listdir("test_backup_prefix")),
+                         sorted(os.path.basename(p) for p in (archive, second)))
+        self.assertNotEqual(first, second)
+
+        #cleanup
+        rmtree("test_backup_prefix")
+        os.remove("db_mocks/test_backup_prefix_copy.db")
+        os.remove("db_mocks/test_backup_prefix_copy-archive.db")
+
+    #a copy that the application keeps writing to underneath is finished in one step
+    def test_backup_restarts(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_backup_restarts_copy.db")
+        con = sqlite3.connect("db_mocks/test_backup_restarts_copy.db")
+        con.execute("create table filler (data blob)")
+        con.executemany("insert into filler values (zeroblob(4000))", [()] * 20)
+        con.commit()
+
+        writes = []
+
+        def write_between_steps(text):
+            con.execute("update bank set balance = balance + 1 where acc_no = 1")
+            con.commit()
+            writes.append(text)
+
+        with patch("backup.print", side_effect=write_between_steps, create=True):
+            path = backup.backup("db_mocks/test_backup_restarts_copy.db", ".", pages=2, sleep=0, keep=0,
+                                 max_restarts=2)
+        self.assertEqual(writes.count("backup: restarted, the database was written to"), 3)
+        self.assertIn("backup: copying in one step", writes)
+        copy = sqlite3.connect(path)
+        self.assertEqual(copy.execute("pragma integrity_check").fetchall(), [("ok",)])
+
+        #cleanup
+        copy.close()
+        con.close()
+        os.remove(path)
+        os.remove("db_mocks/test_backup_restarts_copy.db")
+
+
+if __name__ == '__main__':
+    unittest.main()
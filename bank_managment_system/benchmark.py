@@ -0,0 +1,111 @@
+import functools
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import backend
+
+
+def _fresh_database(accounts):
+    """Connects the backend to a new database in a temporary directory holding the given number of accounts."""
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    backend.connect_database(path)
+    backend.cur.executemany(
+        "insert into bank values(?,?,?,?,?,?,?)",
+        ((i, "name", 30, "address", 1000, "savings", 1234) for i in range(1, accounts + 1)),
+    )
+    backend.conn.commit()
+    return path
+
+
+def _drop_database(path):
+    backend.conn.close()
+    shutil.rmtree(os.path.dirname(path))
+
+
+def bench_post_batch(postings=50000, accounts=10000):
+    """Posts random deposits and withdrawals through post_batch and returns the postings per second."""
+    path = _fresh_database(accounts)
+    records = [
+        (random.randint(1, accounts), random.randint(1, 500), random.choice(("deposit", "withdraw")))
+        for _ in range(postings)
+    ]
+
+    start = time.perf_counter()
+    backend.post_batch(records)
+    elapsed = time.perf_counter() - start
+
+    _drop_database(path)
+    return postings / elapsed
+
+
+def bench_update_statements(prepared=True, updates=20000, accounts=1000):
+    """Renames accounts inside a single transaction and returns the updates per second, either through the
+       registered statement or by formatting the values into the SQL like the update functions used to.
+       With one commit for the whole run, the difference between the two is the cost of parsing."""
+    path = _fresh_database(accounts)
+    cur = backend.cur
+
+    start = time.perf_counter()
+    for i in range(updates):
+        if prepared:
+            cur.execute(backend.STATEMENTS["update_name"], ("name{}".format(i), i % accounts + 1))
+        else:
+            cur.execute(
+                "update bank set name='{}' where acc_no={}".format("name{}".format(i), i % accounts + 1)
+            )
+    backend.conn.commit()
+    elapsed = time.perf_counter() - start
+
+    _drop_database(path)
+    return updates / elapsed
+
+
+def bench_group_commit(enabled=True, threads=8, writes=200, accounts=1000):
+    """Lets several teller threads deposit through one Backend with the durable profile and returns
+       the writes per second, with or without group commit."""
+    path = _fresh_database(accounts)
+    bank = backend.Backend(path)
+    if enabled:
+        bank.enable_group_commit()
+
+    def teller(seed):
+        for i in range(writes):
+            bank.update_balance(1, (seed * writes + i) % accounts + 1)
+        bank.pool.release()
+
+    workers = [threading.Thread(target=teller, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    bank.close()
+    _drop_database(path)
+    return threads * writes / elapsed
+
+
+BENCHMARKS = {
+    "post_batch": (bench_post_batch, "postings/s"),
+    "update_formatted": (functools.partial(bench_update_statements, prepared=False), "updates/s"),
+    "update_prepared": (bench_update_statements, "updates/s"),
+    "commit_each": (functools.partial(bench_group_commit, enabled=False), "writes/s"),
+    "group_commit": (bench_group_commit, "writes/s"),
+}
+
+
+def main():
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        bench, unit = BENCHMARKS[name]
+        print("{}: {:.0f} {}".format(name, bench(), unit))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 BEGIN TRANSACTION;
+CREATE TABLE acc_no_seq (last int);
+INSERT INTO "acc_no_seq" VALUES(1);
 CREATE TABLE admin (name text, pass text);
 INSERT INTO "admin" VALUES('arpit','123');
 CREATE TABLE bank (acc_no int, name text, age int, address text, balance int, account_type text, mobile_number int);
 INSERT INTO "bank" VALUES(1,'name',1,'address',1,'acc_type',1);
 CREATE TABLE staff (name text, pass text,salary int, position text);
+CREATE TRIGGER acc_no_seq_bump after insert on bank when new.acc_no > (select last from acc_no_seq) begin update acc_no_seq set last = new.acc_no; end;
 COMMIT;
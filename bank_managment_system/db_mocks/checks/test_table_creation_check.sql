@@ -1,6 +1,39 @@
 BEGIN TRANSACTION;
+CREATE TABLE acc_no_seq (last int);
+INSERT INTO "acc_no_seq" VALUES(0);
 CREATE TABLE admin (name text, pass text);
 INSERT INTO "admin" VALUES('arpit','123');
-CREATE TABLE bank (acc_no int, name text, age int, address text, balance int, account_type text, mobile_number int);
-CREATE TABLE staff (name text, pass text,salary int, position text);
+CREATE TABLE balance_snapshots (acc_no int, ts real, balance int, ledger_id int);
+CREATE TABLE bank (acc_no integer primary key, name text, age int, address text, balance int, account_type text, mobile_number int);
+PRAGMA writable_schema=ON;
+INSERT INTO sqlite_master(type,name,tbl_name,rootpage,sql)VALUES('table','bank_search','bank_search',0,'CREATE VIRTUAL TABLE bank_search using fts5(name, address, mobile_number, content=''bank'', content_rowid=''acc_no'', prefix=''2 3'')');
+CREATE TABLE 'bank_search_config'(k PRIMARY KEY, v) WITHOUT ROWID;
+INSERT INTO "bank_search_config" VALUES('rank','bm25(10.0, 1.0, 5.0)');
+INSERT INTO "bank_search_config" VALUES('version',4);
+CREATE TABLE 'bank_search_data'(id INTEGER PRIMARY KEY, block BLOB);
+INSERT INTO "bank_search_data" VALUES(1,X'00000000');
+INSERT INTO "bank_search_data" VALUES(10,X'00000001000000');
+CREATE TABLE 'bank_search_docsize'(id INTEGER PRIMARY KEY, sz BLOB);
+CREATE TABLE 'bank_search_idx'(segid, term, pgno, PRIMARY KEY(segid, term)) WITHOUT ROWID;
+CREATE TABLE bank_totals (total int, accounts int);
+INSERT INTO "bank_totals" VALUES(0,0);
+CREATE TABLE ledger (id integer primary key, acc_no int, ts real, kind text, amount int);
+CREATE TABLE staff (name text primary key, pass text, salary int, position text);
+CREATE UNIQUE INDEX admin_name on admin (name);
+CREATE TRIGGER acc_no_seq_bump after insert on bank when new.acc_no > (select last from acc_no_seq) begin update acc_no_seq set last = new.acc_no; end;
+CREATE TRIGGER bank_totals_insert after insert on bank begin update bank_totals set total = total + coalesce(new.balance, 0), accounts = accounts + 1; end;
+CREATE TRIGGER bank_totals_update after update of balance on bank begin update bank_totals set total = total - coalesce(old.balance, 0) + coalesce(new.balance, 0); end;
+CREATE TRIGGER bank_totals_delete after delete on bank begin update bank_totals set total = total - coalesce(old.balance, 0), accounts = accounts - 1; end;
+CREATE INDEX ledger_acc_ts on ledger (acc_no, ts);
+CREATE INDEX balance_snapshots_acc_ts on balance_snapshots (acc_no, ts);
+CREATE TRIGGER ledger_insert after insert on bank begin insert into ledger (acc_no, ts, kind, amount) values (new.acc_no, (julianday('now') - 2440587.5) * 86400.0, 'open', coalesce(new.balance, 0)); end;
+CREATE TRIGGER ledger_update after update of balance on bank when new.balance is not old.balance begin insert into ledger (acc_no, ts, kind, amount) values (new.acc_no, (julianday('now') - 2440587.5) * 86400.0, case when coalesce(new.balance, 0) > coalesce(old.balance, 0) then 'deposit' else 'withdraw' end, coalesce(new.balance, 0) - coalesce(old.balance, 0)); end;
+CREATE TRIGGER ledger_delete after delete on bank begin insert into ledger (acc_no, ts, kind, amount) values (old.acc_no, (julianday('now') - 2440587.5) * 86400.0, 'close', -coalesce(old.balance, 0)); end;
+CREATE TRIGGER ledger_no_update before update on ledger begin select raise(abort, 'the ledger is append-only'); end;
+CREATE TRIGGER ledger_no_delete before delete on ledger begin select raise(abort, 'the ledger is append-only'); end;
+CREATE INDEX bank_name on bank (name, acc_no);
+CREATE TRIGGER bank_search_insert after insert on bank begin insert into bank_search(rowid, name, address, mobile_number) values (new.acc_no, new.name, new.address, new.mobile_number); end;
+CREATE TRIGGER bank_search_delete after delete on bank begin insert into bank_search(bank_search, rowid, name, address, mobile_number) values ('delete', old.acc_no, old.name, old.address, old.mobile_number); end;
+CREATE TRIGGER bank_search_update after update of acc_no, name, address, mobile_number on bank begin insert into bank_search(bank_search, rowid, name, address, mobile_number) values ('delete', old.acc_no, old.name, old.address, old.mobile_number); insert into bank_search(rowid, name, address, mobile_number) values (new.acc_no, new.name, new.address, new.mobile_number); end;
+PRAGMA writable_schema=OFF;
 COMMIT;
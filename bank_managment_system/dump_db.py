@@ -1,22 +1,266 @@
 from os.path import exists
+import argparse
+import gzip
+import lzma
+import re
 import sqlite3
-import sys
 
-def dump_db(path, rename_to=None):
-    """Expects a single argument: the relative path to the db that should be dumped.
-       Will create the dump file on the same directory level that this script is located on."""
+# tables an incremental dump follows row by row through their key; rows of the append-only ones are
+# only ever inserted, so only inserts are followed. Any other table is small enough to go out whole
+TRACKED = {"bank": "acc_no", "staff": "name", "admin": "name"}
+APPEND_ONLY = ("ledger", "balance_snapshots")
+# the bookkeeping of incremental dumps, never part of one
+CHANGE_TABLES = ("change_log", "dump_state")
+# bytes handed to the file (or the compressor) at a time
+BUFFER_SIZE = 1 << 20
+
+
+def _open(path, compress):
+    if compress == "gzip":
+        return gzip.open(path, "wt", compresslevel=6)
+    if compress == "lzma":
+        return lzma.open(path, "wt", preset=3)
+    if compress is not None:
+        raise Exception("Unknown compression {}".format(compress))
+    return open(path, "w", buffering=BUFFER_SIZE)
+
+
+def _compression(path):
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".xz"):
+        return "lzma"
+    return None
+
+
+def _insert_sql(cur, table):
+    """The query turning every row of table into its INSERT statement, the way iterdump writes them."""
+    ident = table.replace('"', '""')
+    columns = [str(c[1]) for c in cur.execute('PRAGMA table_info("{0}")'.format(ident)).fetchall()]
+    return """SELECT 'INSERT INTO "{0}" VALUES({1});' FROM "{0}\"""".format(
+        ident, ",".join("""'||quote("{0}")||'""".format(c.replace('"', '""')) for c in columns))
+
+
+def _selected(name, tables, virtual):
+    """A table is dumped when it was asked for (or no tables were) or is a shadow table of a virtual table that was."""
+    return tables is None or name in tables or any(name.startswith(v + "_") for v in virtual if v in tables)
+
+
+def _references(sql, table_names):
+    """The tables a trigger or view names in its body, string literals aside."""
+    sql = re.sub(r"'(?:[^']|'')*'", "", sql)
+    words = set(quoted.replace('""', '"') if quoted else word
+                for quoted, word in re.findall(r'"((?:[^"]|"")+)"|(\w+)', sql))
+    return [name for name in table_names if name in words]
+
+
+def _iterdump(con, tables=None):
+    """con.iterdump() without the rows it writes into virtual tables themselves, which fail on
+    restore, optionally restricted to some tables with their indexes and triggers, like .dump TABLE
+    in the sqlite3 shell. A trigger or view that names a table left out is left out too, it would
+    fail every write (or read) on the restored file; backend.create_schema puts the bank's back."""
+    cur = con.cursor()
+    yield 'BEGIN TRANSACTION;'
+    schema = cur.execute(
+        "SELECT name, type, tbl_name, sql FROM sqlite_master WHERE sql NOT NULL ORDER BY name").fetchall()
+    virtual = [name for name, type, _, sql in schema if type == "table" and sql.startswith("CREATE VIRTUAL TABLE")]
+    writable_schema = False
+    sqlite_sequence = []
+    for name, type, _, sql in schema:
+        if type != "table":
+            continue
+        if name == "sqlite_sequence":
+            sqlite_sequence = ['DELETE FROM "sqlite_sequence";'] + [
+                """INSERT INTO "sqlite_sequence" VALUES('{}',{});""".format(row[0], row[1])
+                for row in cur.execute('SELECT * FROM "sqlite_sequence";').fetchall()
+                if _selected(row[0], tables, virtual)]
+            continue
+        if name == "sqlite_stat1" and tables is None:
+            yield 'ANALYZE "sqlite_master";'
+        elif name.startswith("sqlite_") or not _selected(name, tables, virtual):
+            continue
+        elif name in virtual:
+            # its rows live in its shadow tables
+            if not writable_schema:
+                writable_schema = True
+                yield 'PRAGMA writable_schema=ON;'
+            yield ("INSERT INTO sqlite_master(type,name,tbl_name,rootpage,sql)"
+                   "VALUES('table','{0}','{0}',0,'{1}');".format(name.replace("'", "''"), sql.replace("'", "''")))
+            continue
+        else:
+            yield '{0};'.format(sql)
+        for row in cur.execute(_insert_sql(cur, name)):
+            yield row[0]
+    table_names = [name for name, type, _, _ in schema if type == "table"]
+    for name, type, table, sql in cur.execute(
+            "SELECT name, type, tbl_name, sql FROM sqlite_master "
+            "WHERE sql NOT NULL AND type IN ('index', 'trigger', 'view')").fetchall():
+        if not _selected(table, tables, virtual):
+            continue
+        if tables is None or type == "index" or all(
+                _selected(other, tables, virtual) for other in _references(sql, table_names)):
+            yield '{0};'.format(sql)
+    if writable_schema:
+        yield 'PRAGMA writable_schema=OFF;'
+    for line in sqlite_sequence:
+        yield line
+    yield 'COMMIT;'
+
+
+def _track_changes(con):
+    """Creates the change log and the triggers filling it, the first time an incremental dump is asked for."""
+    con.execute("begin immediate")
+    try:
+        con.execute("create table change_log (id integer primary key, tbl text, key)")
+        con.execute("create table dump_state (last_change int)")
+        con.execute("insert into dump_state values (0)")
+        existing = set(row[0] for row in con.execute("select name from sqlite_master where type='table'"))
+        for table, key in TRACKED.items():
+            if table not in existing:
+                continue
+            con.execute(
+                "create trigger change_log_{0}_insert after insert on {0} begin "
+                "insert into change_log (tbl, key) values ('{0}', new.{1}); end".format(table, key))
+            con.execute(
+                "create trigger change_log_{0}_update after update on {0} begin "
+                "insert into change_log (tbl, key) values ('{0}', old.{1}); "
+                "insert into change_log (tbl, key) select '{0}', new.{1} where new.{1} is not old.{1}; end".format(
+                    table, key))
+            con.execute(
+                "create trigger change_log_{0}_delete after delete on {0} begin "
+                "insert into change_log (tbl, key) values ('{0}', old.{1}); end".format(table, key))
+        for table in APPEND_ONLY:
+            if table in existing:
+                con.execute(
+                    "create trigger change_log_{0}_insert after insert on {0} begin "
+                    "insert into change_log (tbl, key) values ('{0}', new.rowid); end".format(table))
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+
+
+def _iterchanges(con, upto, tables):
+    """The statements bringing a restore of the previous dump up to date: tracked rows in the change
+    log up to upto are deleted and inserted again as they are now (or stay deleted), appended rows are
+    inserted and every other table is replaced whole. Triggers are dropped for the duration so
+    replaying the rows does not write ledger entries or totals a second time, and full-text indexes
+    over changed tables are rebuilt from their content."""
+    cur = con.cursor()
+    yield 'BEGIN TRANSACTION;'
+    triggers = cur.execute("SELECT name, sql FROM sqlite_master WHERE type='trigger' ORDER BY name").fetchall()
+    for name, _ in triggers:
+        yield 'DROP TRIGGER IF EXISTS "{0}";'.format(name.replace('"', '""'))
+
+    schema = cur.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type='table' AND sql NOT NULL ORDER BY name").fetchall()
+    virtual = [(name, sql) for name, sql in schema if sql.startswith("CREATE VIRTUAL TABLE")]
+    changed = set(row[0] for row in cur.execute(
+        "SELECT DISTINCT tbl FROM change_log WHERE id <= ?", (upto,)))
+    for name, sql in schema:
+        if (name.startswith("sqlite_") or name in CHANGE_TABLES or sql.startswith("CREATE VIRTUAL TABLE")
+                or any(name.startswith(v + "_") for v, _ in virtual)
+                or (tables is not None and name not in tables)):
+            continue
+        ident = name.replace('"', '""')
+        if name in TRACKED or name in APPEND_ONLY:
+            if name not in changed:
+                continue
+            key = TRACKED.get(name, "rowid")
+            keys = "SELECT key FROM change_log WHERE tbl = ? AND id <= ?"
+            if name in TRACKED:
+                for row in cur.execute(
+                        """SELECT DISTINCT 'DELETE FROM "{0}" WHERE "{1}"='||quote(key)||';' FROM change_log """
+                        "WHERE tbl = ? AND id <= ?".format(ident, key), (name, upto)):
+                    yield row[0]
+            for row in cur.execute(
+                    _insert_sql(cur, name) + ' WHERE {0} IN ({1})'.format(key, keys), (name, upto)):
+                yield row[0]
+        else:
+            changed.add(name)
+            yield 'DELETE FROM "{0}";'.format(ident)
+            for row in cur.execute(_insert_sql(cur, name)):
+                yield row[0]
+
+    for name, sql in virtual:
+        content = re.search(r"content\s*=\s*'([^']*)'", sql)
+        if content is not None and content.group(1) in changed:
+            yield """INSERT INTO "{0}"("{0}") VALUES('rebuild');""".format(name.replace('"', '""'))
+    for _, sql in triggers:
+        yield '{0};'.format(sql)
+    yield 'COMMIT;'
+
+
+def dump_db(path, rename_to=None, tables=None, compress=None, incremental=False):
+    """Expects the relative path to the db that should be dumped, all other arguments are optional.
+       Will create the dump file (dump.sql unless rename_to says otherwise) on the same directory level
+       that this script is located on. tables limits the dump to those tables, with their indexes and
+       triggers. compress is "gzip" or "lzma", by default taken from a .gz or .xz rename_to.
+       incremental=True dumps only what changed since the previous incremental dump, to be replayed on
+       a restore of it; the first one starts tracking changes and is a full dump.
+       Returns the number of statements written."""
     if not exists(path):
         raise Exception("No such file")
 
     con = sqlite3.connect(path)
     rename_to = 'dump.sql' if not rename_to else rename_to
-    with open(rename_to, 'w') as f:
-        for line in con.iterdump():
-            f.write('%s\n' % line)
+    compress = _compression(rename_to) if compress is None else compress
+    tables = set(tables) if tables is not None else None
+    try:
+        last_change = None
+        if incremental:
+            if con.execute("select 1 from sqlite_master where name='dump_state'").fetchone() is None:
+                _track_changes(con)
+            else:
+                last_change = con.execute("select last_change from dump_state").fetchone()[0]
+            # every read below comes from the one snapshot this transaction starts with
+            con.execute("begin")
+            upto = con.execute("select coalesce(max(id), 0) from change_log").fetchone()[0]
+
+        if last_change is not None:
+            lines = _iterchanges(con, upto, tables)
+        else:
+            lines = _iterdump(con, tables)
+
+        written = 0
+        with _open(rename_to, compress) as f:
+            batch = []
+            for line in lines:
+                batch.append('%s\n' % line)
+                if len(batch) == 1000:
+                    f.writelines(batch)
+                    written = written + len(batch)
+                    batch = []
+            f.writelines(batch)
+            written = written + len(batch)
+
+        if incremental:
+            con.commit()
+            # only what this dump covered is forgotten: changes made while it ran, and those to tables
+            # it left out, stay in the log for the next one
+            con.execute("begin immediate")
+            con.execute("update dump_state set last_change = ?", (upto,))
+            if tables is None:
+                con.execute("delete from change_log where id <= ?", (upto,))
+            else:
+                con.executemany("delete from change_log where id <= ? and tbl = ?",
+                                [(upto, table) for table in sorted(tables)])
+            con.commit()
+    finally:
+        con.close()
+    return written
+
 
 def main():
-    dump_db(sys.argv[1])
-    
+    parser = argparse.ArgumentParser(description="Dump a database to SQL text.")
+    parser.add_argument("path")
+    parser.add_argument("rename_to", nargs="?", help="dump.sql by default, .gz or .xz to compress")
+    parser.add_argument("--tables", nargs="+")
+    parser.add_argument("--compress", choices=["gzip", "lzma"])
+    parser.add_argument("--incremental", action="store_true")
+    args = parser.parse_args()
+    dump_db(args.path, args.rename_to, args.tables, args.compress, args.incremental)
+
 
-if __name__ == "__main__": 
-    main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import unittest
+import sqlite3
+import os
+import gzip
+import lzma
+import backend
+from dump_db import dump_db
+from restore import restore
+from shutil import copyfile
+
+
+class DumpDbUnitTests(unittest.TestCase):
+
+    def test_dump_db_compressed(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_dump_db_compressed_copy.db")
+
+        dump_db("db_mocks/test_dump_db_compressed_copy.db", "test_dump_db_compressed.sql")
+        dump_db("db_mocks/test_dump_db_compressed_copy.db", "test_dump_db_compressed.sql.gz")
+        dump_db("db_mocks/test_dump_db_compressed_copy.db", "test_dump_db_compressed.xz", compress="lzma")
+        with open("test_dump_db_compressed.sql") as f:
+            plain = f.read()
+        with gzip.open("test_dump_db_compressed.sql.gz", "rt") as f:
+            self.assertEqual(f.read(), plain)
+        with lzma.open("test_dump_db_compressed.xz", "rt") as f:
+            self.assertEqual(f.read(), plain)
+
+        #cleanup
+        os.remove("db_mocks/test_dump_db_compressed_copy.db")
+        os.remove("test_dump_db_compressed.sql")
+        os.remove("test_dump_db_compressed.sql.gz")
+        os.remove("test_dump_db_compressed.xz")
+
+    def test_dump_db_tables(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_dump_db_tables_copy.db")
+        con = sqlite3.connect("db_mocks/test_dump_db_tables_copy.db")
+        con.execute("create index bank_age on bank (age)")
+        con.commit()
+        con.close()
+
+        written = dump_db("db_mocks/test_dump_db_tables_copy.db", "test_dump_db_tables.sql", tables=["bank"])
+        with open("test_dump_db_tables.sql") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(written, len(lines))
+        self.assertEqual(lines, [
+            "BEGIN TRANSACTION;",
+            "CREATE TABLE bank (acc_no int, name text, age int, address text, balance int, "
+            "account_type text, mobile_number int);",
+            "INSERT INTO \"bank\" VALUES(1,'Ionescu Maria',60,'13rd Street, NY',1250,'acc_type_1',236418463);",
+            "INSERT INTO \"bank\" VALUES(2,'Popescu Ion',26,'25th Street, NY',600,'acc_type_1',521455264);",
+            "CREATE INDEX bank_age on bank (age);",
+            "COMMIT;"])
+
+        #cleanup
+        os.remove("db_mocks/test_dump_db_tables_copy.db")
+        os.remove("test_dump_db_tables.sql")
+
+    #a dump of bank alone leaves out the triggers writing to the tables it does not hold, and
+    #the restored file takes new customers once the backend has put its schema back
+    def test_dump_db_tables_triggers(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_dump_db_tables_triggers_copy.db")
+        backend.connect_database("db_mocks/test_dump_db_tables_triggers_copy.db")
+        backend.conn.close()
+
+        dump_db("db_mocks/test_dump_db_tables_triggers_copy.db", "test_dump_db_tables_triggers.sql", tables=["bank"])
+        with open("test_dump_db_tables_triggers.sql") as f:
+            self.assertEqual([line for line in f if line.lower().startswith("create trigger")], [])
+        restore("test_dump_db_tables_triggers.db", ["test_dump_db_tables_triggers.sql"])
+
+        backend.connect_database("test_dump_db_tables_triggers.db")
+        new_acc_no = backend.create_customer("Rusu Ana", 30, "Albu Street", 7, "savings", 712)
+        self.assertEqual(backend.all_money(), 1250 + 600 + 7)
+        self.assertEqual(backend.search_customers("rusu")[0][0][0], new_acc_no)
+        self.assertEqual(backend.conn.execute("select kind, amount from ledger where acc_no = ?",
+                                              (new_acc_no,)).fetchall(), [("open", 7)])
+
+        #cleanup
+        backend.conn.close()
+        os.remove("db_mocks/test_dump_db_tables_triggers_copy.db")
+        os.remove("test_dump_db_tables_triggers.db")
+        os.remove("test_dump_db_tables_triggers.sql")
+
+    #a full dump and the incremental one after it restore to the same data as the source
+    def test_dump_db_incremental(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_dump_db_incremental_copy.db")
+
+        backend.connect_database("db_mocks/test_dump_db_incremental_copy.db")
+        dump_db("db_mocks/test_dump_db_incremental_copy.db", "test_dump_db_incremental.sql", incremental=True)
+        backend.update_balance(5, 1)
+        new_acc_no = backend.create_customer("Rusu Ana", 30, "Albu Street", 7, "savings", 712)
+        backend.delete_acc(2)
+        backend.create_employee("Dinu Mara", "pass", 10, "teller")
+        dump_db("db_mocks/test_dump_db_incremental_copy.db", "test_dump_db_incremental_1.sql.gz", incremental=True)
+
+        with gzip.open("test_dump_db_incremental_1.sql.gz", "rt") as f:
+            changes = f.read()
+        self.assertNotIn("Popescu", changes)    #account 2 only goes out as deleted
+        self.assertIn('DELETE FROM "bank" WHERE "acc_no"=2;', changes)
+
+        #the full dump replays as it is; the full-text table only exists for connections opened after
+        #its writable_schema insert
+        con = sqlite3.connect("test_dump_db_incremental_restore.db")
+        with open("test_dump_db_incremental.sql") as f:
+            con.executescript(f.read())
+        con.close()
+        con = sqlite3.connect("test_dump_db_incremental_restore.db")
+        con.executescript(changes)
+        con.close()
+
+        con = sqlite3.connect("test_dump_db_incremental_restore.db")
+        for table in ("bank", "staff", "ledger", "bank_totals", "acc_no_seq"):
+            self.assertEqual(con.execute("select * from " + table).fetchall(),
+                             backend.conn.execute("select * from " + table).fetchall())
+        self.assertEqual(con.execute("select rowid from bank_search where bank_search match 'rusu'").fetchall(),
+                         [(new_acc_no,)])
+        #the triggers are back once the changes are in
+        con.execute("delete from bank where acc_no = 1")
+        self.assertEqual(con.execute("select * from bank_totals").fetchall(), [(7, 1)])
+
+        #nothing changed since, only the small tables go out again
+        dump_db("db_mocks/test_dump_db_incremental_copy.db", "test_dump_db_incremental_2.sql", incremental=True)
+        with open("test_dump_db_incremental_2.sql") as f:
+            self.assertEqual([line for line in f.read().splitlines() if "TRIGGER" not in line], [
+                "BEGIN TRANSACTION;",
+                'DELETE FROM "acc_no_seq";', 'INSERT INTO "acc_no_seq" VALUES(3);',
+                'DELETE FROM "bank_totals";', 'INSERT INTO "bank_totals" VALUES(1262,2);',
+                "COMMIT;"])
+
+        #cleanup
+        con.close()
+        backend.conn.close()
+        os.remove("db_mocks/test_dump_db_incremental_copy.db")
+        os.remove("test_dump_db_incremental_restore.db")
+        os.remove("test_dump_db_incremental.sql")
+        os.remove("test_dump_db_incremental_1.sql.gz")
+        os.remove("test_dump_db_incremental_2.sql")
+
+    #an incremental dump of some tables leaves the changes to the others for the next one
+    def test_dump_db_incremental_tables(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_dump_db_incremental_tables_copy.db")
+
+        backend.connect_database("db_mocks/test_dump_db_incremental_tables_copy.db")
+        dump_db("db_mocks/test_dump_db_incremental_tables_copy.db", "test_dump_db_incremental_tables.sql",
+                incremental=True)
+        backend.create_employee("Dinu Mara", "pass", 10, "teller")
+        backend.update_balance(5, 1)
+        dump_db("db_mocks/test_dump_db_incremental_tables_copy.db", "test_dump_db_incremental_tables_1.sql",
+                tables=["bank"], incremental=True)
+        dump_db("db_mocks/test_dump_db_incremental_tables_copy.db", "test_dump_db_incremental_tables_2.sql",
+                incremental=True)
+
+        with open("test_dump_db_incremental_tables_1.sql") as f:
+            changes = f.read()
+        self.assertIn('INSERT INTO "bank" VALUES(1,', changes)
+        self.assertNotIn("Dinu Mara", changes)
+        with open("test_dump_db_incremental_tables_2.sql") as f:
+            changes = f.read()
+        self.assertIn('INSERT INTO "staff" VALUES(\'Dinu Mara\'', changes)
+        self.assertNotIn('INSERT INTO "bank" VALUES(', changes)
+
+        #cleanup
+        backend.conn.close()
+        os.remove("db_mocks/test_dump_db_incremental_tables_copy.db")
+        os.remove("test_dump_db_incremental_tables.sql")
+        os.remove("test_dump_db_incremental_tables_1.sql")
+        os.remove("test_dump_db_incremental_tables_2.sql")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+from os.path import exists
+import argparse
+import csv
+import gzip
+import json
+import sqlite3
+
+import backend
+
+# table -> (columns exported, key the rows come out in); staff passwords never leave the database
+EXPORTS = {
+    "bank": (backend.BANK_FIELDS, "acc_no"),
+    "staff": (("name", "salary", "position"), "name"),
+    "ledger": (("id", "acc_no", "ts", "kind", "amount"), "id"),
+}
+
+
+# the query for one export; the ledger is filtered by account type through the accounts still open
+def _export_sql(table, acc_range, account_type):
+    columns, key = EXPORTS[table]
+    conditions = []
+    params = []
+    if acc_range is not None:
+        conditions.append("acc_no between ? and ?")
+        params.extend(acc_range)
+    if account_type is not None and table == "bank":
+        conditions.append("account_type = ?")
+        params.append(account_type)
+    elif account_type is not None:
+        conditions.append("acc_no in (select acc_no from bank where account_type = ?)")
+        params.append(account_type)
+
+    sql = "select {} from {}".format(", ".join(columns), table)
+    if conditions:
+        sql = sql + " where " + " and ".join(conditions)
+    return sql + " order by " + key, params
+
+
+def export(path, table, out_path, acc_range=None, account_type=None, batch_size=1000):
+    """Expects the path to a bank database, the table to export (bank, staff or ledger) and the file to
+       write it to: CSV with a header row, or JSON Lines when out_path ends in .jsonl, gzipped when it
+       also ends in .gz (customers.csv.gz). bank and ledger can be narrowed to an (first, last) acc_no
+       range and an account type. Rows are read batch_size at a time from a single query, so memory
+       stays flat whatever the size of the table and the file is one consistent snapshot.
+       Returns the number of rows written."""
+    if not exists(path):
+        raise Exception("No such file")
+    if table not in EXPORTS:
+        raise Exception("Cannot export {}".format(table))
+    if table == "staff" and (acc_range is not None or account_type is not None):
+        raise Exception("staff has no accounts to filter on")
+
+    columns = EXPORTS[table][0]
+    sql, params = _export_sql(table, acc_range, account_type)
+    plain_path = out_path[:-3] if out_path.endswith(".gz") else out_path
+    jsonl = plain_path.endswith(".jsonl")
+
+    con = sqlite3.connect(path)
+    if out_path.endswith(".gz"):
+        out = gzip.open(out_path, "wt", newline="", compresslevel=6)
+    else:
+        out = open(out_path, "w", newline="")
+    written = 0
+    try:
+        cur = con.execute(sql, params)
+        if not jsonl:
+            writer = csv.writer(out)
+            writer.writerow(columns)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            if jsonl:
+                out.write("".join(json.dumps(dict(zip(columns, row))) + "\n" for row in rows))
+            else:
+                writer.writerows(rows)
+            written = written + len(rows)
+    finally:
+        out.close()
+        con.close()
+
+    print("exported: {} rows of {} to {}".format(written, table, out_path))
+    return written
+
+
+def _acc_range(text):
+    first, _, last = text.partition("-")
+    return int(first), int(last or first)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a table of the bank to CSV or JSON Lines.")
+    parser.add_argument("path")
+    parser.add_argument("table", choices=sorted(EXPORTS))
+    parser.add_argument("out_path", help="file.csv, file.jsonl, with .gz appended to compress")
+    parser.add_argument("--acc-no", type=_acc_range, help="an account number or a first-last range")
+    parser.add_argument("--type", dest="account_type")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    export(args.path, args.table, args.out_path, args.acc_no, args.account_type, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import unittest
+import os
+import gzip
+import json
+import backend
+import export
+from shutil import copyfile
+
+
+class ExportUnitTests(unittest.TestCase):
+
+    def test_export_csv(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_export_csv_copy.db")
+        backend.connect_database("db_mocks/test_export_csv_copy.db")
+        backend.create_customer("Rusu Ana", 30, "Albu Street, 4", 100, "savings", 712)
+        backend.conn.close()
+
+        written = export.export("db_mocks/test_export_csv_copy.db", "bank", "test_export.csv",
+                                acc_range=(2, 3), account_type="acc_type_1", batch_size=1)
+        self.assertEqual(written, 1)
+        with open("test_export.csv") as f:
+            self.assertEqual(f.read().splitlines(),
+                             ["acc_no,name,age,address,balance,account_type,mobile_number",
+                              "2,Popescu Ion,26,\"25th Street, NY\",600,acc_type_1,521455264"])
+
+        #staff passwords are not exported
+        self.assertEqual(export.export("db_mocks/test_export_csv_copy.db", "staff", "test_export.csv"), 0)
+        with open("test_export.csv") as f:
+            self.assertEqual(f.read(), "name,salary,position\n")
+        with self.assertRaises(Exception):
+            export.export("db_mocks/test_export_csv_copy.db", "staff", "test_export.csv", account_type="x")
+
+        #cleanup
+        os.remove("db_mocks/test_export_csv_copy.db")
+        os.remove("test_export.csv")
+
+    def test_export_jsonl_gzip(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_export_jsonl_gzip_copy.db")
+        backend.connect_database("db_mocks/test_export_jsonl_gzip_copy.db")
+        backend.update_balance(50, 2)
+        new_acc_no = backend.create_customer("Rusu Ana", 30, "Albu Street", 100, "savings", 712)
+        backend.conn.close()
+
+        written = export.export("db_mocks/test_export_jsonl_gzip_copy.db", "ledger", "test_export.jsonl.gz",
+                                account_type="savings", batch_size=2)
+        self.assertEqual(written, 1)
+        with gzip.open("test_export.jsonl.gz", "rt") as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual([(row["acc_no"], row["kind"], row["amount"]) for row in rows],
+                         [(new_acc_no, "open", 100)])
+
+        #cleanup
+        os.remove("db_mocks/test_export_jsonl_gzip_copy.db")
+        os.remove("test_export.jsonl.gz")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,29 @@
 # importing all modules
+import sys
 import tkinter.messagebox
 from tkinter import *
 
 import backend
+from paged_table import PagedTable
+from screen_router import ScreenRouter
+from ui_worker import BackendWorker
 
 backend.connect_database("bankmanaging.db")
+# a teller flow reads the same account several times; with --read-cache those reads are cached, and
+# writes made by other processes show up only after the ttl
+if "--read-cache" in sys.argv[1:]:
+    backend.enable_read_cache()
+
+
+# every backend call below runs on the worker, errors end up here on the Tk thread
+def show_error(error):
+    tkinter.messagebox.showerror("Error", str(error))
+
+
+# busy indicator while the worker has requests in flight
+def set_busy(busy):
+    tk.config(cursor="watch" if busy else "")
+    status_label.config(text="Working..." if busy else "")
 
 
 # A function for check that acc_no is integer or not
@@ -13,13 +32,60 @@ def check_string_in_account_no(check_acc_no):
     return r
 
 
+# a message with an Exit button on a screen, the router removes both the next time the screen is shown
+def show_message(frame, text, command, row=None):
+    label = Label(frame, text=text)
+    button = Button(frame, text="Exit", command=command)
+    if row is None:
+        label.grid(pady=2)
+        button.grid()
+    else:
+        label.grid(row=row, pady=2)
+        button.grid(row=row + 1)
+
+
+# screen shared by every page that starts from an account number, the caller sets the button
+def build_search(frame):
+    global search_label
+    search_label = Label(frame, font="bold")
+    search_label.grid(row=0, pady=6)
+
+    global entry11
+    entry11 = Entry(frame)
+    entry11.grid(row=1, pady=6)
+
+    global search_button
+    search_button = Button(frame, text="Search")
+    search_button.grid(row=3)
+
+
+def show_search(text, command, label="Enter account number"):
+    global search_frame
+    search_frame = router.show("search", build_search, padx=500, pady=300)
+    search_label.config(text=label)
+    search_button.config(text=text, command=command)
+
+
+# check the account number typed into the search screen and hand it to found(acc_no)
+def search_account(found, invalid_text="Enter correct account number"):
+    def checked(result):
+        print(result)
+        if not result:
+            show_message(search_frame, "invalid account number", page2)
+        else:
+            found(acc_no)
+
+    acc_no = entry11.get()
+    r = check_string_in_account_no(acc_no)
+    if len(acc_no) != 0 and r:
+        worker.submit(backend.check_acc_no, (acc_no,), checked, show_error, key="acc_no")
+    else:
+        show_message(search_frame, invalid_text, page2)
+
+
 # all buttons of page2
 def create():
     def create_customer_in_database():
-        def delete_create():
-            create_employee_frame.grid_forget()
-            page2()
-
         name = entry5.get()
         age = entry6.get()
         address = entry7.get()
@@ -35,722 +101,395 @@ def create():
             and len(mobile_number) != 0
         ):
 
-            acc_no = backend.create_customer(
-                name, age, address, balance, acc_type, mobile_number
-            )
+            def show_acc_no(acc_no):
+                show_message(create_frame, "Your account number is {}".format(acc_no), page2, row=14)
 
-            label = Label(
-                create_employee_frame, text="Your account number is {}".format(acc_no)
+            worker.submit(
+                backend.create_customer,
+                (name, age, address, balance, acc_type, mobile_number),
+                show_acc_no,
+                show_error,
             )
-            label.grid(row=14)
-
-            button = Button(create_employee_frame, text="Exit", command=delete_create)
-            button.grid(row=15)
         else:
-            label = Label(create_employee_frame, text="Please fill all entries")
-            label.grid(row=14)
-
-            button = Button(create_employee_frame, text="Exit", command=delete_create)
-            button.grid(row=15)
-
-    frame1.grid_forget()
-    global create_employee_frame
-    create_employee_frame = Frame(tk, bg="black")
-    create_employee_frame.grid(padx=500, pady=150)
-
-    label = Label(create_employee_frame, text="Customer Detail", font="bold")
-    label.grid(row=0, pady=4)
-    label = Label(create_employee_frame, text="Name", font="bold")
-    label.grid(row=1, pady=4)
-    global entry5
-    entry5 = Entry(create_employee_frame)
-    entry5.grid(row=2, pady=4)
-    label = Label(create_employee_frame, text="Age", font="bold")
-    label.grid(row=3, pady=4)
-    global entry6
-    entry6 = Entry(create_employee_frame)
-    entry6.grid(row=4, pady=4)
-    label = Label(create_employee_frame, text="address", font="bold")
-    label.grid(row=5, pady=4)
-    global entry7
-    entry7 = Entry(create_employee_frame)
-    entry7.grid(row=6, pady=4)
-    label = Label(create_employee_frame, text="Balance", font="bold")
-    label.grid(row=7, pady=4)
-    global entry8
-    entry8 = Entry(create_employee_frame)
-    entry8.grid(row=8, pady=4)
-    label = Label(create_employee_frame, text="Account Type", font="bold")
-    label.grid(row=9, pady=4)
-    label = Label(create_employee_frame, text="Mobile number", font="bold")
-    label.grid(row=11, pady=4)
-    global entry9
-    entry9 = Entry(create_employee_frame)
-    entry9.grid(row=10, pady=4)
-    global entry10
-    entry10 = Entry(create_employee_frame)
-    entry10.grid(row=12, pady=4)
-    button = Button(
-        create_employee_frame, text="Submit", command=create_customer_in_database
-    )
-    button.grid(row=13, pady=4)
-
-    mainloop()
+            show_message(create_frame, "Please fill all entries", page2, row=14)
+
+    def build(frame):
+        label = Label(frame, text="Customer Detail", font="bold")
+        label.grid(row=0, pady=4)
+        label = Label(frame, text="Name", font="bold")
+        label.grid(row=1, pady=4)
+        global entry5
+        entry5 = Entry(frame)
+        entry5.grid(row=2, pady=4)
+        label = Label(frame, text="Age", font="bold")
+        label.grid(row=3, pady=4)
+        global entry6
+        entry6 = Entry(frame)
+        entry6.grid(row=4, pady=4)
+        label = Label(frame, text="address", font="bold")
+        label.grid(row=5, pady=4)
+        global entry7
+        entry7 = Entry(frame)
+        entry7.grid(row=6, pady=4)
+        label = Label(frame, text="Balance", font="bold")
+        label.grid(row=7, pady=4)
+        global entry8
+        entry8 = Entry(frame)
+        entry8.grid(row=8, pady=4)
+        label = Label(frame, text="Account Type", font="bold")
+        label.grid(row=9, pady=4)
+        label = Label(frame, text="Mobile number", font="bold")
+        label.grid(row=11, pady=4)
+        global entry9
+        entry9 = Entry(frame)
+        entry9.grid(row=10, pady=4)
+        global entry10
+        entry10 = Entry(frame)
+        entry10.grid(row=12, pady=4)
+        button = Button(frame, text="Submit", command=create_customer_in_database)
+        button.grid(row=13, pady=4)
+
+    global create_frame
+    create_frame = router.show("create", build, bg="black", padx=500, pady=150)
 
 
 def search_acc():
-    frame1.grid_forget()
-    global search_frame
-    search_frame = Frame(tk)
-    search_frame.grid(padx=500, pady=300)
+    show_search("Search", show, "Enter account number, name, address or mobile")
 
-    label = Label(search_frame, text="Enter account number", font="bold")
-    label.grid(row=0, pady=6)
 
-    global entry11
-    entry11 = Entry(search_frame)
-    entry11.grid(row=1, pady=6)
+def build_details(frame):
+    global detail_labels
+    detail_labels = []
+    for row in range(7):
+        label = Label(frame, font="bold")
+        label.grid(row=row, pady=6)
+        detail_labels.append(label)
+    button = Button(
+        frame,
+        text="Exit",
+        command=page2,
+        width=20,
+        height=2,
+        bg="red",
+        fg="white",
+    )
+    button.grid(row=7, pady=6)
+
+
+def show_details(details):
+    router.show("show", build_details, padx=400, pady=200)
+    titles = ("Account_number", "Name", "Age", "Address", "Balance", "Account_type", "Mobile Number")
+    for label, title, value in zip(detail_labels, titles, details):
+        label.config(text="{}:\t{}".format(title, value))
+
+
+# one page of the customers matching the text typed into the search screen, best match first
+def search_page(after, page_size, columns, order_by, descending):
+    rows, after = backend.search_customers(search_text, after, page_size)
+    return [(row[0], row[1], row[3], row[6]) for row in rows], after
+
+
+def show_search_results(text):
+    # a double click on a result opens that customer
+    def open_customer(event):
+        values = search_table.tree.item(search_table.tree.focus(), "values")
+        if values:
+            worker.submit(backend.get_details, (values[0],), show_details, show_error, key="details")
+
+    def build(frame):
+        global search_table
+        search_table = PagedTable(
+            frame,
+            worker,
+            search_page,
+            ("acc_no", "name", "address", "mobile_number"),
+            ("Acc_no", "Name", "Address", "Mobile Number"),
+            page_size=50,
+            on_error=show_error,
+            sortable=False,
+        )
+        search_table.tree.bind("<Double-1>", open_customer)
+        search_table.grid(pady=6)
 
-    button = Button(search_frame, text="Search", command=show)
-    button.grid(row=3)
+        button = Button(frame, text="Back", width=20, height=2, bg="red", command=page2)
+        button.grid()
 
-    mainloop()
+    global search_text
+    search_text = text
+    router.show("search_results", build, refresh=lambda frame: search_table.reload(), padx=50, pady=50)
 
 
+# an account number opens the account, anything else (or a number that is no account, like a
+# mobile number) lists the matching customers
 def show():
-    def clear_show_frame():
-        show_frame.grid_forget()
-        page2()
-
-    def back_page2():
-        search_frame.grid_forget()
-        page2()
-
-    acc_no = entry11.get()
-    r = check_string_in_account_no(acc_no)
-    if len(acc_no) != 0 and r:
-        details = backend.get_details(acc_no)
+    def found(details):
         if details != False:
-            search_frame.grid_forget()
-            global show_frame
-            show_frame = Frame(tk)
-            show_frame.grid(padx=400, pady=200)
-
-            label = Label(
-                show_frame, text="Account_number:\t{}".format(details[0]), font="bold"
-            )
-            label.grid(row=0, pady=6)
-            label = Label(show_frame, text="Name:\t{}".format(details[1]), font="bold")
-            label.grid(row=1, pady=6)
-            label = Label(show_frame, text="Age:\t{}".format(details[2]), font="bold")
-            label.grid(row=2, pady=6)
-            label = Label(
-                show_frame, text="Address:\t{}".format(details[3]), font="bold"
-            )
-            label.grid(row=3, pady=6)
-            label = Label(
-                show_frame, text="Balance:\t{}".format(details[4]), font="bold"
-            )
-            label.grid(row=4, pady=6)
-            label = Label(
-                show_frame, text="Account_type:\t{}".format(details[5]), font="bold"
-            )
-            label.grid(row=5, pady=6)
-            label = Label(
-                show_frame, text="Mobile Number:\t{}".format(details[6]), font="bold"
-            )
-            label.grid(row=6, pady=6)
-            button = Button(
-                show_frame,
-                text="Exit",
-                command=clear_show_frame,
-                width=20,
-                height=2,
-                bg="red",
-                fg="white",
-            )
-            button.grid(row=7, pady=6)
-            mainloop()
+            show_details(details)
         else:
-            label = Label(search_frame, text="Account Not Found")
-            label.grid()
-            button = Button(search_frame, text="Exit", command=back_page2)
-            button.grid()
-
+            show_search_results(text)
+
+    text = entry11.get().strip()
+    r = check_string_in_account_no(text)
+    if len(text) != 0 and r:
+        worker.submit(backend.get_details, (text,), found, show_error, key="details")
+    elif len(text) != 0:
+        show_search_results(text)
     else:
-        label = Label(search_frame, text="Enter correct account number")
-        label.grid()
-        button = Button(search_frame, text="Exit", command=back_page2)
-        button.grid()
-
+        show_message(search_frame, "Enter correct account number", page2)
 
-def add():
-    frame1.grid_forget()
-
-    def search_in_database():
-        def back_page2():
-            search_frame.grid_forget()
-            page2()
 
-        global result
-        global acc_no
-        acc_no = entry11.get()
-        r = check_string_in_account_no(acc_no)
-        if len(acc_no) != 0 and r:
-            result = backend.check_acc_no(acc_no)
-            print(result)
-            if not result:
-                label = Label(search_frame, text="invalid account number")
-                label.grid(pady=2)
-                button = Button(search_frame, text="Exit", command=back_page2)
-                button.grid()
-                mainloop()
-            else:
+# screen for adding and withdrawing money, the caller sets the button
+def build_money(frame):
+    global money_name_label
+    money_name_label = Label(frame)
+    money_name_label.grid(row=0, pady=3)
 
-                def update_money():
-                    new_money = entry12.get()
-                    backend.update_balance(new_money, acc_no)
-                    add_frame.grid_forget()
-                    page2()
+    global money_amount_label
+    money_amount_label = Label(frame)
+    money_amount_label.grid(row=1, pady=3)
 
-                search_frame.grid_forget()
-                global add_frame
-                add_frame = Frame(tk)
-                add_frame.grid(padx=400, pady=300)
+    label = Label(frame, text="Enter Money")
+    label.grid(row=2, pady=3)
+    global entry12
+    entry12 = Entry(frame)
+    entry12.grid(row=3, pady=3)
 
-                detail = backend.get_detail(acc_no)
+    global money_button
+    money_button = Button(frame)
+    money_button.grid(row=4)
 
-                label = Label(
-                    add_frame, text="Account holder name:   {}".format(detail[0][0])
-                )
-                label.grid(row=0, pady=3)
 
-                label = Label(
-                    add_frame, text="Current amount:   {}".format(detail[0][1])
-                )
-                label.grid(row=1, pady=3)
+def show_money(acc_no, text, command):
+    def show_detail(detail):
+        global money_frame
+        money_frame = router.show("money", build_money, padx=400, pady=300)
+        money_name_label.config(text="Account holder name:   {}".format(detail[0][0]))
+        money_amount_label.config(text="Current amount:   {}".format(detail[0][1]))
+        money_button.config(text=text, command=command)
 
-                label = Label(add_frame, text="Enter Money")
-                label.grid(row=2, pady=3)
-                global entry12
-                entry12 = Entry(add_frame)
-                entry12.grid(row=3, pady=3)
+    worker.submit(backend.get_detail, (acc_no,), show_detail, show_error)
 
-                button = Button(add_frame, text="Add", command=update_money)
-                button.grid(row=4)
 
-                mainloop()
-        else:
-            label = Label(search_frame, text="Enter correct account number")
-            label.grid(pady=2)
-            button = Button(search_frame, text="Exit", command=back_page2)
-            button.grid()
-            mainloop()
-
-    def search_acc():
-        global search_frame
-        search_frame = Frame(tk)
-        search_frame.grid(padx=500, pady=300)
-
-        label = Label(search_frame, text="Enter account number", font="bold")
-        label.grid(row=0, pady=6)
-
-        global entry11
-        entry11 = Entry(search_frame)
-        entry11.grid(row=1, pady=6)
+def add():
+    def update_money(acc_no):
+        def money_added(balance):
+            page2()
 
-        button = Button(search_frame, text="Search", command=search_in_database)
-        button.grid(row=3)
+        new_money = entry12.get()
+        worker.submit(backend.update_balance, (new_money, acc_no), money_added, show_error)
 
-        mainloop()
+    def found(acc_no):
+        show_money(acc_no, "Add", lambda: update_money(acc_no))
 
-    search_acc()
+    show_search("Search", lambda: search_account(found))
 
 
 def withdraw():
-    frame1.grid_forget()
-
-    def search_in_database():
-        def go_page2():
-            search_frame.grid_forget()
-            page2()
-
-        global result
-        global acc_no
-        acc_no = entry11.get()
-        r = check_string_in_account_no(acc_no)
-        if len(acc_no) != 0 and r:
-            result = backend.check_acc_no(acc_no)
-            print(result)
-            if not result:
-                label = Label(search_frame, text="invalid account number")
-                label.grid(pady=2)
-                button = Button(search_frame, text="Exit", command=go_page2)
-                button.grid()
-                mainloop()
+    def deduct_money(acc_no):
+        def money_deducted(result):
+            if result:
+                page2()
             else:
+                show_message(money_frame, "Insufficient Balance", page2, row=5)
 
-                def deduct_money():
-                    new_money = entry12.get()
-                    result = backend.deduct_balance(new_money, acc_no)
-                    if result:
-                        add_frame.grid_forget()
-                        page2()
-                    else:
-                        label = Label(search_frame, text="Insufficient Balance")
-                        label.grid(row=4)
-
-                        button = Button(search_frame, text="Exit", command=go_page2)
-                        button.grid(row=5)
-
-                        mainloop()
-
-                search_frame.grid_forget()
-                global add_frame
-                add_frame = Frame(tk)
-                add_frame.grid(padx=400, pady=300)
-                detail = backend.get_detail(acc_no)
-
-                label = Label(
-                    add_frame, text="Account holder name:   {}".format(detail[0][0])
-                )
-                label.grid(row=0, pady=3)
-
-                label = Label(
-                    add_frame, text="Current amount:   {}".format(detail[0][1])
-                )
-                label.grid(row=1, pady=3)
-
-                label = Label(add_frame, text="Enter Money")
-                label.grid(row=2, pady=3)
-                global entry12
-                entry12 = Entry(add_frame)
-                entry12.grid(row=3, pady=3)
-
-                button = Button(add_frame, text="Withdraw", command=deduct_money)
-                button.grid(row=4)
-
-                mainloop()
-        else:
-            label = Label(search_frame, text="Enter correct account number")
-            label.grid(row=4)
-
-            button = Button(search_frame, text="Exit", command=go_page2)
-            button.grid(row=5)
-
-            mainloop()
-
-    def search_acc():
-        global search_frame
-        search_frame = Frame(tk)
-        search_frame.grid(padx=500, pady=300)
-
-        label = Label(search_frame, text="Enter account number", font="bold")
-        label.grid(row=0, pady=6)
+        new_money = entry12.get()
+        worker.submit(backend.deduct_balance, (new_money, acc_no), money_deducted, show_error)
 
-        global entry11
-        entry11 = Entry(search_frame)
-        entry11.grid(row=1, pady=6)
+    def found(acc_no):
+        show_money(acc_no, "Withdraw", lambda: deduct_money(acc_no))
 
-        button = Button(search_frame, text="Search", command=search_in_database)
-        button.grid(row=3)
-
-        mainloop()
-
-    search_acc()
+    show_search("Search", lambda: search_account(found))
 
 
 def check():
-    frame1.grid_forget()
-
-    def search_in_database():
-        def back_page2():
-            search_frame.grid_forget()
-            page2()
-
-        global result
-        global acc_no
-        acc_no = entry11.get()
-        r = check_string_in_account_no(acc_no)
-
-        if len(acc_no) != 0 and r:
-            result = backend.check_acc_no(acc_no)
-            print(result)
-            if not result:
-                label = Label(search_frame, text="invalid account number")
-                label.grid(pady=2)
-                button = Button(search_frame, text="Exit", command=back_page2)
-                button.grid()
-                mainloop()
-            else:
-
-                def delete_check_frame():
-                    check_frame.grid_forget()
-                    page2()
-
-                search_frame.grid_forget()
-                balance = backend.check_balance(acc_no)
-                global check_frame
-                check_frame = Frame(tk)
-                check_frame.grid(padx=500, pady=300)
-
-                label = Label(
-                    check_frame, text="Balance Is:{}".format(balance), font="bold"
-                )
-                label.grid(row=0, pady=4)
-
-                button = Button(
-                    check_frame,
-                    text="Back",
-                    command=delete_check_frame,
-                    width=20,
-                    height=2,
-                    bg="red",
-                )
-                button.grid(row=1)
-
-                mainloop()
-        else:
-            label = Label(search_frame, text="Enter correct entry")
-            label.grid(pady=2)
-            button = Button(search_frame, text="Exit", command=back_page2)
-            button.grid()
-            mainloop()
-
-    def search_acc():
-        global search_frame
-        search_frame = Frame(tk)
-        search_frame.grid(padx=500, pady=300)
-
-        label = Label(search_frame, text="Enter account number", font="bold")
-        label.grid(row=0, pady=6)
-
-        global entry11
-
-        entry11 = Entry(search_frame)
-        entry11.grid(row=1, pady=6)
+    def build(frame):
+        global balance_label
+        balance_label = Label(frame, font="bold")
+        balance_label.grid(row=0, pady=4)
+
+        button = Button(
+            frame,
+            text="Back",
+            command=page2,
+            width=20,
+            height=2,
+            bg="red",
+        )
+        button.grid(row=1)
 
-        button = Button(search_frame, text="Search", command=search_in_database)
-        button.grid(row=3)
+    def show_balance(balance):
+        router.show("check", build, padx=500, pady=300)
+        balance_label.config(text="Balance Is:{}".format(balance))
 
-        mainloop()
+    def found(acc_no):
+        worker.submit(backend.check_balance, (acc_no,), show_balance, show_error, key="balance")
 
-    search_acc()
+    show_search("Search", lambda: search_account(found, "Enter correct entry"))
 
 
 def update():
-    def back_to_page2():
-        search_frame.grid_forget()
-        page2()
-
-    def show_all_updateble_content():
-        def back_to_page2_from_update():
-            update_customer_frame.grid_forget()
-            page2()
-
-        # defining a function whose makes a update entry and submit butoon side to name button
-        def update_name():
-            # def a function eho updates name in database
-            def update_name_in_database():
-                new_name = entry_name.get()
-                r = check_string_in_account_no(new_name)
-                if len(new_name) != 0:
-                    # function in backend that updates name in table
-                    backend.update_name_in_bank_table(new_name, acc_no)
-                    entry_name.destroy()
-                    submit_button.destroy()
-                    name_label.destroy()
-                else:
-                    tkinter.messagebox.showinfo("Error", "Please fill blanks")
-                    entry_name.destroy()
-                    submit_button.destroy()
-                    name_label.destroy()
-
-            global entry_name
-            global name_label
-            name_label = Label(update_customer_frame, text="Enter new name")
-            name_label.grid(row=1, column=1)
-            entry_name = Entry(update_customer_frame)
-            entry_name.grid(row=1, column=2, padx=2)
-            global submit_button
-            submit_button = Button(
-                update_customer_frame, text="Update", command=update_name_in_database
-            )
-            submit_button.grid(row=1, column=3)
-
-        # defing a function who make gui fro age
-        def update_age():
-            # def a function eho updates name in database
-            def update_age_in_database():
-                new_age = entry_name.get()
-                r = check_string_in_account_no(new_age)
-                if len(new_age) != 0 and r:
-                    # function in backend that updates name in table
-                    backend.update_age_in_bank_table(new_age, acc_no)
-                    entry_name.destroy()
-                    submit_button.destroy()
-                    age_label.destroy()
-                else:
-                    tkinter.messagebox.showinfo("Error", "Please enter age")
-                    entry_name.destroy()
-                    submit_button.destroy()
-                    age_label.destroy()
-
-            global age_label
-            age_label = Label(update_customer_frame, text="Enter new Age:")
-            age_label.grid(row=2, column=1)
-            global entry_name
-            entry_name = Entry(update_customer_frame)
-            entry_name.grid(row=2, column=2, padx=2)
-            global submit_button
-            submit_button = Button(
-                update_customer_frame, text="Update", command=update_age_in_database
-            )
-            submit_button.grid(row=2, column=3)
-
-        # defing a function who make gui fro age
-        def update_address():
-            # def a function eho updates name in database
-            def update_address_in_database():
-                new_address = entry_name.get()
-                if len(new_address) != 0:
-                    # function in backend that updates name in table
-                    backend.update_address_in_bank_table(new_address, acc_no)
-                    entry_name.destroy()
-                    submit_button.destroy()
-                    address_label.destroy()
-                else:
-                    tkinter.messagebox.showinfo("Error", "Please fill address")
-                    entry_name.destroy()
-                    submit_button.destroy()
-                    address_label.destroy()
-
-            global address_label
-
-            address_label = Label(update_customer_frame, text="Enter new Address:")
-            address_label.grid(row=3, column=1)
-            global entry_name
-            entry_name = Entry(update_customer_frame)
-            entry_name.grid(row=3, column=2, padx=2)
-            global submit_button
-            submit_button = Button(
-                update_customer_frame, text="Update", command=update_address_in_database
-            )
-            submit_button.grid(row=3, column=3)
+    # defining a function whose makes a update entry and submit butoon side to the field's button
+    def update_field(row, text, valid, message, update_in_bank_table):
+        # def a function who updates the field in database
+        def update_in_database():
+            value = entry_name.get()
+            if len(value) != 0 and valid(value):
+                # function in backend that updates the field in table
+                worker.submit(update_in_bank_table, (value, acc_no), on_error=show_error)
+            else:
+                tkinter.messagebox.showinfo("Error", message)
+            entry_name.destroy()
+            submit_button.destroy()
+            field_label.destroy()
+
+        global field_label
+        field_label = Label(update_customer_frame, text=text)
+        field_label.grid(row=row, column=1)
+        global entry_name
+        entry_name = Entry(update_customer_frame)
+        entry_name.grid(row=row, column=2, padx=2)
+        global submit_button
+        submit_button = Button(update_customer_frame, text="Update", command=update_in_database)
+        submit_button.grid(row=row, column=3)
+
+    def build_update(frame):
+        label = Label(frame, text="What do you want to update")
+        label.grid(row=0)
+
+        name_button = Button(
+            frame,
+            text="Name",
+            command=lambda: update_field(
+                1, "Enter new name", lambda value: True, "Please fill blanks",
+                backend.update_name_in_bank_table,
+            ),
+        )
+        name_button.grid(row=1, column=0, pady=6)
+
+        age_button = Button(
+            frame,
+            text="Age",
+            command=lambda: update_field(
+                2, "Enter new Age:", check_string_in_account_no, "Please enter age",
+                backend.update_age_in_bank_table,
+            ),
+        )
+        age_button.grid(row=2, column=0, pady=6)
+
+        address_button = Button(
+            frame,
+            text="Address",
+            command=lambda: update_field(
+                3, "Enter new Address:", lambda value: True, "Please fill address",
+                backend.update_address_in_bank_table,
+            ),
+        )
+        address_button.grid(row=3, column=0, pady=6)
 
-        acc_no = entry_acc.get()
+        exit_button = Button(frame, text="Exit", command=page2)
+        exit_button.grid(row=4)
 
-        r = check_string_in_account_no(acc_no)
-        if r:
-            result = backend.check_acc_no(acc_no)
+    def show_all_updateble_content():
+        def checked(result):
             if result:
-                search_frame.grid_forget()
                 global update_customer_frame
-                update_customer_frame = Frame(tk)
-                update_customer_frame.grid(padx=300, pady=300)
-
-                label = Label(update_customer_frame, text="What do you want to update")
-                label.grid(row=0)
-
-                name_button = Button(
-                    update_customer_frame, text="Name", command=update_name
-                )
-                name_button.grid(row=1, column=0, pady=6)
-
-                age_button = Button(
-                    update_customer_frame, text="Age", command=update_age
-                )
-                age_button.grid(row=2, column=0, pady=6)
-
-                address_button = Button(
-                    update_customer_frame, text="Address", command=update_address
-                )
-                address_button.grid(row=3, column=0, pady=6)
-
-                exit_button = Button(
-                    update_customer_frame,
-                    text="Exit",
-                    command=back_to_page2_from_update,
-                )
-                exit_button.grid(row=4)
-                mainloop()
+                update_customer_frame = router.show("update_customer", build_update, padx=300, pady=300)
             else:
-                label = Label(search_frame, text="Invalid account number")
-                label.grid()
+                show_message(update_search_frame, "Invalid account number", page2)
 
-                button = Button(search_frame, text="Exit", command=back_to_page2)
-                button.grid()
+        # the update screen is built once, its buttons read the account number from here
+        global acc_no
+        acc_no = entry_acc.get()
 
+        r = check_string_in_account_no(acc_no)
+        if r:
+            worker.submit(backend.check_acc_no, (acc_no,), checked, show_error, key="acc_no")
         else:
-            label = Label(search_frame, text="Fill account number")
-            label.grid()
+            show_message(update_search_frame, "Fill account number", page2)
 
-            button = Button(search_frame, text="Exit", command=back_to_page2)
-            button.grid()
-
-    frame1.grid_forget()
     # define gui for enter account number
+    def build_search(frame):
+        label = Label(frame, text="Enter account number", font="bold")
+        label.grid(pady=4)
 
-    global search_frame
-    search_frame = Frame(tk)
-    search_frame.grid(padx=500, pady=300)
-
-    label = Label(search_frame, text="Enter account number", font="bold")
-    label.grid(pady=4)
+        global entry_acc
+        entry_acc = Entry(frame)
+        entry_acc.grid(pady=4)
 
-    entry_acc = Entry(search_frame)
-    entry_acc.grid(pady=4)
+        button = Button(frame, text="update", command=show_all_updateble_content, bg="red")
+        button.grid()
 
-    button = Button(
-        search_frame, text="update", command=show_all_updateble_content, bg="red"
-    )
-    button.grid()
+    global update_search_frame
+    update_search_frame = router.show("update_search", build_search, padx=500, pady=300)
 
 
 def allmembers():
-    def clear_list_frame():
-        list_frame.grid_forget()
-        page2()
-
-    frame1.grid_forget()
-    details = backend.list_all_customers()
-    global tk
-
-    global list_frame
-    list_frame = Frame(tk)
-    list_frame.grid(padx=50, pady=50)
-    label = Label(
-        list_frame, text="Acc_no\t\t\tName\t\t\tAge\t\t\tAddress\t\t\tbalance"
-    )
-    label.grid(pady=6)
-    for i in details:
-        label = Label(
-            list_frame,
-            text="{}\t\t\t{}\t\t\t{}\t\t\t{}\t\t\t{}".format(
-                i[0], i[1], i[2], i[3], i[4]
-            ),
+    def build(frame):
+        # rows are fetched a page at a time as the table scrolls, see PagedTable
+        global customer_table
+        customer_table = PagedTable(
+            frame,
+            worker,
+            backend.list_customers_page,
+            ("acc_no", "name", "age", "address", "balance"),
+            ("Acc_no", "Name", "Age", "Address", "balance"),
+            on_error=show_error,
         )
-        label.grid(pady=4)
-
-    button = Button(
-        list_frame, text="Back", width=20, height=2, bg="red", command=clear_list_frame
-    )
-    button.grid()
-    mainloop()
-
+        customer_table.grid(pady=6)
 
-def delete():
-    frame1.grid_forget()
-
-    def search_in_database():
-        def back_page2():
-            search_frame.grid_forget()
-            page2()
-
-        global result
-        global acc_no
-        acc_no = entry11.get()
-        r = check_string_in_account_no(acc_no)
-        if len(acc_no) != 0 and r:
-            result = backend.check_acc_no(acc_no)
-            print(result)
-            if not result:
-
-                label = Label(search_frame, text="invalid account number")
-                label.grid(pady=2)
-                button = Button(search_frame, text="Exit", command=back_page2)
-                button.grid()
-                mainloop()
-            else:
-                backend.delete_acc(acc_no)
-                search_frame.grid_forget()
-                page2()
-        else:
-            label = Label(search_frame, text="Enter correct account number")
-            label.grid(pady=2)
-            button = Button(search_frame, text="Exit", command=back_page2)
-            button.grid()
-
-    def search_acc():
-        global search_frame
-        search_frame = Frame(tk)
-        search_frame.grid(padx=500, pady=300)
+        button = Button(frame, text="Back", width=20, height=2, bg="red", command=page2)
+        button.grid()
 
-        label = Label(search_frame, text="Enter account number", font="bold")
-        label.grid(row=0, pady=6)
+    router.show("allmembers", build, refresh=lambda frame: customer_table.reload(), padx=50, pady=50)
 
-        global entry11
-        entry11 = Entry(search_frame)
-        entry11.grid(row=1, pady=6)
 
-        button = Button(search_frame, text="Delete", command=search_in_database)
-        button.grid(row=3)
+def delete():
+    def deleted(result):
+        page2()
 
-        mainloop()
+    def found(acc_no):
+        worker.submit(backend.delete_acc, (acc_no,), deleted, show_error)
 
-    search_acc()
+    show_search("Delete", lambda: search_account(found))
 
 
 # main page for employees
 def page2():
-    def back_to_main_from_page2():
-        frame1.grid_forget()
-        global frame
-        frame = Frame(tk, bg="black")
-        frame.grid(padx=500, pady=250)
-
-        button = Button(frame, text="Admin", command=admin_login)
-        button.grid(row=0, pady=20)
-
-        button = Button(frame, text="Employee", command=employee_login)
-        button.grid(row=1, pady=20)
-
-        button = Button(frame, text="Exit", command=tk.destroy)
-        button.grid(row=2, pady=20)
-        tk.mainloop()
-
-    frame.grid_forget()
-    global frame1
-    frame1 = Frame(tk, bg="black")
-    frame1.grid(padx=500, pady=100)
-    button1 = Button(frame1, text="Create Account", command=create, width=20, height=2)
-    button1.grid(row=0, pady=6)
-    button2 = Button(
-        frame1, text="Show Details", command=search_acc, width=20, height=2
-    )
-    button2.grid(row=1, pady=6)
-    button3 = Button(frame1, text="Add balance", command=add, width=20, height=2)
-    button3.grid(row=2, pady=6)
-    button4 = Button(
-        frame1, text="Withdraw money", command=withdraw, width=20, height=2
-    )
-    button4.grid(row=3, pady=6)
-    button5 = Button(frame1, text="Check balance", command=check, width=20, height=2)
-    button5.grid(row=4, pady=6)
-    button6 = Button(frame1, text="Update Account", command=update, width=20, height=2)
-    button6.grid(row=5, pady=6)
-    button7 = Button(
-        frame1, text="List of all members", command=allmembers, width=20, height=2
-    )
-    button7.grid(row=6, pady=6)
-    button8 = Button(frame1, text="Delete Account", command=delete, width=20, height=2)
-    button8.grid(row=7, pady=6)
+    def build(frame):
+        button1 = Button(frame, text="Create Account", command=create, width=20, height=2)
+        button1.grid(row=0, pady=6)
+        button2 = Button(
+            frame, text="Show Details", command=search_acc, width=20, height=2
+        )
+        button2.grid(row=1, pady=6)
+        button3 = Button(frame, text="Add balance", command=add, width=20, height=2)
+        button3.grid(row=2, pady=6)
+        button4 = Button(
+            frame, text="Withdraw money", command=withdraw, width=20, height=2
+        )
+        button4.grid(row=3, pady=6)
+        button5 = Button(frame, text="Check balance", command=check, width=20, height=2)
+        button5.grid(row=4, pady=6)
+        button6 = Button(frame, text="Update Account", command=update, width=20, height=2)
+        button6.grid(row=5, pady=6)
+        button7 = Button(
+            frame, text="List of all members", command=allmembers, width=20, height=2
+        )
+        button7.grid(row=6, pady=6)
+        button8 = Button(frame, text="Delete Account", command=delete, width=20, height=2)
+        button8.grid(row=7, pady=6)
 
-    button9 = Button(
-        frame1, text="Exit", command=back_to_main_from_page2, width=20, height=2
-    )
-    button9.grid(row=8, pady=6)
+        button9 = Button(
+            frame, text="Exit", command=main_page, width=20, height=2
+        )
+        button9.grid(row=8, pady=6)
 
-    mainloop()
+    router.show("page2", build, bg="black", padx=500, pady=100)
 
 
 # all buttons of page1
 def create_employee():
     def create_emp_in_database():
-        def back_to_main_page1_from_create_emp():
-            frame_create_emp.grid_forget()
-            page1()
-
         name = entry3.get()
         password = entry4.get()
         salary = entry16.get()
@@ -761,360 +500,204 @@ def create_employee():
             and len(salary) != 0
             and len(position) != 0
         ):
-            backend.create_employee(name, password, salary, position)
-            frame_create_emp.grid_forget()
-            page1()
+
+            def employee_created(result):
+                admin_page()
+
+            worker.submit(
+                backend.create_employee,
+                (name, password, salary, position),
+                employee_created,
+                show_error,
+            )
         else:
             label = Label(frame_create_emp, text="Please fill all entries")
             label.grid(pady=2)
 
-            button = Button(
-                frame_create_emp,
-                text="Exit",
-                command=back_to_main_page1_from_create_emp,
-                bg="red",
-            )
+            button = Button(frame_create_emp, text="Exit", command=admin_page, bg="red")
             button.grid()
 
-    page1_frame.grid_forget()
+    def build(frame):
+        label = Label(frame, text="Name:", font="bold")
+        label.grid(row=0, pady=4)
+        global entry3
+        entry3 = Entry(frame)
+        entry3.grid(row=1, pady=4)
+        label2 = Label(frame, text="Password", font="bold")
+        label2.grid(row=2, pady=4)
+        global entry4
+        entry4 = Entry(frame)
+        entry4.grid(row=3, pady=4)
+        label3 = Label(frame, text="Salary", font="bold")
+        label3.grid(row=4, pady=4)
+        global entry16
+        entry16 = Entry(frame)
+        entry16.grid(row=5, pady=4)
+        label4 = Label(frame, text="Position", font="bold")
+        label4.grid(row=6, pady=4)
+        global entry17
+        entry17 = Entry(frame)
+        entry17.grid(row=7, pady=4)
+
+        button = Button(
+            frame,
+            text="Submit",
+            command=create_emp_in_database,
+            width=15,
+            height=2,
+        )
+        button.grid(row=8, pady=4)
 
     global frame_create_emp
-    frame_create_emp = Frame(tk, bg="black")
-    frame_create_emp.grid(padx=500, pady=200)
-
-    label = Label(frame_create_emp, text="Name:", font="bold")
-    label.grid(row=0, pady=4)
-    global entry3
-    entry3 = Entry(frame_create_emp)
-    entry3.grid(row=1, pady=4)
-    label2 = Label(frame_create_emp, text="Password", font="bold")
-    label2.grid(row=2, pady=4)
-    global entry4
-    entry4 = Entry(frame_create_emp)
-    entry4.grid(row=3, pady=4)
-    label3 = Label(frame_create_emp, text="Salary", font="bold")
-    label3.grid(row=4, pady=4)
-    global entry16
-    entry16 = Entry(frame_create_emp)
-    entry16.grid(row=5, pady=4)
-    label4 = Label(frame_create_emp, text="Position", font="bold")
-    label4.grid(row=6, pady=4)
-    global entry17
-    entry17 = Entry(frame_create_emp)
-    entry17.grid(row=7, pady=4)
-
-    button = Button(
-        frame_create_emp,
-        text="Submit",
-        command=create_emp_in_database,
-        width=15,
-        height=2,
-    )
-    button.grid(row=8, pady=4)
-
-    mainloop()
+    frame_create_emp = router.show("create_employee", build, bg="black", padx=500, pady=200)
 
 
 def update_employee():
     def update_details_of_staff_member():
-        def back_to_page1():
-            show_employee_frame.grid_forget()
-            page1()
-
         def update_that_particular_employee():
-            show_employee_frame.grid_forget()
-
-            def back_to_page1_from_update():
-                update_frame.destroy()
-                page1()
-
-            def update_name_in_database():
+            # an entry and an Update button next to the field's button
+            def update_field(row, valid, message, update_employee_field):
                 def database_calling():
-                    new_name = entry19.get()
-                    if len(new_name) != 0:
-                        old_name = staff_name.get()
-                        backend.update_employee_name(new_name, old_name)
+                    global employee_name
+                    value = entry19.get()
+                    if len(value) != 0 and valid(value):
+                        worker.submit(update_employee_field, (value, employee_name), on_error=show_error)
+                        if update_employee_field == backend.update_employee_name:
+                            employee_name = value
                         entry19.destroy()
                         update_button.destroy()
                     else:
                         entry19.destroy()
                         update_button.destroy()
-                        tkinter.messagebox.showinfo("Error", "Please fill entry")
+                        tkinter.messagebox.showinfo("Error", message)
 
                 global entry19
                 entry19 = Entry(update_frame)
-                entry19.grid(row=1, column=1, padx=4)
+                entry19.grid(row=row, column=1, padx=4)
                 global update_button
-                update_button = Button(
-                    update_frame, text="Update", command=database_calling
+                update_button = Button(update_frame, text="Update", command=database_calling)
+                update_button.grid(row=row, column=2, padx=4)
+
+            def build(frame):
+                label = Label(frame, text="press what do you want to update", font="bold")
+                label.grid(pady=6)
+
+                fields = (
+                    ("Name", lambda value: True, "Please fill entry", backend.update_employee_name),
+                    ("password", lambda value: True, "Please Fill Entry", backend.update_employee_password),
+                    ("salary", check_string_in_account_no, "Invalid Input", backend.update_employee_salary),
+                    ("position", lambda value: True, "Please Fill Entry", backend.update_employee_position),
                 )
-                update_button.grid(row=1, column=2, padx=4)
-
-            def update_password_in_database():
-                def database_calling():
-                    new_password = entry19.get()
-                    old_name = staff_name.get()
-                    if len(new_password) != 0:
-                        backend.update_employee_password(new_password, old_name)
-                        entry19.destroy()
-                        update_button.destroy()
-                    else:
-                        entry19.destroy()
-                        update_button.destroy()
-                        tkinter.messagebox.showinfo("Error", "Please Fill Entry")
-
-                global entry19
-                entry19 = Entry(update_frame)
-                entry19.grid(row=2, column=1, padx=4)
-                global update_button
-                update_button = Button(
-                    update_frame, text="Update", command=database_calling
-                )
-                update_button.grid(row=2, column=2, padx=4)
-
-            def update_salary_in_database():
-                def database_calling():
-                    new_salary = entry19.get()
-                    r = check_string_in_account_no(new_salary)
-                    if len(new_salary) != 0 and r:
-
-                        old_name = staff_name.get()
-                        backend.update_employee_salary(new_salary, old_name)
-                        entry19.destroy()
-                        update_button.destroy()
-                    else:
-                        entry19.destroy()
-                        update_button.destroy()
-                        tkinter.messagebox.showinfo("Error", "Invalid Input")
-
-                global entry19
-                entry19 = Entry(update_frame)
-                entry19.grid(row=3, column=1, padx=4)
-                global update_button
-                update_button = Button(
-                    update_frame, text="Update", command=database_calling
-                )
-                update_button.grid(row=3, column=2, padx=4)
-
-            def update_position_in_database():
-                def database_calling():
-                    new_position = entry19.get()
-                    if len(new_position) != 0:
-
-                        old_name = staff_name.get()
-                        backend.update_employee_position(new_position, old_name)
-                        entry19.destroy()
-                        update_button.destroy()
-                    else:
-                        entry19.destroy()
-                        update_button.destroy()
-                        tkinter.messagebox.showinfo("Error", "Please Fill Entry")
-
-                global entry19
-                entry19 = Entry(update_frame)
-                entry19.grid(row=4, column=1, padx=4)
-                global update_button
-                update_button = Button(
-                    update_frame, text="Update", command=database_calling
-                )
-                update_button.grid(row=4, column=2, padx=4)
+                for row, (text, valid, message, field) in enumerate(fields, 1):
+                    button = Button(
+                        frame,
+                        text=text,
+                        command=lambda row=row, valid=valid, message=message, field=field: update_field(
+                            row, valid, message, field
+                        ),
+                        width=14,
+                        height=2,
+                    )
+                    button.grid(row=row, column=0, padx=2, pady=2)
+
+                button = Button(frame, text="Back", command=admin_page, width=14, height=2)
+                button.grid(row=5, column=0, pady=2)
 
             global update_frame
-            update_frame = Frame(tk)
-            update_frame.grid(padx=400, pady=250)
+            update_frame = router.show("update_employee_detail", build, padx=400, pady=250)
 
-            label = Label(
-                update_frame, text="press what do you want to update", font="bold"
-            )
-            label.grid(pady=6)
-
-            button = Button(
-                update_frame,
-                text="Name",
-                command=update_name_in_database,
-                width=14,
-                height=2,
-            )
-            button.grid(row=1, column=0, padx=2, pady=2)
-
-            button = Button(
-                update_frame,
-                text="password",
-                command=update_password_in_database,
-                width=14,
-                height=2,
-            )
-            button.grid(row=2, column=0, padx=2, pady=2)
-
-            button = Button(
-                update_frame,
-                text="salary",
-                command=update_salary_in_database,
-                width=14,
-                height=2,
-            )
-            button.grid(row=3, column=0, padx=2, pady=2)
-
-            button = Button(
-                update_frame,
-                text="position",
-                command=update_position_in_database,
-                width=14,
-                height=2,
-            )
-            button.grid(row=4, column=0, padx=2, pady=2)
-
-            button = Button(
-                update_frame,
-                text="Back",
-                command=back_to_page1_from_update,
-                width=14,
-                height=2,
-            )
-            button.grid(row=5, column=0, pady=2)
-
-        name = staff_name.get()
-        if len(name) != 0:
-            result = backend.check_name_in_staff(name)
+        def checked(result):
             if result:
-
+                # the details screen is built once, its buttons read the name from here
+                global employee_name
+                employee_name = name
                 update_that_particular_employee()
             else:
-                label = Label(show_employee_frame, text="Employee not found")
-                label.grid()
-
-                button = Button(show_employee_frame, text="Exit", command=back_to_page1)
-                button.grid()
+                show_message(show_employee_frame, "Employee not found", admin_page)
 
+        name = staff_name.get()
+        if len(name) != 0:
+            worker.submit(backend.check_name_in_staff, (name,), checked, show_error, key="staff_name")
         else:
-            label = Label(show_employee_frame, text="Fill the name")
-            label.grid()
-
-            button = Button(show_employee_frame, text="Exit", command=back_to_page1)
-            button.grid()
+            show_message(show_employee_frame, "Fill the name", admin_page)
 
     # entering name of staff member
-    page1_frame.grid_forget()
-    global show_employee_frame
-    show_employee_frame = Frame(tk)
-    show_employee_frame.grid(padx=300, pady=300)
-
-    label = Label(
-        show_employee_frame,
-        text="Enter name of staff member whom detail would you want to update",
-    )
-    label.grid()
-    global staff_name
-    staff_name = Entry(show_employee_frame)
-    staff_name.grid()
-    global update_butoon_for_staff
-    update_butoon_for_staff = Button(
-        show_employee_frame,
-        text="Update Details",
-        command=update_details_of_staff_member,
-    )
-    update_butoon_for_staff.grid()
-
-
-def show_employee():
-    def back_to_main_page1():
-        show_employee_frame.grid_forget()
-        page1()
-
-    page1_frame.grid_forget()
+    def build(frame):
+        label = Label(
+            frame,
+            text="Enter name of staff member whom detail would you want to update",
+        )
+        label.grid()
+        global staff_name
+        staff_name = Entry(frame)
+        staff_name.grid()
+        global update_butoon_for_staff
+        update_butoon_for_staff = Button(
+            frame,
+            text="Update Details",
+            command=update_details_of_staff_member,
+        )
+        update_butoon_for_staff.grid()
 
     global show_employee_frame
-    show_employee_frame = Frame(tk)
-    show_employee_frame.grid(padx=50, pady=50)
+    show_employee_frame = router.show("update_employee", build, padx=300, pady=300)
 
-    label = Label(
-        show_employee_frame,
-        text="Name\t\t\tSalary\t\t\tPosition\t\t\tpassword",
-        font="bold",
-    )
-    label.grid(row=0)
-
-    details = backend.show_employees()
 
-    for i in details:
-        label = Label(
-            show_employee_frame,
-            text="{}\t\t\t{}\t\t\t{}\t\t\t{}".format(i[0], i[1], i[2], i[3]),
+def show_employee():
+    def build(frame):
+        global employee_table
+        employee_table = PagedTable(
+            frame,
+            worker,
+            backend.list_employees_page,
+            ("name", "salary", "position", "pass"),
+            ("Name", "Salary", "Position", "password"),
+            on_error=show_error,
         )
-        label.grid(pady=4)
-
-    button = Button(
-        show_employee_frame,
-        text="Exit",
-        command=back_to_main_page1,
-        width=20,
-        height=2,
-        bg="red",
-        font="bold",
-    )
-    button.grid()
+        employee_table.grid(row=0)
+
+        button = Button(
+            frame,
+            text="Exit",
+            command=admin_page,
+            width=20,
+            height=2,
+            bg="red",
+            font="bold",
+        )
+        button.grid()
 
-    mainloop()
+    router.show("show_employee", build, refresh=lambda frame: employee_table.reload(), padx=50, pady=50)
 
 
 def Total_money():
-    def back_to_main_page1_from_total_money():
-        all_money.grid_forget()
-        page1()
-
-    page1_frame.grid_forget()
-
-    all = backend.all_money()
-
-    global all_money
-    all_money = Frame(tk)
-    all_money.grid(padx=500, pady=300)
+    def build(frame):
+        label = Label(frame, text="Total Amount of money")
+        label.grid(row=0, pady=6)
 
-    label = Label(all_money, text="Total Amount of money")
-    label.grid(row=0, pady=6)
+        global total_label
+        total_label = Label(frame)
+        total_label.grid(row=1)
 
-    label = Label(all_money, text="{}".format(all))
-    label.grid(row=1)
+        button = Button(
+            frame,
+            text="Back",
+            command=admin_page,
+            width=15,
+            height=2,
+        )
+        button.grid(row=3)
 
-    button = Button(
-        all_money,
-        text="Back",
-        command=back_to_main_page1_from_total_money,
-        width=15,
-        height=2,
+    router.show("total_money", build, padx=500, pady=300)
+    total_label.config(text="...")
+    worker.submit(
+        backend.all_money, (), lambda all: total_label.config(text="{}".format(all)), show_error, key="all_money"
     )
-    button.grid(row=3)
-
-    mainloop()
-
-
-def back_to_main():
-    page1_frame.grid_forget()
-    global frame
-    frame = Frame(tk, bg="black")
-    frame.grid(padx=500, pady=250)
-
-    button = Button(frame, text="Admin", command=admin_login)
-    button.grid(row=0, pady=20)
-
-    button = Button(frame, text="Employee", command=employee_login)
-    button.grid(row=1, pady=20)
 
-    button = Button(frame, text="Exit", command=tk.destroy)
-    button.grid(row=2, pady=20)
-    tk.mainloop()
-
-    mainloop()
-
-
-# mai page for admin
-def page1():
-    def back_to_main2():
-        admin_frame.grid_forget()
-        global frame
-        frame = Frame(tk, bg="black")
-        frame.grid(padx=500, pady=250)
 
+# first page, choose between admin and employee
+def main_page():
+    def build(frame):
         button = Button(frame, text="Admin", command=admin_login)
         button.grid(row=0, pady=20)
 
@@ -1123,171 +706,135 @@ def page1():
 
         button = Button(frame, text="Exit", command=tk.destroy)
         button.grid(row=2, pady=20)
-        tk.mainloop()
 
-        mainloop()
+    router.show("main", build, bg="black", padx=500, pady=250)
 
-    name = entry1.get()
-    password = entry2.get()
-    if len(name) != 0 and len(password) != 0:
-        result = backend.check_admin(name, password)
-        print(result)
-        if result:
-            admin_frame.grid_forget()
-
-            global page1_frame
-            page1_frame = Frame(tk, bg="black")
-            page1_frame.grid(padx=500, pady=200)
-
-            button10 = Button(
-                page1_frame,
-                text="New Employee",
-                command=create_employee,
-                width=20,
-                height=2,
-            )
-            button10.grid(row=0, pady=6)
-
-            button11 = Button(
-                page1_frame,
-                text="Update detail",
-                command=update_employee,
-                width=20,
-                height=2,
-            )
-            button11.grid(row=1, pady=6)
-
-            button13 = Button(
-                page1_frame,
-                text="Show All Employee",
-                command=show_employee,
-                width=20,
-                height=2,
-            )
-            button13.grid(row=2, pady=6)
-
-            button11 = Button(
-                page1_frame, text="Total Money", command=Total_money, width=20, height=2
-            )
-            button11.grid(row=3, pady=6)
 
-            button12 = Button(
-                page1_frame, text="Back", command=back_to_main, width=20, height=2
-            )
-            button12.grid(row=4, pady=6)
+# mai page for admin
+def admin_page():
+    def build(frame):
+        button10 = Button(
+            frame,
+            text="New Employee",
+            command=create_employee,
+            width=20,
+            height=2,
+        )
+        button10.grid(row=0, pady=6)
+
+        button11 = Button(
+            frame,
+            text="Update detail",
+            command=update_employee,
+            width=20,
+            height=2,
+        )
+        button11.grid(row=1, pady=6)
+
+        button13 = Button(
+            frame,
+            text="Show All Employee",
+            command=show_employee,
+            width=20,
+            height=2,
+        )
+        button13.grid(row=2, pady=6)
 
-            mainloop()
-        else:
-            label = Label(admin_frame, text="Invalid id and pasasword")
-            label.grid(row=6, pady=10)
-            button = Button(admin_frame, text="Exit", command=back_to_main2)
-            button.grid(row=7)
-            mainloop()
-    else:
-        label = Label(admin_frame, text="Please fill All Entries")
-        label.grid(row=6, pady=10)
-        button = Button(admin_frame, text="Exit", command=back_to_main2)
-        button.grid(row=7)
-        mainloop()
+        button11 = Button(
+            frame, text="Total Money", command=Total_money, width=20, height=2
+        )
+        button11.grid(row=3, pady=6)
 
+        button12 = Button(
+            frame, text="Back", command=main_page, width=20, height=2
+        )
+        button12.grid(row=4, pady=6)
 
-# Login form for employee
-def employee_login():
-    def back_to_main3():
-        employee_frame.grid_forget()
-        global frame
-        frame = Frame(tk, bg="black")
-        frame.grid(padx=400, pady=250)
+    router.show("page1", build, bg="black", padx=500, pady=200)
 
-        button = Button(frame, text="Admin", command=admin_login)
-        button.grid(row=0, pady=20)
 
-        button = Button(frame, text="Employee", command=employee_login)
-        button.grid(row=1, pady=20)
+# check the admin login, then on to the admin page
+def page1():
+    def logged_in(result):
+        print(result)
+        if result:
+            admin_page()
+        else:
+            show_message(admin_frame, "Invalid id and pasasword", main_page, row=6)
 
-        button = Button(frame, text="Exit", command=tk.destroy)
-        button.grid(row=2, pady=20)
-        tk.mainloop()
+    name = entry1.get()
+    password = entry2.get()
+    if len(name) != 0 and len(password) != 0:
+        worker.submit(backend.check_admin, (name, password), logged_in, show_error, key="login")
+    else:
+        show_message(admin_frame, "Please fill All Entries", main_page, row=6)
 
-        mainloop()
 
+# Login form for employee
+def employee_login():
     def check_emp():
-        name = entry1.get()
-        password = entry2.get()
-        if len(name) != 0 and len(password) != 0:
-            result = backend.check_employee(name, password)
+        def logged_in(result):
             print(result)
             if result:
-                employee_frame.grid_forget()
                 page2()
             else:
-                label = Label(employee_frame, text="Invalid id and pasasword")
-                label.grid(row=6, pady=10)
-                button = Button(employee_frame, text="Exit", command=back_to_main3)
-                button.grid(row=7)
+                show_message(employee_frame, "Invalid id and pasasword", main_page, row=6)
 
-                mainloop()
+        name = entry13.get()
+        password = entry14.get()
+        if len(name) != 0 and len(password) != 0:
+            worker.submit(backend.check_employee, (name, password), logged_in, show_error, key="login")
         else:
-            label = Label(employee_frame, text="Please Fill All Entries")
-            label.grid(row=6, pady=10)
-            button = Button(employee_frame, text="Exit", command=back_to_main3)
-            button.grid(row=7)
+            show_message(employee_frame, "Please Fill All Entries", main_page, row=6)
 
-            mainloop()
-
-    frame.grid_forget()
-
-    global employee_frame
-    employee_frame = Frame(tk, bg="black")
-    employee_frame.grid(padx=500, pady=200)
+    def build(frame):
+        label = Label(frame, text="Employee Login", font="bold")
+        label.grid(row=0, pady=20)
 
-    label = Label(employee_frame, text="Employee Login", font="bold")
-    label.grid(row=0, pady=20)
+        label1 = Label(frame, text="Name:")
+        label1.grid(row=1, pady=10)
 
-    label1 = Label(employee_frame, text="Name:")
-    label1.grid(row=1, pady=10)
+        label2 = Label(frame, text="Password:")
+        label2.grid(row=3, pady=10)
+        global entry13
+        global entry14
+        entry13 = Entry(frame)
+        entry13.grid(row=2, pady=10)
 
-    label2 = Label(employee_frame, text="Password:")
-    label2.grid(row=3, pady=10)
-    global entry1
-    global entry2
-    entry1 = Entry(employee_frame)
-    entry1.grid(row=2, pady=10)
+        entry14 = Entry(frame, show="*")
+        entry14.grid(row=4, pady=10)
 
-    entry2 = Entry(employee_frame, show="*")
-    entry2.grid(row=4, pady=10)
+        button = Button(frame, text="Submit", command=check_emp)
+        button.grid(row=5, pady=20)
 
-    button = Button(employee_frame, text="Submit", command=check_emp)
-    button.grid(row=5, pady=20)
-    mainloop()
+    global employee_frame
+    employee_frame = router.show("employee_login", build, bg="black", padx=500, pady=200)
 
 
 # Login form for admin
 def admin_login():
-    frame.grid_forget()
-    global admin_frame
-    admin_frame = Frame(tk, bg="black")
-    admin_frame.grid(padx=500, pady=250)
+    def build(frame):
+        label = Label(frame, text="Admin Login", font="bold")
+        label.grid(row=0, pady=20)
 
-    label = Label(admin_frame, text="Admin Login", font="bold")
-    label.grid(row=0, pady=20)
+        label1 = Label(frame, text="Name:")
+        label1.grid(row=1, pady=10)
 
-    label1 = Label(admin_frame, text="Name:")
-    label1.grid(row=1, pady=10)
+        label2 = Label(frame, text="Password:")
+        label2.grid(row=3, pady=10)
+        global entry1
+        global entry2
+        entry1 = Entry(frame)
+        entry1.grid(row=2, pady=10)
 
-    label2 = Label(admin_frame, text="Password:")
-    label2.grid(row=3, pady=10)
-    global entry1
-    global entry2
-    entry1 = Entry(admin_frame)
-    entry1.grid(row=2, pady=10)
+        entry2 = Entry(frame, show="*")
+        entry2.grid(row=4, pady=10)
 
-    entry2 = Entry(admin_frame, show="*")
-    entry2.grid(row=4, pady=10)
+        button = Button(frame, text="Submit", command=page1)
+        button.grid(row=5, pady=20)
 
-    button = Button(admin_frame, text="Submit", command=page1)
-    button.grid(row=5, pady=20)
-    mainloop()
+    global admin_frame
+    admin_frame = router.show("admin_login", build, bg="black", padx=500, pady=250)
 
 
 # creating window
@@ -1299,16 +846,12 @@ tk.title("Bank Managing System")
 tk.minsize(1200, 800)
 tk.maxsize(1200, 800)
 
-global frame
-frame = Frame(tk, bg="black")
-frame.grid(padx=500, pady=250)
-
-button = Button(frame, text="Admin", command=admin_login)
-button.grid(row=0, pady=20)
-
-button = Button(frame, text="Employee", command=employee_login)
-button.grid(row=1, pady=20)
+# placed instead of gridded so it never moves the screens around
+status_label = Label(tk, text="", bg="black", fg="white")
+status_label.place(relx=1.0, rely=1.0, anchor="se")
+worker = BackendWorker(tk, busy=set_busy)
+router = ScreenRouter(tk)
 
-button = Button(frame, text="Exit", command=tk.destroy)
-button.grid(row=2, pady=20)
+# the one and only event loop, every screen change happens inside it
+main_page()
 tk.mainloop()
@@ -0,0 +1,73 @@
+from os.path import exists, splitext
+import csv
+import os
+import sys
+
+import backend
+
+
+def import_csv(path, csv_path, bad_path=None, chunk_size=5000):
+    """Expects the path to a bank database and to a CSV file whose header names the customer columns
+       (name, age, address, balance, account_type, mobile_number; any other column is ignored).
+       Streams the file into the bank in transactions of chunk_size rows, every customer getting a new
+       account number. Refused rows are written with the reason to bad_path (by default the CSV's name
+       with a _bad suffix), which is only kept if there are any. Returns (imported, refused)."""
+    if not exists(path) or not exists(csv_path):
+        raise Exception("No such file")
+    bad_path = splitext(csv_path)[0] + "_bad.csv" if not bad_path else bad_path
+
+    refused = 0
+    with open(csv_path, newline="") as source:
+        reader = csv.reader(source)
+        header = [column.strip() for column in next(reader, [])]
+        missing = [field for field in backend.CUSTOMER_FIELDS if field not in header]
+        if missing:
+            raise Exception("Missing columns: {}".format(", ".join(missing)))
+        positions = [header.index(field) for field in backend.CUSTOMER_FIELDS]
+
+        # rows in CUSTOMER_FIELDS order, a short row comes out short and is refused
+        def records():
+            for row in reader:
+                if row:
+                    yield [row[i] for i in positions if i < len(row)]
+
+        # written under another name until the import is through, so a failed one leaves no report behind
+        bad = open(bad_path + ".part", "w", newline="")
+        writer = csv.writer(bad)
+        writer.writerow(backend.CUSTOMER_FIELDS + ("error",))
+
+        def reject(record, reason):
+            nonlocal refused
+            refused = refused + 1
+            writer.writerow(list(record) + [reason])
+
+        try:
+            backend.connect_database(path)
+            try:
+                imported = backend.import_customers(records(), chunk_size, reject)
+            finally:
+                backend.conn.close()
+        except BaseException:
+            bad.close()
+            os.remove(bad_path + ".part")
+            raise
+        bad.close()
+
+    if refused == 0:
+        os.remove(bad_path + ".part")
+        if exists(bad_path):
+            os.remove(bad_path)
+    else:
+        os.replace(bad_path + ".part", bad_path)
+    print("imported: {}".format(imported))
+    if refused:
+        print("refused:  {} (see {})".format(refused, bad_path))
+    return imported, refused
+
+
+def main():
+    import_csv(sys.argv[1], sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import unittest
+import sqlite3
+import os
+import import_csv
+from shutil import copyfile
+from unittest.mock import patch
+
+
+class ImportCsvUnitTests(unittest.TestCase):
+
+    def test_import_csv(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_import_csv_copy.db")
+        with open("test_import_csv.csv", "w", newline="") as f:
+            f.write("mobile_number,name,age,address,balance,account_type,branch\n"
+                    "0712,Rusu Ana,30,\"Albu Street, 4\",100,savings,north\n"
+                    "\n"
+                    "0744,Stan Dan,forty,Main Street,5,current,north\n"
+                    "0755,Dinu Mara,50,Oak Street,0,savings,south\n")
+
+        result = import_csv.import_csv("db_mocks/test_import_csv_copy.db", "test_import_csv.csv", chunk_size=1)
+        self.assertEqual(result, (2, 1))
+
+        con = sqlite3.connect("db_mocks/test_import_csv_copy.db")
+        self.assertEqual(con.execute("select * from bank where acc_no > 2").fetchall(),
+                         [(3, "Rusu Ana", 30, "Albu Street, 4", 100, "savings", 712),
+                          (4, "Dinu Mara", 50, "Oak Street", 0, "savings", 755)])
+        with open("test_import_csv_bad.csv") as f:
+            self.assertEqual(f.read().splitlines(),
+                             ["name,age,address,balance,account_type,mobile_number,error",
+                              "Stan Dan,forty,Main Street,5,current,0744,age is not a number"])
+
+        #cleanup
+        con.close()
+        os.remove("db_mocks/test_import_csv_copy.db")
+        os.remove("test_import_csv.csv")
+        os.remove("test_import_csv_bad.csv")
+
+    def test_import_csv_missing_columns(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_import_csv_missing_columns_copy.db")
+        with open("test_import_csv_missing_columns.csv", "w", newline="") as f:
+            f.write("name,age\nRusu Ana,30\n")
+
+        with self.assertRaises(Exception) as error:
+            import_csv.import_csv("db_mocks/test_import_csv_missing_columns_copy.db",
+                                  "test_import_csv_missing_columns.csv")
+        self.assertEqual(str(error.exception),
+                         "Missing columns: address, balance, account_type, mobile_number")
+        self.assertFalse(os.path.exists("test_import_csv_missing_columns_bad.csv"))
+
+        #cleanup
+        os.remove("db_mocks/test_import_csv_missing_columns_copy.db")
+        os.remove("test_import_csv_missing_columns.csv")
+
+    #an import that fails after refusing rows leaves no rejects report behind
+    def test_import_csv_failed(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_import_csv_failed_copy.db")
+        with open("test_import_csv_failed.csv", "w", newline="") as f:
+            f.write("name,age,address,balance,account_type,mobile_number\n"
+                    "Stan Dan,forty,Main Street,5,current,0744\n")
+
+        def import_customers(records, chunk_size, on_reject):
+            for record in records:
+                on_reject(record, "age is not a number")
+            raise sqlite3.OperationalError("database is locked")
+
+        with patch("backend.import_customers", import_customers):
+            with self.assertRaises(sqlite3.OperationalError):
+                import_csv.import_csv("db_mocks/test_import_csv_failed_copy.db", "test_import_csv_failed.csv")
+        self.assertFalse(os.path.exists("test_import_csv_failed_bad.csv"))
+        self.assertFalse(os.path.exists("test_import_csv_failed_bad.csv.part"))
+
+        #cleanup
+        os.remove("db_mocks/test_import_csv_failed_copy.db")
+        os.remove("test_import_csv_failed.csv")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+from os.path import exists
+import sqlite3
+import sys
+import time
+
+import backend
+
+# table -> (key column, declared type of the key, column definitions of the keyed table)
+KEYED_TABLES = {
+    "bank": ("acc_no", "INTEGER", backend.BANK_COLUMNS),
+    "staff": ("name", "TEXT", backend.STAFF_COLUMNS),
+}
+
+
+def is_keyed(con, table):
+    """Tells whether the table already has the key column as its primary key."""
+    key, key_type, _ = KEYED_TABLES[table]
+    columns = con.execute("pragma table_info({})".format(table)).fetchall()
+    primary = [(c[1], c[2].upper()) for c in columns if c[5]]
+    return primary == [(key, key_type)]
+
+
+def _columns(con, table):
+    return [c[1] for c in con.execute("pragma table_info({})".format(table))]
+
+
+def _drop_leftovers(con, table):
+    # a previous run that died halfway leaves its shadow table and triggers behind
+    for op in ("insert", "update", "delete"):
+        con.execute("drop trigger if exists {}_migrate_{}".format(table, op))
+    con.execute("drop table if exists {}_migrating".format(table))
+
+
+def _check_duplicates(con, table):
+    key = KEYED_TABLES[table][0]
+    dup = con.execute(
+        "select {0} from {1} group by {0} having count(*) > 1 limit 5".format(key, table)
+    ).fetchall()
+    if dup:
+        raise Exception(
+            "Duplicate {} values in {}: {}".format(key, table, [d[0] for d in dup])
+        )
+
+
+def migrate_table(con, table, batch_size=5000, pause=0.0):
+    """Rebuilds a single table with its key, copying the rows over in batches.
+       While the copy runs, triggers mirror every change made to the old table, so
+       the application can keep reading and writing; only the final swap takes the write lock."""
+    key, _, definition = KEYED_TABLES[table]
+    columns = ", ".join(_columns(con, table))
+    new_values = ", ".join("new." + c for c in _columns(con, table))
+
+    _drop_leftovers(con, table)
+    _check_duplicates(con, table)
+
+    con.execute("begin immediate")
+    con.execute("create table {}_migrating ({})".format(table, definition))
+    con.execute(
+        "create trigger {0}_migrate_insert after insert on {0} begin "
+        "insert or replace into {0}_migrating ({1}) values ({2}); end".format(
+            table, columns, new_values
+        )
+    )
+    con.execute(
+        "create trigger {0}_migrate_update after update on {0} begin "
+        "delete from {0}_migrating where {3} = old.{3}; "
+        "insert or replace into {0}_migrating ({1}) values ({2}); end".format(
+            table, columns, new_values, key
+        )
+    )
+    con.execute(
+        "create trigger {0}_migrate_delete after delete on {0} begin "
+        "delete from {0}_migrating where {1} = old.{1}; end".format(table, key)
+    )
+    con.execute("commit")
+
+    # backfill in short transactions so writers only ever wait for one batch
+    last = 0
+    copied = 0
+    while True:
+        con.execute("begin immediate")
+        rows = con.execute(
+            "select rowid from {} where rowid > ? order by rowid limit ?".format(table),
+            (last, batch_size),
+        ).fetchall()
+        if rows:
+            con.execute(
+                "insert or replace into {0}_migrating ({1}) select {1} from {0} "
+                "where rowid > ? and rowid <= ?".format(table, columns),
+                (last, rows[-1][0]),
+            )
+            last = rows[-1][0]
+            copied = copied + len(rows)
+        con.execute("commit")
+        if len(rows) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    con.execute("begin immediate")
+    for op in ("insert", "update", "delete"):
+        con.execute("drop trigger {}_migrate_{}".format(table, op))
+    # dropping the table drops its indexes and triggers too; besides those create_schema knows about
+    # there can be others (the change log of incremental dumps), they are put back as they were
+    others = con.execute(
+        "select name, sql from sqlite_master where type in ('index', 'trigger') and tbl_name = ? "
+        "and sql not null", (table,)
+    ).fetchall()
+    con.execute("drop table {}".format(table))
+    con.execute("alter table {0}_migrating rename to {0}".format(table))
+    backend.create_schema(con.cursor())
+    for name, sql in others:
+        if con.execute("select 1 from sqlite_master where name = ?", (name,)).fetchone() is None:
+            con.execute(sql)
+    con.execute("commit")
+    return copied
+
+
+def migrate_db(path, batch_size=5000, pause=0.0):
+    """Expects the path to an existing bank database.
+       Rebuilds every table that is still missing its key and returns the number of rows copied per table."""
+    if not exists(path):
+        raise Exception("No such file")
+
+    con = sqlite3.connect(path, isolation_level=None)
+    try:
+        backend.create_schema(con.cursor())
+        copied = {}
+        for table in KEYED_TABLES:
+            if not is_keyed(con, table):
+                copied[table] = migrate_table(con, table, batch_size, pause)
+        return copied
+    finally:
+        con.close()
+
+
+def main():
+    copied = migrate_db(sys.argv[1])
+    for table, rows in copied.items():
+        print("{}: {} rows migrated".format(table, rows))
+    if not copied:
+        print("Nothing to migrate")
+
+
+if __name__ == "__main__":
+    main()
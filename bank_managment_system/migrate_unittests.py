@@ -0,0 +1,104 @@
+import unittest
+import sqlite3
+import os
+import migrate
+from dump_db import dump_db
+from shutil import copyfile
+
+#NOTE: same Copy-Call-Assert-Cleanup layout as backend_unittests.py, the mocks in db_mocks still use the unkeyed schema
+
+
+class MigrateUnitTests(unittest.TestCase):
+
+    def test_migrate_db_keys_tables(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_migrate_db_keys_tables_copy.db")
+
+        copied = migrate.migrate_db("db_mocks/test_migrate_db_keys_tables_copy.db", batch_size=1)
+        self.assertEqual(copied, {"bank": 2, "staff": 0})
+
+        con = sqlite3.connect("db_mocks/test_migrate_db_keys_tables_copy.db")
+        self.assertTrue(migrate.is_keyed(con, "bank"))
+        self.assertTrue(migrate.is_keyed(con, "staff"))
+        self.assertEqual(con.execute("select acc_no, name from bank order by acc_no").fetchall(),
+                         [(1, "Ionescu Maria"), (2, "Popescu Ion")])
+
+        #a second run has nothing left to do
+        self.assertEqual(migrate.migrate_db("db_mocks/test_migrate_db_keys_tables_copy.db"), {})
+
+        #cleanup
+        con.close()
+        os.remove("db_mocks/test_migrate_db_keys_tables_copy.db")
+
+    #the change log triggers of incremental dumps survive the rebuild of the tables they are on
+    def test_migrate_db_keeps_change_log(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_migrate_db_keeps_change_log_copy.db")
+
+        dump_db("db_mocks/test_migrate_db_keeps_change_log_copy.db", "test_migrate_db_keeps_change_log.sql",
+                incremental=True)
+        migrate.migrate_db("db_mocks/test_migrate_db_keeps_change_log_copy.db")
+        con = sqlite3.connect("db_mocks/test_migrate_db_keeps_change_log_copy.db")
+        self.assertEqual(con.execute("select count(*) from sqlite_master where type = 'trigger' "
+                                     "and name like 'change_log_%'").fetchone(), (9,))
+        con.execute("update bank set balance = 1 where acc_no = 2")
+        con.commit()
+        dump_db("db_mocks/test_migrate_db_keeps_change_log_copy.db", "test_migrate_db_keeps_change_log_1.sql",
+                incremental=True)
+        with open("test_migrate_db_keeps_change_log_1.sql") as f:
+            self.assertIn("INSERT INTO \"bank\" VALUES(2,'Popescu Ion',26,'25th Street, NY',1,", f.read())
+
+        #cleanup
+        con.close()
+        os.remove("db_mocks/test_migrate_db_keeps_change_log_copy.db")
+        os.remove("test_migrate_db_keeps_change_log.sql")
+        os.remove("test_migrate_db_keeps_change_log_1.sql")
+
+    def test_migrate_db_mirrors_writes_during_copy(self):
+        copyfile(src="db_mocks/test_check_name_in_staff_if.db",
+                 dst="db_mocks/test_migrate_db_mirrors_writes_copy.db")
+
+        con = sqlite3.connect("db_mocks/test_migrate_db_mirrors_writes_copy.db", isolation_level=None)
+        real_sleep = migrate.time.sleep
+
+        #a second connection keeps writing between the batches of the backfill
+        def write_between_batches(seconds):
+            writer = sqlite3.connect("db_mocks/test_migrate_db_mirrors_writes_copy.db")
+            writer.execute("update staff set salary=3000 where name='Popescu Maria'")
+            writer.execute("insert into staff values('Rusu Mihai','pass',1000,'teller')")
+            writer.commit()
+            writer.close()
+            migrate.time.sleep = real_sleep
+
+        migrate.time.sleep = write_between_batches
+        try:
+            migrate.migrate_table(con, "staff", batch_size=1, pause=0.01)
+        finally:
+            migrate.time.sleep = real_sleep
+
+        self.assertTrue(migrate.is_keyed(con, "staff"))
+        self.assertEqual(con.execute("select name, salary from staff order by name").fetchall(),
+                         [("Ionescu Mirela", 2500), ("Popescu Maria", 3000), ("Rusu Mihai", 1000)])
+
+        #cleanup
+        con.close()
+        os.remove("db_mocks/test_migrate_db_mirrors_writes_copy.db")
+
+    def test_migrate_db_duplicate_keys(self):
+        copyfile(src="db_mocks/test_check_name_in_staff_if.db",
+                 dst="db_mocks/test_migrate_db_duplicate_keys_copy.db")
+
+        con = sqlite3.connect("db_mocks/test_migrate_db_duplicate_keys_copy.db")
+        con.execute("insert into staff values('Popescu Maria','other',1,'banker')")
+        con.commit()
+        con.close()
+
+        with self.assertRaises(Exception):
+            migrate.migrate_db("db_mocks/test_migrate_db_duplicate_keys_copy.db")
+
+        #cleanup
+        os.remove("db_mocks/test_migrate_db_duplicate_keys_copy.db")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+from tkinter import Button, Frame, Scrollbar, ttk
+
+
+# a ttk.Treeview over one of the backend's keyset-paginated listings. It opens with a single page
+# and asks for the next one only when the view is scrolled close to the bottom, so opening it costs
+# one page whatever the size of the table, and Tk only ever draws the rows in sight. Unless
+# sortable is off (search results come ranked), clicking a heading sorts on that column in SQL
+# and starts over from the first page
+class PagedTable(Frame):
+    def __init__(self, master, worker, fetch_page, columns, headings=None, page_size=200,
+                 on_error=None, height=25, sortable=True):
+        Frame.__init__(self, master)
+        self.worker = worker
+        # fetch_page(after, page_size, columns, order_by, descending) -> (rows, key of the next page)
+        self.fetch_page = fetch_page
+        self.columns = tuple(columns)
+        self.page_size = page_size
+        self.on_error = on_error
+        self.order_by = self.columns[0]
+        self.descending = False
+        self._after = None
+        self._loading = False
+        # the last page asked for failed, scrolling asks for it again
+        self._failed = False
+        # bumped on every re-sort, pages still on their way for an older order are dropped
+        self._generation = 0
+
+        self.tree = ttk.Treeview(self, columns=self.columns, show="headings", height=height)
+        self.scrollbar = Scrollbar(self, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._scrolled)
+        for column, heading in zip(self.columns, headings or self.columns):
+            if sortable:
+                self.tree.heading(column, text=heading, command=lambda c=column: self.sort(c))
+            else:
+                self.tree.heading(column, text=heading)
+            self.tree.column(column, width=150)
+        self.tree.grid(row=0, column=0)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        # an empty table has nothing to scroll, a failed first page is retried from this button
+        self.reload_button = Button(self, text="Reload", command=self.reload)
+
+        self.reload()
+
+    # sort on column, or flip the direction when the table is already sorted on it
+    def sort(self, column):
+        if column == self.order_by:
+            self.descending = not self.descending
+        else:
+            self.order_by = column
+            self.descending = False
+        self.reload()
+
+    def reload(self):
+        self._generation = self._generation + 1
+        self.tree.delete(*self.tree.get_children())
+        self._after = None
+        self._loading = False
+        self._failed = False
+        self.reload_button.grid_remove()
+        self._load_page()
+
+    def _load_page(self):
+        self._loading = True
+        generation = self._generation
+        self.worker.submit(
+            self.fetch_page,
+            (self._after, self.page_size, self.columns, self.order_by, self.descending),
+            lambda page: self._add_page(generation, page),
+            lambda error: self._page_failed(generation, error),
+            key=self,
+        )
+
+    def _add_page(self, generation, page):
+        if generation != self._generation:
+            return
+        rows, self._after = page
+        for row in rows:
+            self.tree.insert("", "end", values=row)
+        self._loading = False
+        self._failed = False
+        self.reload_button.grid_remove()
+
+    # a failed page (a busy timeout under load) is asked for again on the next scroll, or from the
+    # Reload button when it was the first one
+    def _page_failed(self, generation, error):
+        if generation == self._generation:
+            self._loading = False
+            self._failed = True
+            if not self.tree.get_children():
+                self.reload_button.grid(row=1, column=0, columnspan=2)
+        if self.on_error is None:
+            raise error
+        self.on_error(error)
+
+    def _scrolled(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) > 0.9 and (self._after is not None or self._failed) and not self._loading:
+            self._load_page()
@@ -0,0 +1,33 @@
+from os.path import exists
+import sys
+
+import backend
+
+
+def reconcile(path, fix=False):
+    """Expects the path to a bank database.
+       Checks the bank_totals summary against a full SUM over bank and returns True when they agree.
+       With fix=True a summary that drifted is corrected."""
+    if not exists(path):
+        raise Exception("No such file")
+
+    backend.connect_database(path)
+    try:
+        summary, actual = backend.reconcile_totals(fix)
+    finally:
+        backend.conn.close()
+
+    print("summary: total={} accounts={}".format(*summary))
+    print("actual:  total={} accounts={}".format(*actual))
+    return summary == actual
+
+
+def main():
+    ok = reconcile(sys.argv[1], fix="--fix" in sys.argv[2:])
+    if not ok:
+        print("Totals differ" + (", summary corrected" if "--fix" in sys.argv[2:] else ""))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+from os.path import exists
+from itertools import chain
+import argparse
+import csv
+import gzip
+import json
+import lzma
+import os
+import re
+import sqlite3
+
+import backend
+
+# PRAGMAs of the load: the target is a new file, a crash halfway means running the restore again,
+# so there is no journal to keep and nothing to fsync until the end
+LOAD_PRAGMAS = {
+    "journal_mode": "off",
+    "synchronous": "off",
+    "locking_mode": "exclusive",
+    "cache_size": -262144,
+    "temp_store": "memory",
+}
+# rows of an export, and characters of a dump, per transaction
+BATCH_SIZE = 50000
+CHUNK_SIZE = 1 << 22
+
+_VIRTUAL_TABLE = re.compile(r"INSERT INTO sqlite_master\(type,name,tbl_name,rootpage,sql\)VALUES\('table','((?:[^']|'')+)'")
+_DDL = re.compile(r'(CREATE|DROP) (?:UNIQUE )?(INDEX|TRIGGER) (?:IF (?:NOT )?EXISTS )?"?((?:[^"\s(]|"")+)"?', re.IGNORECASE)
+# a line of a dump that does not start a row
+_NOT_A_ROW = re.compile(r'\n(?!INSERT INTO "|\Z)')
+_REBUILD = re.compile(r"""INSERT INTO "((?:[^"]|"")+)"\("\1"\) VALUES\('rebuild'\);""")
+
+
+def _open(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", newline="")
+    if path.endswith(".xz"):
+        return lzma.open(path, "rt", newline="")
+    return open(path, newline="")
+
+
+def _chunks(f, size):
+    """The dump in pieces of about size characters, each ending where a statement does."""
+    pending = ""
+    while True:
+        lines = f.readlines(size)
+        if not lines:
+            break
+        pending = pending + "".join(lines)
+        if sqlite3.complete_statement(pending):
+            yield pending
+            pending = ""
+    if pending.strip():
+        raise Exception("Incomplete statement at the end of the dump")
+
+
+def _read_export(f, path):
+    """The columns of an export and its rows as tuples, (None, None) for an empty file."""
+    plain_path = path[:-3] if path.endswith((".gz", ".xz")) else path
+    if plain_path.endswith(".jsonl"):
+        rows = (json.loads(line) for line in f if line.strip())
+        first = next(rows, None)
+        if first is None:
+            return None, None
+        columns = list(first)
+        return columns, (tuple(row.get(c) for c in columns) for row in chain([first], rows))
+    reader = csv.reader(f)
+    columns = next(reader, None)
+    if columns is None:
+        return None, None
+    # export.py writes NULL as an empty field
+    return columns, (tuple(value if value != "" else None for value in row) for row in reader if row)
+
+
+class _Restore:
+    """One load into a new database: indexes and triggers are held back until every source is in,
+    and the data goes in a chunk of a dump or batch_size rows of an export per transaction."""
+
+    def __init__(self, path, batch_size, chunk_size):
+        self.path = path
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        # name -> sql, in the order they were first seen, built once the data is in
+        self.indexes = {}
+        self.triggers = {}
+        self.rebuilds = []
+        self.virtual = set()
+        self._set_skip()
+        self.schema_written = False
+        self.con = None
+        self.connect()
+
+    # a new connection also sees tables a dump created by writing sqlite_master directly (full-text ones)
+    def connect(self):
+        if self.con is not None:
+            self.con.close()
+        self.con = sqlite3.connect(self.path, isolation_level=None)
+        for name, value in LOAD_PRAGMAS.items():
+            self.con.execute("pragma {}={}".format(name, value))
+
+    # con.iterdump() (and so dumps of older versions of dump_db) also writes the rows of a full-text
+    # table as INSERTs into it, its shadow tables hold them already
+    def _set_skip(self):
+        self.skip = tuple('INSERT INTO "{}" VALUES'.format(name.replace('"', '""')) for name in sorted(self.virtual))
+
+    # false for a chunk holding anything _sort_out does something with, and for some that only look like it
+    def _rows_only(self, chunk):
+        return (chunk.startswith('INSERT INTO "') and _NOT_A_ROW.search(chunk) is None
+                and "VALUES('rebuild');" not in chunk and not any(prefix in chunk for prefix in self.skip))
+
+    def _sort_out(self, chunk):
+        """The statements of a chunk to run as they are; the indexes, triggers and full-text rebuilds
+        among them are held back instead. A statement spans several lines when a text value holds a newline."""
+        kept = []
+        pending = ""
+        for line in chunk.split("\n"):
+            if pending:
+                line = pending + "\n" + line
+            if not (line.endswith(";") and sqlite3.complete_statement(line)):
+                pending = line
+                continue
+            pending = ""
+            if line.startswith(self.skip):
+                continue
+            if line.startswith('INSERT INTO "'):
+                if line.endswith("VALUES('rebuild');") and _REBUILD.match(line) is not None:
+                    if line not in self.rebuilds:
+                        self.rebuilds.append(line)
+                    continue
+            elif line in ("BEGIN TRANSACTION;", "COMMIT;"):
+                continue
+            else:
+                ddl = _DDL.match(line)
+                if ddl is not None:
+                    held = self.indexes if ddl.group(2).upper() == "INDEX" else self.triggers
+                    if ddl.group(1).upper() == "CREATE":
+                        held[ddl.group(3)] = line
+                    else:
+                        held.pop(ddl.group(3), None)
+                    continue
+                virtual = _VIRTUAL_TABLE.match(line)
+                if virtual is not None:
+                    self.virtual.add(virtual.group(1).replace("''", "'"))
+                    self._set_skip()
+                    self.schema_written = True
+            kept.append(line)
+        return kept
+
+    def load_dump(self, path):
+        """Runs a dump a chunk per transaction. Chunks of nothing but rows, nearly all of a big dump,
+        go to SQLite as they are read; only the others are split into statements."""
+        self.schema_written = False
+        with _open(path) as f:
+            for chunk in _chunks(f, self.chunk_size):
+                if not self._rows_only(chunk):
+                    chunk = "\n".join(self._sort_out(chunk))
+                self.con.executescript("BEGIN;\n" + chunk + "\nCOMMIT;")
+        if self.schema_written:
+            self.connect()
+
+    def create_schema(self):
+        """The bank schema for loading exports into (what a dump loaded before it lacks), with its
+        indexes and triggers held back like a dump's."""
+        cur = self.con.cursor()
+        cur.execute("begin")
+        backend.create_schema(cur)
+        for name, type, sql in cur.execute(
+                "select name, type, sql from sqlite_master where type in ('index', 'trigger') and sql not null").fetchall():
+            (self.indexes if type == "index" else self.triggers).setdefault(name, sql + ";")
+            cur.execute("drop {} {}".format(type, name))
+        cur.execute("commit")
+
+    def load_export(self, table, path):
+        ident = table.replace('"', '""')
+        with _open(path) as f:
+            columns, records = _read_export(f, path)
+            if columns is None:
+                return
+
+            sql = 'INSERT INTO "{}" ({}) VALUES ({})'.format(
+                ident, ", ".join('"{}"'.format(c.replace('"', '""')) for c in columns), ", ".join("?" * len(columns)))
+            batch = []
+            for record in records:
+                batch.append(record)
+                if len(batch) == self.batch_size:
+                    self._insert(sql, batch)
+                    batch = []
+            if batch:
+                self._insert(sql, batch)
+
+    def _insert(self, sql, batch):
+        self.con.execute("begin")
+        self.con.executemany(sql, batch)
+        self.con.execute("commit")
+
+    def finish(self, exported):
+        """Builds what was held back, brings the derived bank tables in line with the rows that were
+        loaded, checks the file and puts it back in WAL mode; returns the row count of every table."""
+        self.connect()
+        cur = self.con.cursor()
+        tables = set(row[0] for row in cur.execute("select name from sqlite_master where type='table'"))
+        virtual = [row[0] for row in cur.execute(
+            "select name from sqlite_master where type='table' and sql like 'CREATE VIRTUAL TABLE%'")]
+        cur.execute("begin")
+        for sql in self.indexes.values():
+            cur.execute(sql)
+        if "bank" in exported and "bank_search" in tables:
+            self.rebuilds.append("""INSERT INTO "bank_search"("bank_search") VALUES('rebuild');""")
+        for sql in self.rebuilds:
+            cur.execute(sql)
+        if "bank" in exported and {"bank_totals", "acc_no_seq"} <= tables:
+            cur.execute(backend.STATEMENTS["sum_balances"])
+            cur.execute(backend.STATEMENTS["set_totals"], cur.fetchone())
+            cur.execute("update acc_no_seq set last = max(last, (select coalesce(max(acc_no), 0) from bank))")
+        for sql in self.triggers.values():
+            cur.execute(sql)
+        cur.execute("commit")
+
+        result = cur.execute("pragma integrity_check").fetchall()
+        if result != [("ok",)]:
+            raise Exception("Restored database failed integrity_check: {}".format("; ".join(r[0] for r in result)))
+
+        counts = {}
+        shadow = tuple(name + "_" for name in virtual)
+        for table in sorted(tables):
+            if table.startswith("sqlite_") or table.startswith(shadow):
+                continue
+            counts[table] = cur.execute('select count(*) from "{}"'.format(table.replace('"', '""'))).fetchone()[0]
+        cur.execute("pragma locking_mode=normal")
+        cur.execute("pragma journal_mode=wal")
+        self.con.close()
+        return counts
+
+
+def restore(path, sources, force=False, batch_size=BATCH_SIZE, chunk_size=CHUNK_SIZE):
+    """Expects the path of the database to create and the files to load into it, in order: dumps made
+       by dump_db (a full one, then any incremental ones after it) and exports made by export.py, given
+       as (table, path) pairs. Any file may be gzip (.gz) or lzma (.xz) compressed. A staff export
+       without the pass column is refused, staff are restored from a dump.
+       Loads with journaling and fsync off, chunk_size characters of a dump or batch_size rows of an
+       export per transaction, with indexes and triggers built once everything is in. Exports of bank also refresh the full-text index, the
+       totals and the account number sequence. Ends with PRAGMA integrity_check and prints and returns
+       the row count of every table. An existing file at path is only replaced with force=True."""
+    for source in sources:
+        if not exists(source if isinstance(source, str) else source[1]):
+            raise Exception("No such file")
+    # export.py leaves passwords out, employees restored from it could never log in
+    for source in sources:
+        if not isinstance(source, str) and source[0] == "staff":
+            with _open(source[1]) as f:
+                columns = _read_export(f, source[1])[0]
+            if columns is not None and "pass" not in columns:
+                raise Exception("{} has no passwords, restore staff from a dump".format(source[1]))
+    if exists(path):
+        if not force:
+            raise Exception("{} already exists".format(path))
+        for leftover in (path, path + "-wal", path + "-shm"):
+            if exists(leftover):
+                os.remove(leftover)
+
+    restore = _Restore(path, batch_size, chunk_size)
+    exported = set()
+    try:
+        for source in sources:
+            if isinstance(source, str):
+                restore.load_dump(source)
+                continue
+            table, export_path = source
+            if not exported:
+                restore.create_schema()
+            restore.load_export(table, export_path)
+            exported.add(table)
+        counts = restore.finish(exported)
+    except Exception:
+        restore.con.close()
+        raise
+
+    for table, count in counts.items():
+        print("{}: {}".format(table, count))
+    return counts
+
+
+def _source(text):
+    table, sep, path = text.partition("=")
+    return (table, path) if sep and not exists(text) else text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create a database from dumps and exports.")
+    parser.add_argument("path", help="the database to create")
+    parser.add_argument("sources", nargs="+", type=_source,
+                        help="dump files (full, then incremental) and table=file for exports, loaded in order")
+    parser.add_argument("--force", action="store_true", help="replace path if it exists")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows of an export per transaction")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="characters of a dump per transaction")
+    args = parser.parse_args()
+    restore(args.path, args.sources, args.force, args.batch_size, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
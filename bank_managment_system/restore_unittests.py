@@ -0,0 +1,95 @@
+import unittest
+import sqlite3
+import os
+import backend
+from dump_db import dump_db
+from export import export
+from restore import restore
+from shutil import copyfile
+
+
+class RestoreUnitTests(unittest.TestCase):
+
+    #a full dump and the incremental one after it, loaded in small transactions, give back the source
+    def test_restore_dumps(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_restore_dumps_copy.db")
+
+        backend.connect_database("db_mocks/test_restore_dumps_copy.db")
+        dump_db("db_mocks/test_restore_dumps_copy.db", "test_restore_dumps.sql.gz", incremental=True)
+        backend.update_balance(5, 1)
+        new_acc_no = backend.create_customer("Rusu Ana", 30, "Albu Street", 7, "savings", 712)
+        backend.delete_acc(2)
+        dump_db("db_mocks/test_restore_dumps_copy.db", "test_restore_dumps_1.sql", incremental=True)
+
+        counts = restore("test_restore_dumps.db", ["test_restore_dumps.sql.gz", "test_restore_dumps_1.sql"],
+                         chunk_size=64)
+        self.assertEqual(counts["bank"], 2)
+        self.assertNotIn("bank_search_data", counts)
+        with self.assertRaises(Exception):
+            restore("test_restore_dumps.db", ["test_restore_dumps.sql.gz"])
+
+        con = sqlite3.connect("test_restore_dumps.db")
+        self.assertEqual(con.execute("pragma journal_mode").fetchone(), ("wal",))
+        for table in ("bank", "staff", "ledger", "bank_totals", "acc_no_seq"):
+            self.assertEqual(con.execute("select * from " + table).fetchall(),
+                             backend.conn.execute("select * from " + table).fetchall())
+        self.assertEqual(con.execute("select rowid from bank_search where bank_search match 'rusu'").fetchall(),
+                         [(new_acc_no,)])
+        for type in ("index", "trigger"):
+            schema = "select name, sql from sqlite_master where type = ? and sql not null order by name"
+            self.assertEqual(con.execute(schema, (type,)).fetchall(), backend.conn.execute(schema, (type,)).fetchall())
+        #the triggers are back once everything is in
+        con.execute("delete from bank where acc_no = 1")
+        self.assertEqual(con.execute("select * from bank_totals").fetchall(), [(7, 1)])
+
+        #cleanup
+        con.close()
+        backend.conn.close()
+        os.remove("db_mocks/test_restore_dumps_copy.db")
+        os.remove("test_restore_dumps.db")
+        os.remove("test_restore_dumps.sql.gz")
+        os.remove("test_restore_dumps_1.sql")
+
+    #exports go into a new bank schema without firing its triggers, the derived tables are computed after
+    def test_restore_exports(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_restore_exports_copy.db")
+
+        backend.connect_database("db_mocks/test_restore_exports_copy.db")
+        backend.update_balance(5, 1)
+        backend.conn.close()
+        export("db_mocks/test_restore_exports_copy.db", "bank", "test_restore_exports_bank.csv.gz")
+        export("db_mocks/test_restore_exports_copy.db", "ledger", "test_restore_exports_ledger.jsonl")
+
+        counts = restore("test_restore_exports.db", [("bank", "test_restore_exports_bank.csv.gz"),
+                                                     ("ledger", "test_restore_exports_ledger.jsonl")])
+        self.assertEqual(counts["bank"], 2)
+
+        con = sqlite3.connect("test_restore_exports.db")
+        source = sqlite3.connect("db_mocks/test_restore_exports_copy.db")
+        for table in ("bank", "ledger", "bank_totals", "acc_no_seq"):
+            self.assertEqual(con.execute("select * from " + table).fetchall(),
+                             source.execute("select * from " + table).fetchall())
+        self.assertEqual(con.execute("select rowid from bank_search where bank_search match 'ionescu'").fetchall(),
+                         [(1,)])
+
+        #a staff export has no passwords, it is refused before anything is created
+        export("db_mocks/test_restore_exports_copy.db", "staff", "test_restore_exports_staff.csv")
+        with self.assertRaises(Exception):
+            restore("test_restore_exports_staff.db", [("bank", "test_restore_exports_bank.csv.gz"),
+                                                      ("staff", "test_restore_exports_staff.csv")])
+        self.assertFalse(os.path.exists("test_restore_exports_staff.db"))
+
+        #cleanup
+        source.close()
+        con.close()
+        os.remove("db_mocks/test_restore_exports_copy.db")
+        os.remove("test_restore_exports.db")
+        os.remove("test_restore_exports_bank.csv.gz")
+        os.remove("test_restore_exports_ledger.jsonl")
+        os.remove("test_restore_exports_staff.csv")
+
+
+if __name__ == '__main__':
+    unittest.main()
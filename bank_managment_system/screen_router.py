@@ -0,0 +1,36 @@
+from tkinter import END, Entry, Frame
+
+
+# shows one screen of a Tk window at a time, all under the single mainloop. Every screen is built
+# once, the first time it is shown, and kept: showing it again hides the current screen, empties
+# the screen's entries and destroys whatever was added to it after it was built (messages,
+# inline forms), so a navigation costs the same after a whole shift as it did on the first one
+class ScreenRouter:
+    def __init__(self, root):
+        self.root = root
+        # name -> (frame, widgets the build function created)
+        self.screens = {}
+        self.current = None
+
+    # build(frame) fills a new screen, refresh(frame) runs whenever an already built one is shown again
+    def show(self, name, build, refresh=None, bg=None, padx=0, pady=0):
+        screen = self.screens.get(name)
+        if screen is None:
+            frame = Frame(self.root) if bg is None else Frame(self.root, bg=bg)
+            build(frame)
+            self.screens[name] = (frame, set(frame.winfo_children()))
+        else:
+            frame, built = screen
+            for child in frame.winfo_children():
+                if child not in built:
+                    child.destroy()
+                elif isinstance(child, Entry):
+                    child.delete(0, END)
+            if refresh is not None:
+                refresh(frame)
+
+        if self.current is not None and self.current is not frame:
+            self.current.grid_forget()
+        frame.grid(padx=padx, pady=pady)
+        self.current = frame
+        return frame
@@ -0,0 +1,29 @@
+from os.path import exists
+import sys
+
+import backend
+
+
+def snapshot(path):
+    """Expects the path to a bank database.
+       Snapshots the balance of every account the ledger moved since the last run and returns how
+       many were taken. Run it periodically (cron), balance_as_of adds up at most one period of entries."""
+    if not exists(path):
+        raise Exception("No such file")
+
+    backend.connect_database(path)
+    try:
+        taken = backend.snapshot_balances()
+    finally:
+        backend.conn.close()
+
+    print("snapshots taken: {}".format(taken))
+    return taken
+
+
+def main():
+    snapshot(sys.argv[1])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import queue
+import threading
+
+
+# runs backend calls for a Tk window on a thread of its own, so a slow query or a wait for the
+# write lock never freezes the window. Results go through a queue that the Tk thread drains every
+# `interval` ms with after(), only the Tk thread ever touches the widgets. Requests sharing a key
+# coalesce: while one is still waiting, a newer one with the same key replaces it
+class BackendWorker:
+    def __init__(self, widget, interval=50, busy=None):
+        self.widget = widget
+        self.interval = interval
+        # called with True when the first request is queued and with False once all results are handled
+        self.busy = busy
+        self._pending = {}
+        self._order = []
+        self._outstanding = 0
+        self._condition = threading.Condition()
+        self._results = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="backend-worker", daemon=True)
+        self._thread.start()
+        self.widget.after(self.interval, self.poll)
+
+    # call func(*args) on the worker, then on_done(result) or on_error(error) on the Tk thread
+    def submit(self, func, args=(), on_done=None, on_error=None, key=None):
+        if key is None:
+            key = object()
+        with self._condition:
+            if key in self._pending:
+                self._pending[key] = (func, args, on_done, on_error)
+                return
+            self._pending[key] = (func, args, on_done, on_error)
+            self._order.append(key)
+            self._outstanding = self._outstanding + 1
+            first = self._outstanding == 1
+            self._condition.notify()
+        if first and self.busy is not None:
+            self.busy(True)
+
+    # drain the results on the Tk thread; the next poll is scheduled and the request counted as
+    # done before its callback runs, so a callback that raises cannot stop the polling or leave
+    # the busy indicator on
+    def poll(self):
+        self.widget.after(self.interval, self.poll)
+        while True:
+            try:
+                on_done, on_error, result, error = self._results.get_nowait()
+            except queue.Empty:
+                return
+            with self._condition:
+                self._outstanding = self._outstanding - 1
+                idle = self._outstanding == 0
+            if idle and self.busy is not None:
+                self.busy(False)
+            if error is None:
+                if on_done is not None:
+                    on_done(result)
+            elif on_error is not None:
+                on_error(error)
+            else:
+                raise error
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._order:
+                    self._condition.wait()
+                key = self._order.pop(0)
+                func, args, on_done, on_error = self._pending.pop(key)
+            try:
+                self._results.put((on_done, on_error, func(*args), None))
+            except Exception as error:
+                self._results.put((on_done, on_error, None, error))
@@ -0,0 +1,71 @@
+import unittest
+import os
+import threading
+import backend
+from shutil import copyfile
+from ui_worker import BackendWorker
+
+#NOTE: the worker only needs after() from the widget, so these tests run without a display
+
+
+class FakeWidget:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, func):
+        self.scheduled.append(func)
+
+
+class BackendWorkerUnitTests(unittest.TestCase):
+
+    def wait_for_results(self, worker, count):
+        while worker._results.qsize() < count:
+            threading.Event().wait(0.01)
+
+    def test_backend_worker_results(self):
+        copyfile(src="db_mocks/test_check_acc_no_if.db",
+                 dst="db_mocks/test_backend_worker_results_copy.db")
+        backend.connect_database("db_mocks/test_backend_worker_results_copy.db")
+
+        busy = []
+        results = []
+        errors = []
+        worker = BackendWorker(FakeWidget(), busy=busy.append)
+        worker.submit(backend.update_balance, (10, 1), results.append)
+        worker.submit(backend.check_balance, (1,), results.append)
+        worker.submit(backend.check_balance, ("a') or ('1'='1",), results.append, errors.append)
+        self.wait_for_results(worker, 3)
+
+        #nothing reaches the callbacks before the Tk thread polls
+        self.assertEqual(results, [])
+        worker.poll()
+        self.assertEqual(results, [1260, 1260])
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(busy, [True, False])
+
+        #cleanup
+        backend._backend.pool.close_all()
+        backend.conn.close()
+        os.remove("db_mocks/test_backend_worker_results_copy.db")
+
+    def test_backend_worker_coalescing(self):
+        widget = FakeWidget()
+        worker = BackendWorker(widget)
+        results = []
+        release = threading.Event()
+
+        #keep the worker busy so the next requests have to wait in the queue
+        worker.submit(release.wait, (5,))
+        for n in range(5):
+            worker.submit(lambda n=n: n, (), results.append, key="search")
+        worker.submit(lambda: "other", (), results.append)
+        release.set()
+        self.wait_for_results(worker, 3)
+        worker.poll()
+
+        self.assertEqual(results, [4, "other"])
+        self.assertEqual(widget.scheduled, [worker.poll, worker.poll])
+
+
+if __name__ == '__main__':
+    unittest.main()